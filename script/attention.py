@@ -1,7 +1,23 @@
 from collections import defaultdict
+import json
+import os
 import time
 from pathlib import Path
 
+FOCUS_STATES = {
+    "1": "🚀 in flow",
+    "2": "😐 neutral",
+    "3": "😩 struggling",
+    "4": "🤯 overwhelmed",
+    "5": "🛑 need break"
+}
+# A state is assumed to last until the next check-in, but no longer than this
+MAX_STATE_MINUTES = 60
+# Time credited to the last check-in of a day
+LAST_STATE_MINUTES = 15
+REPORT_DAYS = 7
+HEAT = " .:-=+*#%@"
+
 def save_focus_state_to_yaml(log_file_path, message):
     timestamp = time.strftime('%Y-%m-%d %H:%M')
     date, current_time = timestamp.split(' ')
@@ -12,11 +28,12 @@ def save_focus_state_to_yaml(log_file_path, message):
             lines = f.readlines()
 
         current_date = None
-        for line in lines:
-            line = line.strip()
+        for raw in lines:
+            line = raw.strip()
             if not line:
                 continue
-            if line.endswith(':'):
+            # Only unindented lines are date headers; an entry's message may end in ':' too
+            if line.endswith(':') and not raw[:1].isspace():
                 current_date = line[:-1].strip()
             elif current_date is not None and ': ' in line:
                 time_part, msg_part = line.split(': ', 1)
@@ -30,6 +47,89 @@ def save_focus_state_to_yaml(log_file_path, message):
             for t in sorted(data[d].keys()):
                 f.write(f"  {t}: {data[d][t]}\n")
 
+    save_focus_index(log_file_path, build_focus_index(log_file_path))
+
+def get_index_path(log_file_path):
+    return log_file_path.with_suffix('.index.json')
+
+def build_focus_index(log_file_path):
+    # Byte range of every date section plus where the log ends, from one scan of the file
+    index = {"size": 0, "last_date": None, "last_time": None, "dates": {}}
+    if not log_file_path.exists():
+        return index
+
+    offset = 0
+    with open(log_file_path, 'rb') as f:
+        for raw in f:
+            line = raw.decode('utf-8').strip()
+            if line.endswith(':') and not raw[:1].isspace():
+                index["last_date"], index["last_time"] = line[:-1].strip(), None
+                index["dates"][index["last_date"]] = [offset, offset]
+            elif index["last_date"] and ': ' in line:
+                index["last_time"] = line.split(': ', 1)[0].strip()
+            offset += len(raw)
+            if index["last_date"]:
+                index["dates"][index["last_date"]][1] = offset
+    index["size"] = offset
+    return index
+
+def load_focus_index(log_file_path):
+    # Rebuilt whenever the log was changed behind the index's back
+    size = log_file_path.stat().st_size if log_file_path.exists() else 0
+    try:
+        with open(get_index_path(log_file_path), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("size") == size:
+            return index
+    except (FileNotFoundError, ValueError):
+        pass
+    index = build_focus_index(log_file_path)
+    save_focus_index(log_file_path, index)
+    return index
+
+def save_focus_index(log_file_path, index):
+    index_path = get_index_path(log_file_path)
+    temp_path = index_path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(temp_path, index_path)
+
+def append_focus_state(log_file_path, message):
+    # The log is sorted by date and time, so a check-in normally just goes at the end
+    timestamp = time.strftime('%Y-%m-%d %H:%M')
+    date, current_time = timestamp.split(' ')
+    index = load_focus_index(log_file_path)
+    last_date, last_time = index["last_date"], index["last_time"]
+
+    if last_date is None or date > last_date:
+        chunk = f"{date}:\n  {current_time}: {message.lower()}\n"
+        index["dates"][date] = [index["size"], index["size"]]
+    elif date == last_date and (last_time is None or current_time > last_time):
+        chunk = f"  {current_time}: {message.lower()}\n"
+    else:
+        # Clock went backwards or the same minute was logged twice: fall back to the sorted rewrite
+        save_focus_state_to_yaml(log_file_path, message)
+        return
+
+    data = chunk.encode('utf-8')
+    with open(log_file_path, 'ab') as f:
+        f.write(data)
+    index["size"] += len(data)
+    index["dates"][date][1] = index["size"]
+    index["last_date"], index["last_time"] = date, current_time
+    save_focus_index(log_file_path, index)
+
+def read_focus_logs_for_date(log_file_path, date):
+    # Lines of one date section, read with a single seek; None if the date has no section
+    span = load_focus_index(log_file_path)["dates"].get(date)
+    if span is None:
+        return None
+    start, end = span
+    with open(log_file_path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode('utf-8').splitlines()
+    return lines[1:]
+
 def display_focus_logs(log_file_path):
     if not log_file_path.exists():
         print("No records found.")
@@ -55,27 +155,127 @@ def display_focus_logs_for_date(log_file_path, date=None):
     if date is None:
         date = time.strftime('%Y-%m-%d')
 
-    with open(log_file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
     print(f"\n📅 Focus Log for {date}:\n")
 
-    inside_date_section = False
-    found_entries = False
+    lines = read_focus_logs_for_date(log_file_path, date)
+    if lines is None:
+        print("No entries found for this date.")
+        return
+
     for line in lines:
-        stripped = line.strip()
-        if stripped == f"{date}:":
-            inside_date_section = True
-            found_entries = True
+        print(line.rstrip())
+
+def parse_focus_state(message):
+    # "🚀 in flow - some note" -> "in flow"; anything unrecognised is "other"
+    text = message.split(' - ', 1)[0].strip().lower()
+    for state in FOCUS_STATES.values():
+        name = state.split(' ', 1)[1]
+        if text == state or text == name or text.endswith(f" {name}"):
+            return name
+    return "other"
+
+def summarize_focus_day(entries):
+    # entries: (HH:MM, message) in time order -> check-in counts, estimated minutes and hourly counts per state
+    summary = {"counts": {}, "minutes": {}, "hours": {}}
+    parsed = []
+    for clock, message in entries:
+        try:
+            hour, minute = map(int, clock.split(':'))
+        except ValueError:
             continue
-        if inside_date_section:
-            # If we hit another date section, stop
-            if stripped.endswith(':') and stripped != f"{date}:":
-                break
-            print(line.rstrip())
+        parsed.append((hour * 60 + minute, parse_focus_state(message)))
+    parsed.sort()
+    for i, (at, state) in enumerate(parsed):
+        until_next = parsed[i + 1][0] - at if i + 1 < len(parsed) else LAST_STATE_MINUTES
+        summary["counts"][state] = summary["counts"].get(state, 0) + 1
+        summary["minutes"][state] = summary["minutes"].get(state, 0) + min(until_next, MAX_STATE_MINUTES)
+        hours = summary["hours"].setdefault(state, [0] * 24)
+        hours[at // 60] += 1
+    return summary
 
-    if not found_entries:
-        print("No entries found for this date.")
+def iter_focus_sections(log_file_path, start=0):
+    # Streams (date, [(HH:MM, message), ...]) from byte `start`, one date section at a time
+    date, entries = None, []
+    with open(log_file_path, 'rb') as f:
+        f.seek(start)
+        for raw in f:
+            line = raw.decode('utf-8').strip()
+            if line.endswith(':') and not raw[:1].isspace():
+                if date is not None:
+                    yield date, entries
+                date, entries = line[:-1].strip(), []
+            elif date is not None and ': ' in line:
+                entries.append(tuple(part.strip() for part in line.split(': ', 1)))
+    if date is not None:
+        yield date, entries
+
+def get_report_cache_path(log_file_path):
+    return log_file_path.with_suffix('.report.json')
+
+def load_focus_report(log_file_path):
+    # Per-day summaries, cached with the byte range each was computed from. Only days whose
+    # range changed (normally just today and anything new) are re-read, in one pass from the first of them.
+    cache_path = get_report_cache_path(log_file_path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        cache = {"spans": {}, "days": {}}
+
+    spans = load_focus_index(log_file_path)["dates"]
+    stale = {date for date, span in spans.items() if cache["spans"].get(date) != span}
+    if stale:
+        for date, entries in iter_focus_sections(log_file_path, min(spans[date][0] for date in stale)):
+            if date in stale:
+                cache["days"][date] = summarize_focus_day(entries)
+        cache["spans"] = spans
+        cache["days"] = {date: cache["days"][date] for date in spans if date in cache["days"]}
+        temp_path = cache_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(temp_path, cache_path)
+    return cache["days"]
+
+def format_minutes(minutes):
+    return f"{minutes // 60}h{minutes % 60:02d}m"
+
+def display_focus_report(log_file_path):
+    if not log_file_path.exists():
+        print("No records found.")
+        return
+
+    days = load_focus_report(log_file_path)
+    if not days:
+        print("No entries found.")
+        return
+
+    counts, minutes, hours = defaultdict(int), defaultdict(int), defaultdict(lambda: [0] * 24)
+    for summary in days.values():
+        for state, n in summary["counts"].items():
+            counts[state] += n
+            minutes[state] += summary["minutes"][state]
+            hours[state] = [a + b for a, b in zip(hours[state], summary["hours"][state])]
+    if not counts:
+        # Only date headers, e.g. every check-in removed by hand
+        print("No entries found.")
+        return
+
+    print(f"\n📈 Focus Report ({len(days)} days):\n")
+    for state in sorted(counts, key=minutes.get, reverse=True):
+        print(f"  {state:<12} {counts[state]:>5} check-ins  ~{format_minutes(minutes[state])}")
+
+    peak = max(max(row) for row in hours.values())
+    print(f"\n  {'hour':<12}  " + "".join(f"{h:<3}" for h in range(0, 24, 3)))
+    for state in sorted(hours, key=counts.get, reverse=True):
+        row = "".join(HEAT[round(n * (len(HEAT) - 1) / peak)] for n in hours[state])
+        print(f"  {state:<12} |{row}|")
+
+    print(f"\n  Last {REPORT_DAYS} days:")
+    for date in sorted(days, reverse=True)[:REPORT_DAYS]:
+        summary = days[date]
+        states = ", ".join(f"{state} {format_minutes(m)}" for state, m in
+                           sorted(summary["minutes"].items(), key=lambda item: item[1], reverse=True))
+        print(f"  {date}: {sum(summary['counts'].values())} check-ins | {states}")
 
 def prompt_focus_state_and_log(log_file_path):
     print("\n🔔 Focus Check-In Menu")
@@ -86,16 +286,9 @@ def prompt_focus_state_and_log(log_file_path):
     print("5: 🛑 Need Break")
     print("6: 📊 View Records for Date")
     print("7: 📆 View All")
+    print("8: 📈 Report")
 
-    choice = input("Select an option (1-7): ").strip()
-
-    focus_states = {
-        "1": "🚀 in flow",
-        "2": "😐 neutral",
-        "3": "😩 struggling",
-        "4": "🤯 overwhelmed",
-        "5": "🛑 need break"
-    }
+    choice = input("Select an option (1-8): ").strip()
 
     if choice == "6":
         default_date = time.strftime('%Y-%m-%d')
@@ -108,10 +301,14 @@ def prompt_focus_state_and_log(log_file_path):
         display_focus_logs(log_file_path)
         return None
 
-    elif choice in focus_states:
+    elif choice == "8":
+        display_focus_report(log_file_path)
+        return None
+
+    elif choice in FOCUS_STATES:
         note = input("Add optional note (or press Enter): ").strip()
-        message = focus_states[choice] + (f" - {note.lower()}" if note else "")
-        save_focus_state_to_yaml(log_file_path, message)
+        message = FOCUS_STATES[choice] + (f" - {note.lower()}" if note else "")
+        append_focus_state(log_file_path, message)
         print(f"\n✅ Logged: {message}\n")
         return message
 
@@ -0,0 +1,167 @@
+import math
+import sys
+import threading
+import wave
+from array import array
+from queue import Empty, Queue
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SAMPLE_RATE = 44100
+# Frames mixed and written per step; small enough that a new tone starts within ~23 ms
+BLOCK_FRAMES = 1024
+# Silence between repetitions of a tone
+REPEAT_GAP = 0.1
+
+def generate_tone(frequency, duration, amplitude=0.5, sample_rate=SAMPLE_RATE):
+    # float32 samples in one bulk pass: vectorised with numpy when installed, otherwise straight into an array
+    num_samples = int(sample_rate * duration)
+    if numpy is not None:
+        t = numpy.arange(num_samples, dtype=numpy.float64) / sample_rate
+        return (amplitude * numpy.sin(2 * numpy.pi * frequency * t)).astype(numpy.float32).tobytes()
+    step = 2 * math.pi * frequency / sample_rate
+    return array('f', [amplitude * math.sin(step * i) for i in range(num_samples)]).tobytes()
+
+def to_samples(data):
+    if numpy is not None:
+        return numpy.frombuffer(data, dtype=numpy.float32)
+    samples = array('f')
+    samples.frombytes(data)
+    return samples
+
+class NullOutput:
+    # Discards audio but counts it, for running headless or timing the engine itself
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frames = 0
+
+    def write(self, data):
+        self.frames += len(data) // 4
+
+    def close(self):
+        pass
+
+class WavOutput(NullOutput):
+    # 16-bit mono PCM, so the result opens in any player
+    def __init__(self, path, sample_rate=SAMPLE_RATE):
+        super().__init__(sample_rate)
+        self.wav = wave.open(str(path), 'wb')
+        self.wav.setnchannels(1)
+        self.wav.setsampwidth(2)
+        self.wav.setframerate(sample_rate)
+
+    def write(self, data):
+        super().write(data)
+        pcm = array('h', [int(s * 32767) for s in to_samples(data)])
+        if sys.byteorder == 'big':
+            pcm.byteswap()
+        self.wav.writeframes(pcm.tobytes())
+
+    def close(self):
+        self.wav.close()
+
+class PyAudioOutput:
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        # Imported here so the null and WAV outputs work without PortAudio installed
+        import pyaudio
+        self.sample_rate = sample_rate
+        self.p = pyaudio.PyAudio()
+        self.stream = self.p.open(format=pyaudio.paFloat32, channels=1, rate=sample_rate, output=True)
+
+    def write(self, data):
+        # Blocks until the device has room, which paces the mixer in real time
+        self.stream.write(data)
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.p.terminate()
+
+def open_output(spec='pyaudio'):
+    # 'pyaudio' for the sound device, 'null' to discard, or a path ending in .wav
+    if spec == 'null':
+        return NullOutput()
+    if spec.endswith('.wav'):
+        return WavOutput(spec)
+    return PyAudioOutput()
+
+class AudioEngine:
+    # One output stream for the whole process; tones requested while others play are mixed together
+    def __init__(self, output=None, tones=()):
+        self.output = output if output is not None else open_output()
+        self.sample_rate = self.output.sample_rate
+        # (frequency, duration, amplitude) -> tone samples, (... , repetitions) -> voice samples
+        self.tones = {}
+        self.voices = {}
+        for frequency, duration in tones:
+            self._get_tone(frequency, duration)
+        self.requests = Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def play(self, frequency, duration, repetitions=1, amplitude=0.5):
+        self.requests.put((frequency, duration, repetitions, amplitude))
+
+    def close(self):
+        # Lets queued and playing tones finish, then releases the output
+        self.requests.put(None)
+        self.thread.join()
+
+    def _get_tone(self, frequency, duration, amplitude=0.5):
+        key = (frequency, duration, amplitude)
+        if key not in self.tones:
+            self.tones[key] = generate_tone(frequency, duration, amplitude, self.sample_rate)
+        return self.tones[key]
+
+    def _get_voice(self, frequency, duration, repetitions, amplitude):
+        key = (frequency, duration, amplitude, repetitions)
+        if key not in self.voices:
+            gap = bytes(4 * int(self.sample_rate * REPEAT_GAP))
+            tone = self._get_tone(frequency, duration, amplitude)
+            self.voices[key] = to_samples(gap.join([tone] * repetitions))
+        return self.voices[key]
+
+    def _run(self):
+        playing, closing = [], False
+        while playing or not closing:
+            try:
+                # An idle engine waits here rather than streaming silence
+                request = self.requests.get(block=not playing and not closing)
+                while True:
+                    if request is None:
+                        closing = True
+                    else:
+                        playing.append([self._get_voice(*request), 0])
+                    request = self.requests.get_nowait()
+            except Empty:
+                pass
+            if playing:
+                self.output.write(self._mix(playing))
+        self.output.close()
+
+    def _mix(self, playing):
+        if len(playing) == 1:
+            samples, position = playing[0]
+            block = samples[position:position + BLOCK_FRAMES]
+        else:
+            length = max(min(BLOCK_FRAMES, len(samples) - position) for samples, position in playing)
+            chunks = [samples[position:position + length] for samples, position in playing]
+            if numpy is not None:
+                block = numpy.zeros(length, dtype=numpy.float32)
+                for chunk in chunks:
+                    block[:len(chunk)] += chunk
+                numpy.clip(block, -1.0, 1.0, out=block)
+            else:
+                mixed = [0.0] * length
+                for chunk in chunks:
+                    for i, sample in enumerate(chunk):
+                        mixed[i] += sample
+                block = array('f', [max(-1.0, min(1.0, sample)) for sample in mixed])
+
+        for voice in playing:
+            voice[1] += BLOCK_FRAMES
+        playing[:] = [voice for voice in playing if voice[1] < len(voice[0])]
+        return block.tobytes()
@@ -0,0 +1,62 @@
+import asyncio
+import selectors
+import time
+
+class MonotonicClock:
+    # Seconds on a clock that wall-clock changes (NTP, DST, manual edits) cannot move
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+class FakeClock:
+    # Advances only when slept on, so schedules can be tested or fast-forwarded instantly
+    def __init__(self, start=0.0):
+        self.time = start
+        self.sleeps = []
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        if seconds > 0:
+            self.time += seconds
+
+    def advance(self, seconds):
+        # Time passing without the program noticing, e.g. a suspended laptop
+        self.time += seconds
+
+class FakeClockSelector(selectors.DefaultSelector):
+    # Sleeps the clock up to the loop's next timer instead of blocking on it. A wait with
+    # no timer at all can only be ended by another thread, so that one still blocks for real.
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout=None):
+        ready = super().select(0)
+        if ready or timeout == 0:
+            return ready
+        if timeout is None:
+            return super().select(None)
+        self.clock.sleep(timeout)
+        return []
+
+class FakeClockEventLoop(asyncio.SelectorEventLoop):
+    # asyncio on a FakeClock: every timer fires in order, without any real waiting
+    def __init__(self, clock):
+        self.clock = clock
+        super().__init__(FakeClockSelector(clock))
+
+    def time(self):
+        return self.clock.now()
+
+def run_on_clock(coro, clock):
+    loop = FakeClockEventLoop(clock)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
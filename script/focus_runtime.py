@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from script.attention import FOCUS_STATES, append_focus_state
+from script.audio_engine import AudioEngine, open_output
+from script.interval_beeper import INTERVAL_CONFIG, IntervalScheduler, load_intervals
+from script.pomodoro_timer import POMODORO_LOG, POMODORO_TONES, log_pomodoro, positive_int
+
+ATTENTION_LOG = Path(r"C:\atari-monk\code\apps-data-store\attention_log.yaml")
+CHECKIN_TONE = (1000.0, 0.15, 1)
+
+class LogWriter:
+    # Every file write in the runtime goes through one queue, in order, off the event loop
+    def __init__(self):
+        self.jobs = asyncio.Queue()
+
+    def submit(self, func, *args):
+        self.jobs.put_nowait((func, args))
+
+    async def run(self):
+        while True:
+            func, args = await self.jobs.get()
+            try:
+                await asyncio.to_thread(func, *args)
+            except OSError as e:
+                print(f"\n⚠️ Could not write log: {e}")
+            finally:
+                self.jobs.task_done()
+
+def read_stdin_lines(loop, queue):
+    # input() blocks, so it lives on a daemon thread that cannot keep the process alive
+    def reader():
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(queue.put_nowait, line.strip())
+    threading.Thread(target=reader, daemon=True).start()
+
+class FocusRuntime:
+    def __init__(self, output=None, work=25 * 60, short_break=5 * 60, long_break=15 * 60,
+                 sessions_before_long_break=4, intervals=INTERVAL_CONFIG, checkin_every=30 * 60,
+                 pomodoro_log=None, attention_log=None, answers=None):
+        self.audio = AudioEngine(output, tones=POMODORO_TONES + [(item['frequency'], item['duration'])
+                                                                 for item in intervals])
+        self.work = work
+        self.short_break = short_break
+        self.long_break = long_break
+        self.sessions_before_long_break = sessions_before_long_break
+        self.intervals = intervals
+        self.checkin_every = checkin_every
+        self.pomodoro_log = pomodoro_log
+        self.attention_log = attention_log
+        # Queue of answers to check-in prompts; stdin unless given
+        self.answers = answers
+        self.completed = 0
+
+    async def run(self, duration=None):
+        loop = asyncio.get_running_loop()
+        self.writer = LogWriter()
+        if self.answers is None and self.checkin_every:
+            self.answers = asyncio.Queue()
+            read_stdin_lines(loop, self.answers)
+
+        tasks = [asyncio.create_task(self.writer.run()), asyncio.create_task(self.pomodoro())]
+        if self.intervals:
+            tasks.append(asyncio.create_task(self.interval_beeps()))
+        if self.checkin_every:
+            tasks.append(asyncio.create_task(self.checkins()))
+        try:
+            await asyncio.sleep(duration if duration is not None else float('inf'))
+        finally:
+            for task in tasks[1:]:
+                task.cancel()
+            await asyncio.gather(*tasks[1:], return_exceptions=True)
+            await self.writer.jobs.join()
+            tasks[0].cancel()
+            self.audio.close()
+
+    async def sleep_until(self, deadline):
+        # Deadlines are on the loop's monotonic clock, so late wakeups never accumulate
+        await asyncio.sleep(max(0, deadline - asyncio.get_running_loop().time()))
+
+    async def pomodoro(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        session = 0
+        while True:
+            session += 1
+            print(f"\n🍅 WORK SESSION {session}/{self.sessions_before_long_break} ({self.work / 60:g} min)")
+            deadline += self.work
+            await self.sleep_until(deadline)
+            self.audio.play(880.0, 0.3, 2)
+            self.completed += 1
+            if self.pomodoro_log:
+                self.writer.submit(log_pomodoro, self.pomodoro_log, session, self.work / 60)
+
+            if session % self.sessions_before_long_break == 0:
+                print(f"\n🌴 LONG BREAK ({self.long_break / 60:g} min)")
+                deadline += self.long_break
+                await self.sleep_until(deadline)
+                self.audio.play(440.0, 0.3, 3)
+            else:
+                print(f"\n☕ SHORT BREAK ({self.short_break / 60:g} min)")
+                deadline += self.short_break
+                await self.sleep_until(deadline)
+                self.audio.play(660.0, 0.3, 2)
+
+    async def interval_beeps(self):
+        loop = asyncio.get_running_loop()
+        scheduler = IntervalScheduler(self.intervals, loop.time())
+        while True:
+            await self.sleep_until(scheduler.next_deadline())
+            for item, missed in scheduler.pop_due(loop.time()):
+                self.audio.play(item['frequency'], item['duration'], item['repetitions'])
+                skipped = f", {missed} missed" if missed else ""
+                print(f"\n⏰ {item['message']} ({time.strftime('%H:%M:%S')}{skipped})")
+
+    async def checkins(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        options = ", ".join(f"{key}: {state}" for key, state in FOCUS_STATES.items())
+        while True:
+            deadline += self.checkin_every
+            await self.sleep_until(deadline)
+            self.audio.play(*CHECKIN_TONE)
+            print(f"\n🔔 Focus check-in - {options}\n   Reply with a number and an optional note (Enter to skip)")
+            answer = await self.answers.get()
+            choice, _, note = answer.partition(' ')
+            if choice in FOCUS_STATES:
+                message = FOCUS_STATES[choice] + (f" - {note.strip().lower()}" if note.strip() else "")
+                if self.attention_log:
+                    self.writer.submit(append_focus_state, self.attention_log, message)
+                print(f"✅ Logged: {message}")
+            # Missed check-ins while waiting for an answer are skipped, not stacked up
+            now = loop.time()
+            if now > deadline:
+                deadline += (now - deadline) // self.checkin_every * self.checkin_every
+
+def main():
+    parser = argparse.ArgumentParser(description='Pomodoro, interval beeps and focus check-ins in one process')
+    parser.add_argument('--work', type=float, default=25, help='Work session length in minutes')
+    parser.add_argument('--short-break', type=float, default=5, help='Short break length in minutes')
+    parser.add_argument('--long-break', type=float, default=15, help='Long break length in minutes')
+    parser.add_argument('--long-every', type=positive_int, default=4, help='Work sessions before a long break')
+    parser.add_argument('--intervals', help='JSON file of interval beeps (default: the interval_beeper ones)')
+    parser.add_argument('--no-intervals', action='store_true', help='Disable interval beeps')
+    parser.add_argument('--checkin', type=float, default=30, help='Minutes between focus check-ins (0 disables)')
+    parser.add_argument('--pomodoro-log', default=str(POMODORO_LOG), help="Completed pomodoros log ('' to disable)")
+    parser.add_argument('--attention-log', default=str(ATTENTION_LOG), help="Focus check-in log ('' to disable)")
+    parser.add_argument('--audio', default='pyaudio', help="'pyaudio', 'null', or a .wav file to write instead")
+    args = parser.parse_args()
+
+    intervals = [] if args.no_intervals else load_intervals(args.intervals) if args.intervals else INTERVAL_CONFIG
+    runtime = FocusRuntime(
+        open_output(args.audio), args.work * 60, args.short_break * 60, args.long_break * 60, args.long_every,
+        intervals, args.checkin * 60,
+        pomodoro_log=args.pomodoro_log or None,
+        attention_log=Path(args.attention_log) if args.attention_log else None,
+    )
+    print("\n🎯 Focus runtime started (Ctrl+C to stop)")
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        pass
+    print(f"\n⏹️ Focus runtime stopped ({runtime.completed} pomodoros completed)")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-import math
-import struct
+import argparse
+import heapq
+import json
 import time
-import pyaudio
-import threading
-from queue import Queue
+from script.audio_engine import AudioEngine, open_output
+from script.clock import MonotonicClock
 
 # ===== CONFIGURATION =====
 INTERVAL_CONFIG = [
@@ -34,89 +34,99 @@ INTERVAL_CONFIG = [
 ]
 # ===== END CONFIG =====
 
-class Beeper:
-    def __init__(self):
-        self.sample_rate = 44100
-        self.p = pyaudio.PyAudio()
-        self.queue = Queue()
-        self.thread = threading.Thread(target=self._run, daemon=True)
-        self.thread.start()
-        
-    def _generate_tone(self, frequency, duration, amplitude=0.5):
-        num_samples = int(self.sample_rate * duration)
-        samples = (amplitude * math.sin(2 * math.pi * frequency * (i / self.sample_rate)) for i in range(num_samples))
-        return b''.join(struct.pack('f', s) for s in samples)
-    
-    def _run(self):
-        stream = None
-        try:
-            stream = self.p.open(format=pyaudio.paFloat32, channels=1, rate=self.sample_rate, output=True)
-            while True:
-                frequency, duration, repetitions = self.queue.get()
-                samples = self._generate_tone(frequency, duration)
-                for _ in range(repetitions):
-                    if stream.is_active():
-                        stream.write(samples)
-                        time.sleep(0.1)
-        finally:
-            if stream:
-                stream.stop_stream()
-                stream.close()
-    
-    def play(self, frequency, duration, repetitions=1):
-        self.queue.put((frequency, duration, repetitions))
-    
-    def __del__(self):
-        self.p.terminate()
+INTERVAL_DEFAULTS = {'frequency': 1000, 'duration': 0.3, 'repetitions': 1}
+
+def load_intervals(path):
+    # JSON list shaped like INTERVAL_CONFIG; only 'name' and 'interval' (seconds) are required
+    with open(path, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+    intervals = []
+    for item in items:
+        if not item.get('name') or not item.get('interval') or item['interval'] <= 0:
+            raise ValueError(f"Each interval needs a name and a positive 'interval' in seconds: {item}")
+        intervals.append({**INTERVAL_DEFAULTS, 'message': f"{item['name']} has passed", **item})
+    return intervals
+
+class IntervalScheduler:
+    # Min-heap of (deadline, index, interval) on the clock's timeline. Deadlines stay on the grid
+    # start + k * interval, so late wakeups never push later beeps back.
+    def __init__(self, intervals, start):
+        self.heap = [(start + item['interval'], i, item) for i, item in enumerate(intervals)]
+        heapq.heapify(self.heap)
+
+    def next_deadline(self):
+        return self.heap[0][0]
+
+    def pop_due(self, now):
+        # (interval, missed) for everything due by `now`; deadlines slept through are coalesced into one alert
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, i, item = heapq.heappop(self.heap)
+            missed = int((now - deadline) // item['interval'])
+            heapq.heappush(self.heap, (deadline + (missed + 1) * item['interval'], i, item))
+            due.append((item, missed))
+        return due
 
 class IntervalBeeper:
-    def __init__(self):
-        self.beeper = Beeper()
+    def __init__(self, output=None, intervals=INTERVAL_CONFIG, clock=None):
+        self.intervals = intervals
+        self.clock = clock or MonotonicClock()
+        self.beeper = AudioEngine(output, tones=[(item['frequency'], item['duration']) for item in intervals])
         self.running = False
 
-    def start(self):
+    def start(self, duration=None):
+        # Runs until stopped, or for `duration` seconds of clock time
         self.running = True
-        last_times = {item['name']: time.time() for item in INTERVAL_CONFIG}
-        
+        started = self.clock.now()
+        scheduler = IntervalScheduler(self.intervals, started)
+
         print("\n🔊 Starting interval beeper (Ctrl+C to stop)")
-        for item in INTERVAL_CONFIG:
-            mins = item['interval'] // 60
-            print(f"{item['name']}: every {mins} min - {item['repetitions']} beep(s) at {item['frequency']}Hz")
-        
+        for item in self.intervals:
+            mins = item['interval'] / 60
+            print(f"{item['name']}: every {mins:g} min - {item['repetitions']} beep(s) at {item['frequency']}Hz")
+
         try:
             while self.running:
-                current_time = time.time()
-                
-                for item in INTERVAL_CONFIG:
-                    if current_time - last_times[item['name']] >= item['interval']:
-                        self.beeper.play(
-                            frequency=item['frequency'],
-                            duration=item['duration'],
-                            repetitions=item['repetitions']
-                        )
-                        print(f"\n⏰ {item['message']} ({time.strftime('%H:%M:%S')})")
-                        last_times[item['name']] = current_time
-                
-                time.sleep(1)
-                
+                deadline = scheduler.next_deadline()
+                if duration is not None and deadline > started + duration:
+                    break
+                # Sleep exactly until the earliest deadline instead of polling
+                self.clock.sleep(deadline - self.clock.now())
+                for item, missed in scheduler.pop_due(self.clock.now()):
+                    self.beeper.play(
+                        frequency=item['frequency'],
+                        duration=item['duration'],
+                        repetitions=item['repetitions']
+                    )
+                    skipped = f", {missed} missed" if missed else ""
+                    print(f"\n⏰ {item['message']} ({time.strftime('%H:%M:%S')}{skipped})")
+
         except KeyboardInterrupt:
-            self.stop()
-            
+            pass
+        self.stop()
+
     def stop(self):
         self.running = False
+        self.beeper.close()
         print("\n⏹️ Beeper stopped")
 
 def main():
-    print("""
+    parser = argparse.ArgumentParser(description='Beep at fixed intervals')
+    parser.add_argument('--audio', default='pyaudio', help="'pyaudio', 'null', or a .wav file to write instead")
+    parser.add_argument('--config', help='JSON file with a list of intervals (default: the built-in ones)')
+    args = parser.parse_args()
+    intervals = load_intervals(args.config) if args.config else INTERVAL_CONFIG
+
+    print(f"""
     ⏱️ Interval Beeper
     -----------------
-    Running with pre-configured intervals:
+    Running with {'intervals from ' + args.config if args.config else 'pre-configured intervals'}:
     """)
     
-    for item in INTERVAL_CONFIG:
-        print(f"- {item['name']}: every {item['interval']//60} min")
+    for item in intervals:
+        print(f"- {item['name']}: every {item['interval'] / 60:g} min")
     
-    beeper = IntervalBeeper()
+    beeper = IntervalBeeper(open_output(args.audio), intervals)
     beeper.start()
 
 if __name__ == "__main__":
@@ -1,110 +1,135 @@
+import argparse
+import datetime
+import json
 import math
-import struct
-import time
-import pyaudio
-import threading
-from queue import Queue
-
-class Beeper:
-    def __init__(self):
-        self.sample_rate = 44100
-        self.p = pyaudio.PyAudio()
-        self.queue = Queue()
-        self.thread = threading.Thread(target=self._run, daemon=True)
-        self.thread.start()
-        
-    def _generate_tone(self, frequency, duration, amplitude=0.5):
-        num_samples = int(self.sample_rate * duration)
-        samples = (amplitude * math.sin(2 * math.pi * frequency * (i / self.sample_rate)) for i in range(num_samples))
-        return b''.join(struct.pack('f', s) for s in samples)
-    
-    def _run(self):
-        stream = None
-        try:
-            stream = self.p.open(format=pyaudio.paFloat32, channels=1, rate=self.sample_rate, output=True)
-            while True:
-                frequency, duration, repetitions = self.queue.get()
-                samples = self._generate_tone(frequency, duration)
-                for _ in range(repetitions):
-                    if stream.is_active():
-                        stream.write(samples)
-                        time.sleep(0.1)
-        finally:
-            if stream:
-                stream.stop_stream()
-                stream.close()
-    
-    def play(self, frequency, duration, repetitions=1):
-        self.queue.put((frequency, duration, repetitions))
-    
-    def __del__(self):
-        self.p.terminate()
+from pathlib import Path
+from script.audio_engine import AudioEngine, open_output
+from script.clock import FakeClock, MonotonicClock
+
+# Work end, short break end, long break end
+POMODORO_TONES = [(880.0, 0.3), (660.0, 0.3), (440.0, 0.3)]
+POMODORO_LOG = Path(r"C:\atari-monk\code\apps-data-store\pomodoro_log.jsonl")
+
+def log_pomodoro(log_file, session, minutes):
+    # One JSON object per completed work session, appended
+    record = {'completed': datetime.datetime.now().isoformat(timespec='seconds'),
+              'session': session, 'minutes': minutes}
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+def positive_int(text):
+    # argparse type for counts that are used as a divisor
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
 
 class PomodoroTimer:
-    def __init__(self):
-        self.beeper = Beeper()
+    def __init__(self, output=None, work=25 * 60, short_break=5 * 60, long_break=15 * 60,
+                 sessions_before_long_break=4, clock=None, log_file=None, show_ticks=True):
+        self.beeper = AudioEngine(output, tones=POMODORO_TONES)
+        self.clock = clock or MonotonicClock()
+        self.log_file = log_file
+        self.show_ticks = show_ticks
         self.running = False
         self.session_count = 0
-        self.work_duration = 25 * 60  # 25 minutes
-        self.short_break = 5 * 60      # 5 minutes
-        self.long_break = 15 * 60     # 15 minutes
-        self.sessions_before_long_break = 4
+        self.completed = 0
+        self.work_duration = work
+        self.short_break = short_break
+        self.long_break = long_break
+        self.sessions_before_long_break = sessions_before_long_break
 
-    def start(self):
+    def start(self, cycles=None):
+        # Runs until stopped, or for `cycles` work sessions with their breaks
         self.running = True
         self.session_count = 0
-        
+
         try:
-            while self.running:
+            while self.running and (cycles is None or self.session_count < cycles):
                 self.session_count += 1
-                
+
                 # Work session
-                print(f"\n🍅 WORK SESSION {self.session_count}/{self.sessions_before_long_break} (25 min)")
-                self._countdown(self.work_duration)
+                print(f"\n🍅 WORK SESSION {self.session_count}/{self.sessions_before_long_break} "
+                      f"({self.work_duration / 60:g} min)")
+                if not self._countdown(self.work_duration):
+                    break
                 self.beeper.play(880.0, 0.3, 2)  # High pitch double beep
-                
+                self.completed += 1
+                if self.log_file:
+                    log_pomodoro(self.log_file, self.session_count, self.work_duration / 60)
+
                 # Check if it's time for long break
                 if self.session_count % self.sessions_before_long_break == 0:
                     # Long break
-                    print("\n🌴 LONG BREAK (15 min)")
+                    print(f"\n🌴 LONG BREAK ({self.long_break / 60:g} min)")
                     self._countdown(self.long_break)
                     self.beeper.play(440.0, 0.3, 3)  # Low pitch triple beep
                 else:
                     # Short break
-                    print("\n☕ SHORT BREAK (5 min)")
+                    print(f"\n☕ SHORT BREAK ({self.short_break / 60:g} min)")
                     self._countdown(self.short_break)
                     self.beeper.play(660.0, 0.3, 2)  # Medium pitch double beep
-                
+
         except KeyboardInterrupt:
-            self.stop()
+            pass
+        self.stop()
 
     def _countdown(self, seconds):
-        for remaining in range(seconds, 0, -1):
-            if not self.running:
+        # Counts down to an absolute deadline, so time spent printing or oversleeping never adds up.
+        # Returns False if stopped early.
+        deadline = self.clock.now() + seconds
+        while self.running:
+            remaining = deadline - self.clock.now()
+            if remaining <= 0:
                 break
-            mins, secs = divmod(remaining, 60)
-            print(f"\rTime remaining: {mins:02d}:{secs:02d}", end="")
-            time.sleep(1)
-        print("\r" + " " * 30 + "\r", end="")  # Clear line
+            if self.show_ticks:
+                mins, secs = divmod(math.ceil(remaining), 60)
+                print(f"\rTime remaining: {mins:02d}:{secs:02d}", end="")
+            # Wake when the displayed second changes
+            self.clock.sleep(remaining % 1 or 1)
+        if self.show_ticks:
+            print("\r" + " " * 30 + "\r", end="")  # Clear line
+        return self.running
 
     def stop(self):
         self.running = False
-        print("\n⏹️ Pomodoro stopped")
+        self.beeper.close()
+        print(f"\n⏹️ Pomodoro stopped ({self.completed} completed)")
 
 def main():
-    print("""
+    parser = argparse.ArgumentParser(description='Pomodoro timer')
+    parser.add_argument('--work', type=float, default=25, help='Work session length in minutes')
+    parser.add_argument('--short-break', type=float, default=5, help='Short break length in minutes')
+    parser.add_argument('--long-break', type=float, default=15, help='Long break length in minutes')
+    parser.add_argument('--long-every', type=positive_int, default=4, help='Work sessions before a long break')
+    parser.add_argument('--cycles', type=int, help='Stop after this many work sessions')
+    parser.add_argument('--log', default=str(POMODORO_LOG), help="File completed pomodoros are appended to ('' to disable)")
+    parser.add_argument('--fast-forward', action='store_true',
+                        help='Run on a simulated clock without waiting (implies --audio null, no log, one full round)')
+    parser.add_argument('--audio', default='pyaudio', help="'pyaudio', 'null', or a .wav file to write instead")
+    args = parser.parse_args()
+
+    print(f"""
     🍅 Pomodoro Timer
     -----------------
-    Work: 25 min
-    Short Break: 5 min
-    Long Break: 15 min
-    Long break after 4 sessions
-    
+    Work: {args.work:g} min
+    Short Break: {args.short_break:g} min
+    Long Break: {args.long_break:g} min
+    Long break after {args.long_every} sessions
+
     Press Ctrl+C to stop
     """)
-    
-    timer = PomodoroTimer()
-    timer.start()
+
+    if args.fast_forward:
+        timer = PomodoroTimer(open_output('null'), args.work * 60, args.short_break * 60, args.long_break * 60,
+                              args.long_every, clock=FakeClock(), show_ticks=False)
+        timer.start(args.cycles or args.long_every)
+        print(f"Simulated {timer.clock.now() / 60:g} min")
+        return
+
+    timer = PomodoroTimer(open_output(args.audio), args.work * 60, args.short_break * 60, args.long_break * 60,
+                          args.long_every, log_file=args.log or None)
+    timer.start(args.cycles)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
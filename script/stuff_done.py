@@ -1,24 +1,236 @@
 from pathlib import Path
 import yaml
 import datetime
+import os
+import re
 import sys
+import time
+
+# libyaml bindings are several times faster than the pure-Python loader/dumper when installed
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# A day's logged events are folded into its file once this many have piled up
+COMPACT_EVENTS = 20
+DAY_FILE = re.compile(r'^(\d{4}-\d{2}-\d{2})(\.events)?\.yaml$')
+# Written once day files carry full timestamps and durations in seconds
+TIMESTAMPS_MARKER = 'timestamps.migrated'
+# save_day writes a day's seq as its first line; every appended event ends with its own seq
+DAY_SEQ = re.compile(r'^seq: (\d+)$')
+EVENT_SEQ = re.compile(rb'^  seq: (\d+)\n', re.M)
+# Bytes read back from the end of an events file to find the newest seq
+TAIL_BYTES = 4096
 
 def get_current_time():
-    return datetime.datetime.now().strftime('%H:%M')
+    return datetime.datetime.now().isoformat(timespec='seconds')
 
 def get_current_date():
     return datetime.datetime.now().strftime('%Y-%m-%d')
 
-def load_log_data(file_path):
+def read_yaml(file_path):
+    try:
+        with open(file_path, 'r') as file:
+            return yaml.load(file, Loader=SafeLoader)
+    except FileNotFoundError:
+        return None
+
+def write_yaml(file_path, data):
+    # Write next to the old file and swap it in
+    temp_path = Path(file_path).with_suffix('.tmp')
+    with open(temp_path, 'w') as file:
+        yaml.dump(data, file, Dumper=SafeDumper, sort_keys=False, default_flow_style=False)
+    os.replace(temp_path, file_path)
+
+def append_yaml_item(file_path, item):
+    # A file of appended list items stays one valid YAML sequence
+    with open(file_path, 'a') as file:
+        file.write(yaml.dump([item], Dumper=SafeDumper, sort_keys=False, default_flow_style=False))
+
+def get_day_file(log_dir, date):
+    return Path(log_dir) / f"{date}.yaml"
+
+def get_events_file(file_path):
+    # Task starts, notes and completions since the last compaction, appended as YAML list items
+    return Path(file_path).with_suffix('.events.yaml')
+
+def get_descriptions_file(log_dir):
+    return Path(log_dir) / 'descriptions.yaml'
+
+def load_events(file_path):
+    try:
+        with open(get_events_file(file_path), 'rb') as file:
+            text = file.read()
+    except FileNotFoundError:
+        return []
+    complete = [match.end() for match in EVENT_SEQ.finditer(text)]
+    # Anything after the last seq is an event torn by an interrupted append
+    if complete:
+        text = text[:complete[-1]]
+    return yaml.load(text, Loader=SafeLoader) or []
+
+def read_day_file(file_path):
+    # (tasks, seq): a compacted day file records the seq of the last event folded into it
+    raw = read_yaml(file_path)
+    if isinstance(raw, dict):
+        return raw.get('tasks') or [], raw.get('seq', 0)
+    return raw or [], 0
+
+def read_day_seq(file_path):
     try:
         with open(file_path, 'r') as file:
-            return yaml.safe_load(file) or {}
+            match = DAY_SEQ.match(file.readline())
     except FileNotFoundError:
-        return {}
+        return 0
+    return int(match.group(1)) if match else read_day_file(file_path)[1]
+
+def read_last_event_seq(events_file):
+    # The newest seq from the end of the file; a torn event after it is cut off so the next
+    # append starts on a clean line. None if the file has no numbered events.
+    try:
+        with open(events_file, 'r+b') as file:
+            size = file.seek(0, os.SEEK_END)
+            start = max(size - TAIL_BYTES, 0)
+            file.seek(start)
+            tail = file.read()
+            complete = list(EVENT_SEQ.finditer(tail))
+            if not complete and start:
+                # An event bigger than the tail; fall back to scanning the whole file
+                file.seek(0)
+                start, tail = 0, file.read()
+                complete = list(EVENT_SEQ.finditer(tail))
+            if not complete:
+                return None
+            if start + complete[-1].end() < size:
+                file.truncate(start + complete[-1].end())
+            return int(complete[-1].group(1))
+    except FileNotFoundError:
+        return None
+
+def append_event(file_path, event):
+    # Numbered after everything already logged, so a replay can tell which events are folded in
+    events_file = get_events_file(file_path)
+    seq = read_last_event_seq(events_file)
+    if seq is None:
+        # No events yet, or only ones logged before events were numbered
+        seq = max([read_day_seq(file_path)] + [item.get('seq', 0) for item in load_events(file_path)])
+    append_yaml_item(events_file, {**event, 'seq': seq + 1})
+
+def apply_event(tasks, event):
+    if event['event'] == 'start':
+        tasks.append(event['task'])
+    elif event['event'] == 'note':
+        tasks[event['index']]['notes'].append(event['note'])
+    elif event['event'] == 'complete':
+        tasks[event['index']].update(end=event['end'], duration=event['duration'],
+                                     duration_seconds=event.get('duration_seconds'))
 
-def save_log_data(file_path, data):
-    with open(file_path, 'w') as file:
-        yaml.dump(data, file, sort_keys=False, default_flow_style=False)
+def load_day_state(log_dir, date):
+    day_file = get_day_file(log_dir, date)
+    tasks, seq = read_day_file(day_file)
+    for event in load_events(day_file):
+        # Skip events a compaction folded in before it was interrupted
+        if 'seq' in event and event['seq'] <= seq:
+            continue
+        apply_event(tasks, event)
+        seq = max(seq, event.get('seq', 0))
+    return tasks, seq
+
+def load_day(log_dir, date):
+    return load_day_state(log_dir, date)[0]
+
+def save_day(log_dir, date, tasks, seq=0):
+    # The events file is only removed once the day file records the last event it holds
+    day_file = get_day_file(log_dir, date)
+    write_yaml(day_file, {'seq': seq, 'tasks': tasks})
+    get_events_file(day_file).unlink(missing_ok=True)
+
+def compact_day(log_dir, date, min_events=COMPACT_EVENTS):
+    day_file = get_day_file(log_dir, date)
+    last = read_last_event_seq(get_events_file(day_file))
+    # Seqs run on from the day file's, so the difference is the number of events not folded in
+    pending = last - read_day_seq(day_file) if last is not None else len(load_events(day_file))
+    if pending >= min_events:
+        save_day(log_dir, date, *load_day_state(log_dir, date))
+
+def list_dates(log_dir, first=None, last=None):
+    # Dates come from file names, so picking a range never opens other days
+    try:
+        names = os.listdir(log_dir)
+    except FileNotFoundError:
+        return []
+    dates = {match.group(1) for match in map(DAY_FILE.match, names) if match}
+    return sorted(d for d in dates if (not first or d >= first) and (not last or d <= last))
+
+def load_log_data(log_dir, first=None, last=None):
+    return {date: load_day(log_dir, date) for date in list_dates(log_dir, first, last)}
+
+def append_description(log_dir, date, description):
+    append_yaml_item(get_descriptions_file(log_dir), {'date': date, 'description': description})
+
+def load_descriptions(log_dir):
+    # Task descriptions by date without reading any day file or note
+    descriptions_file = get_descriptions_file(log_dir)
+    if not descriptions_file.exists():
+        rebuild_descriptions(log_dir)
+    descriptions = {}
+    for item in read_yaml(descriptions_file) or []:
+        descriptions.setdefault(item['date'], []).append(item['description'])
+    return descriptions
+
+def rebuild_descriptions(log_dir):
+    items = [
+        {'date': date, 'description': get_task_description(task)}
+        for date, tasks in load_log_data(log_dir).items() for task in tasks
+    ]
+    write_yaml(get_descriptions_file(log_dir), items)
+
+def migrate_log_file(log_file, log_dir):
+    # One-off split of the old single-file log (and its pending events) into day files
+    if Path(log_dir).exists() or not Path(log_file).exists():
+        return
+    data = read_yaml(log_file) or {}
+    for event in load_events(log_file):
+        apply_event(data.setdefault(event['date'], []), event)
+    Path(log_dir).mkdir(parents=True)
+    for date, tasks in data.items():
+        save_day(log_dir, str(date), tasks)
+    rebuild_descriptions(log_dir)
+    print(f"Split {log_file} into {len(data)} day files in {log_dir}")
+
+def to_timestamp(date, clock, after=None):
+    # Old records only kept 'HH:MM'; anything earlier than `after` happened on the next day
+    if clock is None or 'T' in clock:
+        return clock
+    value = datetime.datetime.fromisoformat(f"{date}T{clock}")
+    if after and value < datetime.datetime.fromisoformat(after):
+        value += datetime.timedelta(days=1)
+    return value.isoformat(timespec='seconds')
+
+def migrate_task(date, task):
+    task['start'] = to_timestamp(date, task.get('start'))
+    for note in get_task_notes(task):
+        note['time'] = to_timestamp(date, note.get('time'), task['start'])
+    task['end'] = to_timestamp(date, task.get('end'), task['start'])
+    seconds = calculate_duration(task['start'], task['end'])
+    task['duration_seconds'] = seconds
+    task['duration'] = format_duration(seconds) if seconds is not None else None
+
+def migrate_timestamps(log_dir):
+    # One-off rewrite of minute-resolution 'HH:MM' records into full timestamps
+    marker = Path(log_dir) / TIMESTAMPS_MARKER
+    if marker.exists() or not Path(log_dir).exists():
+        return
+    dates = list_dates(log_dir)
+    for date in dates:
+        tasks, seq = load_day_state(log_dir, date)
+        for task in tasks:
+            migrate_task(date, task)
+        save_day(log_dir, date, tasks, seq)
+    marker.touch()
+    if dates:
+        print(f"Converted {len(dates)} day files to full timestamps")
 
 def create_task_record(description):
     return {
@@ -29,7 +241,7 @@ def create_task_record(description):
         'notes': []
     }
 
-def add_notes_to_task(task_record, log_data, current_date, task_index):
+def add_notes_to_task(task_record, current_date, task_index):
     while True:
         note = input("Add note (or 'done' to finish): ").strip()
         if note.lower() == 'done':
@@ -39,30 +251,34 @@ def add_notes_to_task(task_record, log_data, current_date, task_index):
             'content': note[:200]
         }
         task_record['notes'].append(new_note)
-        # Save after each note
-        log_data[current_date][task_index] = task_record
-        save_log_data(LOG_FILE, log_data)
+        # Log each note as it is written; the day file is only rewritten on compaction
+        append_event(get_day_file(LOG_DIR, current_date),
+                     {'event': 'note', 'date': current_date, 'index': task_index, 'note': new_note})
 
 def calculate_duration(start, end):
+    # Seconds between two ISO timestamps, or None when either is missing or malformed
     try:
-        start_time = datetime.datetime.strptime(start, '%H:%M')
-        end_time = datetime.datetime.strptime(end, '%H:%M')
-        duration = end_time - start_time
-        total_seconds = duration.total_seconds()
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        return f"{hours:02d}:{minutes:02d}"
-    except:
-        return "00:00"
-
-def complete_task_record(task_record, log_data, current_date, task_index):
+        delta = datetime.datetime.fromisoformat(end) - datetime.datetime.fromisoformat(start)
+    except (TypeError, ValueError):
+        return None
+    return max(0, round(delta.total_seconds()))
+
+def format_duration(seconds):
+    hours, rest = divmod(int(seconds or 0), 3600)
+    return f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+def complete_task_record(task_record, current_date, task_index, started):
+    # Measured on the monotonic clock, so wall-clock jumps (DST, NTP) do not skew it
+    seconds = round(time.monotonic() - started)
     task_record['end'] = get_current_time()
-    duration = calculate_duration(task_record['start'], task_record['end'])
-    print(f"Task duration: {duration}")
-    task_record['duration'] = duration
-    # Save completion
-    log_data[current_date][task_index] = task_record
-    save_log_data(LOG_FILE, log_data)
+    task_record['duration_seconds'] = seconds
+    task_record['duration'] = format_duration(seconds)
+    print(f"Task duration: {task_record['duration']}")
+    append_event(get_day_file(LOG_DIR, current_date), {
+        'event': 'complete', 'date': current_date, 'index': task_index,
+        'end': task_record['end'], 'duration': task_record['duration'], 'duration_seconds': seconds
+    })
+    compact_day(LOG_DIR, current_date)
 
 def get_task_description(task):
     return task.get('description', 'No description')
@@ -70,51 +286,93 @@ def get_task_description(task):
 def get_task_notes(task):
     return task.get('notes', [])
 
+def get_task_seconds(task):
+    seconds = task.get('duration_seconds')
+    return seconds if seconds is not None else calculate_duration(task.get('start'), task.get('end')) or 0
+
+def format_time(value, date):
+    # Clock time, with the date prepended for anything that did not happen on `date`
+    if not value or 'T' not in value:
+        return value or ''
+    day, clock = value.split('T', 1)
+    return clock if day == date else f"{day} {clock}"
+
+def show_task(task, date):
+    print(f"  {get_task_description(task)}")
+    print(f"  {format_time(task.get('start'), date)} - {format_time(task.get('end'), date)} "
+          f"({task.get('duration') or '00:00:00'})")
+    for note in get_task_notes(task):
+        print(f"    {format_time(note.get('time'), date)}: {note.get('content', '')}")
+
+def get_week(date):
+    year, week, _ = datetime.date.fromisoformat(date).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def aggregate_totals(log_dir, first=None, last=None):
+    # Seconds per day and per ISO week in one pass; a task counts towards the day it started
+    days, weeks = {}, {}
+    for date in list_dates(log_dir, first, last):
+        seconds = sum(get_task_seconds(task) for task in load_day(log_dir, date))
+        days[date] = seconds
+        weeks[get_week(date)] = weeks.get(get_week(date), 0) + seconds
+    return days, weeks
+
+def show_report(days, weeks):
+    if not days:
+        print("No tasks logged.")
+        return
+    for week in sorted(weeks, reverse=True):
+        print(f"\n{week}  {format_duration(weeks[week])}")
+        for date in sorted((d for d in days if get_week(d) == week), reverse=True):
+            print(f"  {date}  {format_duration(days[date])}")
+    print(f"\nTotal: {format_duration(sum(days.values()))} over {len(days)} days")
+
 def show_full_log(data):
     for date, tasks in sorted(data.items(), reverse=True):
         print(f"\n{date}")
         for task in tasks:
-            print(f"  {get_task_description(task)}")
-            print(f"  {task.get('start', '')} - {task.get('end', '')} ({task.get('duration', '00:00')})")
-            for note in get_task_notes(task):
-                print(f"    {note.get('time', '')}: {note.get('content', '')}")
+            show_task(task, date)
 
 def show_daily_log(data, date):
     if date not in data:
         print("No tasks for this date.")
         return
-    
+
     print(f"\n{date}")
     for task in data[date]:
-        print(f"  {get_task_description(task)}")
-        print(f"  {task.get('start', '')} - {task.get('end', '')} ({task.get('duration', '00:00')})")
-        for note in get_task_notes(task):
-            print(f"    {note.get('time', '')}: {note.get('content', '')}")
+        show_task(task, date)
 
-def show_descriptions_only(data):
-    for date, tasks in sorted(data.items(), reverse=True):
+def show_descriptions_only(descriptions):
+    for date, items in sorted(descriptions.items(), reverse=True):
         print(f"\n{date}")
-        for task in tasks:
-            print(f"  {get_task_description(task)}")
+        for description in items:
+            print(f"  {description}")
+
+def parse_date_range(text, default_date):
+    # "2024-05-01" or "2024-05-01..2024-05-07"; either end of a range may be left open
+    text = text or default_date
+    if '..' not in text:
+        return text, text
+    first, last = text.split('..', 1)
+    return first.strip() or None, last.strip() or None
 
 def handle_new_task():
-    log_data = load_log_data(LOG_FILE)
     current_date = get_current_date()
+    task_index = len(load_day(LOG_DIR, current_date))
 
     description = input("Enter task description: ").strip()
     task_record = create_task_record(description)
-    
+    started = time.monotonic()
+
     # Initialize task in log
-    if current_date not in log_data:
-        log_data[current_date] = []
-    task_index = len(log_data[current_date])
-    log_data[current_date].append(task_record)
-    save_log_data(LOG_FILE, log_data)
+    append_event(get_day_file(LOG_DIR, current_date),
+                 {'event': 'start', 'date': current_date, 'index': task_index, 'task': task_record})
+    append_description(LOG_DIR, current_date, task_record['description'])
 
     print("Task started. Add notes as needed...")
-    add_notes_to_task(task_record, log_data, current_date, task_index)
+    add_notes_to_task(task_record, current_date, task_index)
 
-    complete_task_record(task_record, log_data, current_date, task_index)
+    complete_task_record(task_record, current_date, task_index, started)
 
 def display_main_menu():
     print("\nTask Tracker:")
@@ -122,21 +380,29 @@ def display_main_menu():
     print("2. View complete log")
     print("3. View specific date log")
     print("4. View descriptions only")
-    print("5. Exit")
+    print("5. Daily and weekly totals")
+    print("6. Exit")
     return input("Select: ").strip()
 
 def handle_menu_choice(choice):
     if choice == '1':
         handle_new_task()
     elif choice == '2':
-        show_full_log(load_log_data(LOG_FILE))
+        show_full_log(load_log_data(LOG_DIR))
     elif choice == '3':
         default_date = get_current_date()
-        date = input(f"Date [{default_date}]: ").strip() or default_date
-        show_daily_log(load_log_data(LOG_FILE), date)
+        text = input(f"Date or range (from..to) [{default_date}]: ").strip()
+        first, last = parse_date_range(text, default_date)
+        if first == last:
+            tasks = load_day(LOG_DIR, first)
+            show_daily_log({first: tasks} if tasks else {}, first)
+        else:
+            show_full_log(load_log_data(LOG_DIR, first, last))
     elif choice == '4':
-        show_descriptions_only(load_log_data(LOG_FILE))
+        show_descriptions_only(load_descriptions(LOG_DIR))
     elif choice == '5':
+        show_report(*aggregate_totals(LOG_DIR))
+    elif choice == '6':
         return False
     else:
         print("Invalid selection.")
@@ -144,6 +410,9 @@ def handle_menu_choice(choice):
 
 def run_application():
     try:
+        migrate_log_file(LOG_FILE, LOG_DIR)
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        migrate_timestamps(LOG_DIR)
         while True:
             choice = display_main_menu()
             if not handle_menu_choice(choice):
@@ -151,7 +420,9 @@ def run_application():
     except KeyboardInterrupt:
         print("\nApplication interrupted.")
 
+# Old single-file log; split into LOG_DIR on first run
 LOG_FILE = Path(r'c:\atari-monk\code\apps-data-store\stuff_done_log.yaml')
+LOG_DIR = Path(r'c:\atari-monk\code\apps-data-store\stuff_done')
 
 def main():
     try:
@@ -161,4 +432,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
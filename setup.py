@@ -15,6 +15,7 @@ setup(
             "little_star=script.little_star:main",
             "pomodoro_timer=script.pomodoro_timer:main",
             "stuff_done=script.stuff_done:main",
+            "focus_runtime=script.focus_runtime:main",
             # tools
             "blog=tool.blog.cli:main",
             "tracker=tool.tracker.cli:main",
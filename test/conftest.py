@@ -0,0 +1,40 @@
+import io
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import pytest
+
+from tool.tracker import service as service_module
+from tool.tracker.events import parse_event_line
+
+TRACKER_COMMANDS = {
+    "start": "start_tracking", "pause": "pause_tracking", "resume": "resume_tracking",
+    "stop": "stop_tracking", "note": "add_note",
+}
+
+
+class _PinnedDatetime(datetime):
+    # Stands in for the service's datetime so a command can be issued "at" a given time
+    pinned = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.pinned or datetime.now(tz)
+
+
+@pytest.fixture
+def track(monkeypatch):
+    # Builds tracker history through the public commands, one per "<ISO time> <command> [note]"
+    # line, each run as if typed at that time; the commands' own output is dropped
+    monkeypatch.setattr(service_module, "datetime", _PinnedDatetime)
+
+    def run(service, lines):
+        with redirect_stdout(io.StringIO()):
+            for line in lines:
+                time, kind, text = parse_event_line(line)
+                _PinnedDatetime.pinned = datetime.fromisoformat(time)
+                try:
+                    getattr(service, TRACKER_COMMANDS[kind])(*([text] if text else []))
+                finally:
+                    _PinnedDatetime.pinned = None
+    return run
@@ -0,0 +1,85 @@
+from script import attention
+
+
+def _at(monkeypatch, timestamp):
+    monkeypatch.setattr(attention.time, "strftime", lambda fmt: timestamp)
+
+
+def test_check_ins_append_and_dates_are_read_by_offset(tmp_path, monkeypatch):
+    log = tmp_path / "attention_log.yaml"
+    for timestamp, message in [("2024-05-01 09:00", "🚀 In Flow"), ("2024-05-01 10:30", "😩 struggling - tests:"),
+                               ("2024-05-02 08:15", "😐 neutral")]:
+        _at(monkeypatch, timestamp)
+        attention.append_focus_state(log, message)
+
+    assert log.read_text(encoding="utf-8") == (
+        "2024-05-01:\n  09:00: 🚀 in flow\n  10:30: 😩 struggling - tests:\n2024-05-02:\n  08:15: 😐 neutral\n")
+    assert attention.load_focus_index(log) == attention.build_focus_index(log)
+    assert attention.read_focus_logs_for_date(log, "2024-05-01") == [
+        "  09:00: 🚀 in flow", "  10:30: 😩 struggling - tests:"]
+    assert attention.read_focus_logs_for_date(log, "2024-05-03") is None
+
+
+def test_out_of_order_check_in_falls_back_to_sorted_rewrite(tmp_path, monkeypatch):
+    log = tmp_path / "attention_log.yaml"
+    _at(monkeypatch, "2024-05-02 08:15")
+    attention.append_focus_state(log, "neutral")
+    _at(monkeypatch, "2024-05-01 23:59")
+    attention.append_focus_state(log, "need break")
+
+    assert log.read_text(encoding="utf-8") == "2024-05-01:\n  23:59: need break\n2024-05-02:\n  08:15: neutral\n"
+    assert attention.read_focus_logs_for_date(log, "2024-05-02") == ["  08:15: neutral"]
+
+
+def test_sorted_rewrite_keeps_entries_ending_in_a_colon(tmp_path, monkeypatch):
+    log = tmp_path / "attention_log.yaml"
+    _at(monkeypatch, "2024-05-02 08:15")
+    attention.append_focus_state(log, "struggling - blocked on:")
+    _at(monkeypatch, "2024-05-02 09:00")
+    attention.append_focus_state(log, "neutral")
+    _at(monkeypatch, "2024-05-02 08:30")
+    attention.append_focus_state(log, "in flow")
+
+    assert log.read_text(encoding="utf-8") == (
+        "2024-05-02:\n  08:15: struggling - blocked on:\n  08:30: in flow\n  09:00: neutral\n")
+
+
+def test_index_is_rebuilt_after_outside_edits(tmp_path, monkeypatch):
+    log = tmp_path / "attention_log.yaml"
+    _at(monkeypatch, "2024-05-01 09:00")
+    attention.append_focus_state(log, "in flow")
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("2024-05-03:\n  07:00: edited by hand\n")
+
+    assert attention.read_focus_logs_for_date(log, "2024-05-03") == ["  07:00: edited by hand"]
+
+
+def test_report_estimates_time_in_state_and_rereads_only_changed_days(tmp_path, monkeypatch):
+    log = tmp_path / "attention_log.yaml"
+    for timestamp, message in [("2024-05-01 09:00", "🚀 in flow"), ("2024-05-01 09:40", "😩 struggling - tests"),
+                               ("2024-05-01 12:00", "🛑 need break"), ("2024-05-02 08:15", "😐 neutral")]:
+        _at(monkeypatch, timestamp)
+        attention.append_focus_state(log, message)
+
+    days = attention.load_focus_report(log)
+    assert days["2024-05-01"]["minutes"] == {"in flow": 40, "struggling": 60, "need break": 15}
+    assert days["2024-05-01"]["hours"]["in flow"][9] == 1
+
+    _at(monkeypatch, "2024-05-02 08:45")
+    attention.append_focus_state(log, "🤯 overwhelmed")
+    seen = []
+    original = attention.summarize_focus_day
+    monkeypatch.setattr(attention, "summarize_focus_day", lambda entries: seen.append(entries) or original(entries))
+    days = attention.load_focus_report(log)
+
+    assert seen == [[("08:15", "😐 neutral"), ("08:45", "🤯 overwhelmed")]]
+    assert days["2024-05-02"]["counts"] == {"neutral": 1, "overwhelmed": 1}
+    assert attention.load_focus_report(log) == days and len(seen) == 1
+
+
+def test_report_on_dates_without_check_ins(tmp_path, capsys):
+    log = tmp_path / "attention_log.yaml"
+    log.write_text("2024-05-01:\n2024-05-02:\n", encoding="utf-8")
+
+    attention.display_focus_report(log)
+    assert capsys.readouterr().out == "No entries found.\n"
@@ -0,0 +1,96 @@
+import math
+import struct
+import wave
+from array import array
+
+import pytest
+
+from script import audio_engine
+from script.audio_engine import (
+    BLOCK_FRAMES, REPEAT_GAP, SAMPLE_RATE, AudioEngine, NullOutput, WavOutput, generate_tone, to_samples,
+)
+
+
+def test_repetitions_are_spaced_and_written_to_wav(tmp_path):
+    path = tmp_path / "beeps.wav"
+    engine = AudioEngine(WavOutput(path), tones=[(800, 0.05)])
+    assert (800, 0.05, 0.5) in engine.tones
+    engine.play(800, 0.05, repetitions=3)
+    engine.close()
+
+    expected = 3 * int(SAMPLE_RATE * 0.05) + 2 * int(SAMPLE_RATE * REPEAT_GAP)
+    with wave.open(str(path), "rb") as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, SAMPLE_RATE)
+        assert wav.getnframes() == expected
+        pcm = array("h", wav.readframes(wav.getnframes()))
+    assert max(pcm) > 0.45 * 32767 and min(pcm) < -0.45 * 32767
+
+
+def test_overlapping_tones_are_mixed_not_queued():
+    output = NullOutput()
+    engine = AudioEngine(output)
+    mixed = engine._mix([[to_samples(generate_tone(440, 0.1, 0.6)), 0], [to_samples(generate_tone(440, 0.05, 0.6)), 0]])
+    assert max(to_samples(mixed)) == 1.0
+
+    engine.play(440, 0.1)
+    engine.play(660, 0.1)
+    engine.close()
+    assert output.frames < 2 * int(SAMPLE_RATE * 0.1)
+    assert output.frames >= int(SAMPLE_RATE * 0.1)
+
+
+def test_blocks_stay_small_for_low_latency():
+    output = NullOutput()
+    writes = []
+    output.write = lambda data: writes.append(len(data) // 4)
+    engine = AudioEngine(output)
+    engine.play(1000, 0.2)
+    engine.close()
+    assert max(writes) == BLOCK_FRAMES and sum(writes) == int(SAMPLE_RATE * 0.2)
+
+
+def _per_sample_tone(frequency, duration, amplitude=0.5, sample_rate=SAMPLE_RATE):
+    # How the scripts synthesized every beep before tones were cached and built in bulk
+    num_samples = int(sample_rate * duration)
+    samples = (amplitude * math.sin(2 * math.pi * frequency * (i / sample_rate)) for i in range(num_samples))
+    return b''.join(struct.pack('f', s) for s in samples)
+
+
+@pytest.mark.parametrize("frequency, duration, amplitude, sample_rate", [
+    (440, 0.1, 0.5, SAMPLE_RATE), (880.0, 0.3, 0.5, SAMPLE_RATE), (1000, 0.15, 0.8, 22050),
+])
+def test_bulk_synthesis_matches_per_sample_struct_pack(frequency, duration, amplitude, sample_rate):
+    bulk = to_samples(generate_tone(frequency, duration, amplitude, sample_rate))
+    reference = to_samples(_per_sample_tone(frequency, duration, amplitude, sample_rate))
+    assert len(bulk) == len(reference) == int(sample_rate * duration)
+    assert max(abs(a - b) for a, b in zip(bulk, reference)) < 1e-6
+
+
+def test_tones_are_synthesized_once_and_reused(monkeypatch):
+    calls = []
+    original = audio_engine.generate_tone
+    monkeypatch.setattr(audio_engine, "generate_tone", lambda *args: calls.append(args) or original(*args))
+    engine = AudioEngine(NullOutput(), tones=[(800, 0.05)])
+    tone = engine._get_tone(800, 0.05)
+    voice = engine._get_voice(800, 0.05, 2, 0.5)
+
+    assert engine._get_tone(800, 0.05) is tone
+    assert engine._get_voice(800, 0.05, 2, 0.5) is voice
+    engine.play(800, 0.05, 2)
+    engine.play(800, 0.05, 2)
+    engine.close()
+    assert calls == [(800, 0.05, 0.5, SAMPLE_RATE)]
+
+    slower = AudioEngine(NullOutput(sample_rate=22050))
+    assert len(slower._get_tone(800, 0.05)) == 4 * int(22050 * 0.05)
+    slower.close()
+    assert calls[-1] == (800, 0.05, 0.5, 22050)
+
+
+def test_timer_scripts_synthesize_only_through_the_engine():
+    import script.interval_beeper as interval_beeper
+    import script.pomodoro_timer as pomodoro_timer
+
+    for module in (interval_beeper, pomodoro_timer):
+        assert not hasattr(module, "generate_tone")
+        assert module.AudioEngine is AudioEngine
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+from script.attention import read_focus_logs_for_date
+from script.audio_engine import NullOutput
+from script.clock import FakeClock, run_on_clock
+from script.focus_runtime import FocusRuntime, main
+
+INTERVALS = [{"name": "tick", "interval": 5 * 60, "frequency": 800, "duration": 0.01, "repetitions": 1,
+              "message": "tick"}]
+
+
+def test_pomodoro_beeps_and_checkins_share_one_loop(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("script.attention.time.strftime", lambda fmt: "2024-05-01 09:00")
+    output = NullOutput()
+    clock = FakeClock()
+    answers = asyncio.Queue()
+    answers.put_nowait("1 deep in the parser")
+    runtime = FocusRuntime(output, work=25 * 60, short_break=5 * 60, long_break=15 * 60, sessions_before_long_break=2,
+                           intervals=INTERVALS, checkin_every=30 * 60,
+                           pomodoro_log=tmp_path / "pomodoro.jsonl", attention_log=tmp_path / "attention.yaml",
+                           answers=answers)
+    # Two simulated hours: work 0-25, break -30, work -55, long break -70, work -95, break -100, work...
+    run_on_clock(runtime.run(duration=118 * 60), clock)
+
+    out = capsys.readouterr().out
+    assert out.count("WORK SESSION") == 4 and out.count("LONG BREAK") == 1 and out.count("SHORT BREAK") == 2
+    assert out.count("⏰ tick") == 23
+    # The second check-in, at 60 min, is still waiting for an answer
+    assert out.count("Focus check-in") == 2
+    assert "✅ Logged: 🚀 in flow - deep in the parser" in out
+    assert clock.now() == pytest.approx(118 * 60)
+
+    records = [json.loads(line) for line in (tmp_path / "pomodoro.jsonl").read_text().splitlines()]
+    assert [r["session"] for r in records] == [1, 2, 3] and runtime.completed == 3
+    assert read_focus_logs_for_date(tmp_path / "attention.yaml", "2024-05-01") == [
+        "  09:00: 🚀 in flow - deep in the parser"]
+    assert output.frames > 0
+
+
+def test_long_every_must_be_positive(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["focus_runtime", "--long-every", "0"])
+    with pytest.raises(SystemExit):
+        main()
+    assert "--long-every: must be at least 1" in capsys.readouterr().err
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from script.audio_engine import NullOutput
+from script.clock import FakeClock
+from script.interval_beeper import IntervalBeeper, IntervalScheduler, load_intervals
+
+INTERVALS = [
+    {"name": "fast", "interval": 2, "frequency": 800, "duration": 0.01, "repetitions": 1, "message": "fast"},
+    {"name": "slow", "interval": 5, "frequency": 1200, "duration": 0.01, "repetitions": 2, "message": "slow"},
+]
+
+
+def test_scheduler_pops_in_deadline_order():
+    scheduler = IntervalScheduler(INTERVALS, start=100.0)
+    fired = []
+    while scheduler.next_deadline() <= 110.0:
+        deadline = scheduler.next_deadline()
+        fired += [(deadline, item["name"]) for item, _ in scheduler.pop_due(deadline)]
+    assert fired == [(102, "fast"), (104, "fast"), (105, "slow"), (106, "fast"), (108, "fast"),
+                     (110, "fast"), (110, "slow")]
+
+
+def test_late_wakeups_coalesce_without_drifting():
+    scheduler = IntervalScheduler(INTERVALS[:1], start=0.0)
+    assert [(item["name"], missed) for item, missed in scheduler.pop_due(7.5)] == [("fast", 2)]
+    assert scheduler.next_deadline() == 8.0
+
+
+def test_beeper_sleeps_exactly_until_each_deadline(capsys):
+    clock = FakeClock(start=50.0)
+    output = NullOutput()
+    IntervalBeeper(output, INTERVALS, clock).start(duration=10)
+
+    assert clock.sleeps == [2, 2, 1, 1, 2, 2]
+    out = capsys.readouterr().out
+    assert out.count("⏰ fast") == 5 and out.count("⏰ slow") == 2
+    assert output.frames > 0
+
+
+def test_intervals_load_from_json_with_defaults(tmp_path):
+    path = tmp_path / "intervals.json"
+    path.write_text(json.dumps([{"name": "stretch", "interval": 1800}]))
+    [item] = load_intervals(path)
+    assert item == {"name": "stretch", "interval": 1800, "frequency": 1000, "duration": 0.3,
+                    "repetitions": 1, "message": "stretch has passed"}
+
+    path.write_text(json.dumps([{"name": "broken", "interval": 0}]))
+    with pytest.raises(ValueError):
+        load_intervals(path)
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from script.audio_engine import NullOutput
+from script.clock import FakeClock
+from script.pomodoro_timer import PomodoroTimer, main
+
+
+class LateClock(FakeClock):
+    # Every sleep overshoots, like a busy machine
+    def sleep(self, seconds):
+        super().sleep(seconds + 0.05)
+
+
+def test_phases_end_on_absolute_deadlines_despite_oversleeping(capsys):
+    clock = LateClock()
+    timer = PomodoroTimer(NullOutput(), work=60, short_break=20, long_break=40,
+                          sessions_before_long_break=2, clock=clock)
+    timer.start(cycles=2)
+
+    # 60 + 20 + 60 + 40 seconds; each phase ends one overshoot late instead of one per tick
+    assert clock.now() == pytest.approx(180 + 4 * 0.05)
+    out = capsys.readouterr().out
+    assert out.count("WORK SESSION") == 2 and "LONG BREAK (0.666667 min)" in out
+    assert "Time remaining: 01:00" in out and "2 completed" in out
+
+
+def test_completed_pomodoros_are_logged(tmp_path):
+    log_file = tmp_path / "pomodoro_log.jsonl"
+    clock = FakeClock()
+    timer = PomodoroTimer(NullOutput(), work=1500, clock=clock, log_file=log_file, show_ticks=False)
+    timer.start(cycles=3)
+
+    records = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [(r["session"], r["minutes"]) for r in records] == [(1, 25), (2, 25), (3, 25)]
+    assert clock.sleeps.count(1) == len(clock.sleeps)
+
+
+@pytest.mark.parametrize("value", ["0", "-2"])
+def test_long_every_must_be_positive(monkeypatch, capsys, value):
+    monkeypatch.setattr("sys.argv", ["pomodoro_timer", "--fast-forward", "--long-every", value])
+    with pytest.raises(SystemExit):
+        main()
+    assert "--long-every: must be at least 1" in capsys.readouterr().err
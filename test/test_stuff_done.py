@@ -0,0 +1,121 @@
+import pytest
+
+from script import stuff_done
+
+
+def test_events_replay_onto_day_until_compacted(tmp_path):
+    stuff_done.save_day(tmp_path, "2024-05-01", [stuff_done.create_task_record("old task")])
+    day_file = stuff_done.get_day_file(tmp_path, "2024-05-02")
+
+    task = stuff_done.create_task_record("new task")
+    stuff_done.append_event(day_file, {"event": "start", "date": "2024-05-02", "index": 0, "task": task})
+    note = {"time": "10:00", "content": "halfway"}
+    stuff_done.append_event(day_file, {"event": "note", "date": "2024-05-02", "index": 0, "note": note})
+    stuff_done.append_event(day_file, {"event": "complete", "date": "2024-05-02", "index": 0,
+                                       "end": "11:00", "duration": "01:00"})
+
+    data = stuff_done.load_log_data(tmp_path)
+    assert data["2024-05-02"][0]["notes"] == [note]
+    assert data["2024-05-02"][0]["duration"] == "01:00"
+    assert list(data) == ["2024-05-01", "2024-05-02"]
+
+    stuff_done.compact_day(tmp_path, "2024-05-02", min_events=4)
+    assert stuff_done.get_events_file(day_file).exists()
+    stuff_done.compact_day(tmp_path, "2024-05-02", min_events=3)
+    assert not stuff_done.get_events_file(day_file).exists()
+    assert stuff_done.load_log_data(tmp_path) == data
+
+
+def test_compaction_interrupted_before_removing_events_does_not_replay_them(tmp_path, monkeypatch):
+    day_file = stuff_done.get_day_file(tmp_path, "2024-05-02")
+    stuff_done.append_event(day_file, {"event": "start", "date": "2024-05-02", "index": 0,
+                                       "task": stuff_done.create_task_record("task")})
+    note = {"time": "10:00", "content": "once"}
+    stuff_done.append_event(day_file, {"event": "note", "date": "2024-05-02", "index": 0, "note": note})
+
+    # Crash after the day file is written but before the events file is removed
+    monkeypatch.setattr(type(day_file), "unlink", lambda self, missing_ok=False: None)
+    stuff_done.compact_day(tmp_path, "2024-05-02", min_events=1)
+    monkeypatch.undo()
+    assert stuff_done.get_events_file(day_file).exists()
+    assert stuff_done.load_day(tmp_path, "2024-05-02")[0]["notes"] == [note]
+
+    later = {"time": "11:00", "content": "after the crash"}
+    stuff_done.append_event(day_file, {"event": "note", "date": "2024-05-02", "index": 0, "note": later})
+    assert stuff_done.load_day(tmp_path, "2024-05-02")[0]["notes"] == [note, later]
+    stuff_done.compact_day(tmp_path, "2024-05-02", min_events=1)
+    assert stuff_done.load_day(tmp_path, "2024-05-02")[0]["notes"] == [note, later]
+
+
+def test_appends_read_only_the_file_ends_and_a_torn_event_is_skipped(tmp_path, monkeypatch):
+    stuff_done.save_day(tmp_path, "2024-05-02", [stuff_done.create_task_record("task")], seq=4)
+    day_file = stuff_done.get_day_file(tmp_path, "2024-05-02")
+    first = {"time": "10:00", "content": "first"}
+    with monkeypatch.context() as patched:
+        patched.setattr(stuff_done.yaml, "load", lambda *args, **kwargs: pytest.fail("a file was parsed"))
+        stuff_done.append_event(day_file, {"event": "note", "date": "2024-05-02", "index": 0, "note": first})
+        stuff_done.compact_day(tmp_path, "2024-05-02")
+    events_file = stuff_done.get_events_file(day_file)
+    with open(events_file, "a") as file:
+        file.write("- event: note\n  date: 2024-05-02\n  ind")
+    assert stuff_done.load_day(tmp_path, "2024-05-02")[0]["notes"] == [first]
+
+    second = {"time": "11:00", "content": "second"}
+    stuff_done.append_event(day_file, {"event": "note", "date": "2024-05-02", "index": 0, "note": second})
+    assert [event["seq"] for event in stuff_done.load_events(day_file)] == [5, 6]
+    assert stuff_done.load_day(tmp_path, "2024-05-02")[0]["notes"] == [first, second]
+
+
+def test_migration_splits_days_and_ranges_skip_other_files(tmp_path, monkeypatch):
+    log_file, log_dir = tmp_path / "stuff_done_log.yaml", tmp_path / "stuff_done"
+    task = stuff_done.create_task_record("write parser")
+    task["notes"] = [{"time": "10:00", "content": "secret payload"}]
+    stuff_done.write_yaml(log_file, {"2024-05-01": [task], "2024-05-02": [stuff_done.create_task_record("review")]})
+    stuff_done.append_event(log_file, {"event": "start", "date": "2024-05-03", "index": 0,
+                                       "task": stuff_done.create_task_record("pending")})
+
+    stuff_done.migrate_log_file(log_file, log_dir)
+    assert stuff_done.list_dates(log_dir) == ["2024-05-01", "2024-05-02", "2024-05-03"]
+
+    read = []
+    original = stuff_done.read_yaml
+    monkeypatch.setattr(stuff_done, "read_yaml", lambda path: read.append(path.name) or original(path))
+    assert list(stuff_done.load_log_data(log_dir, "2024-05-02", "2024-05-03")) == ["2024-05-02", "2024-05-03"]
+    assert "2024-05-01.yaml" not in read
+
+    read.clear()
+    assert stuff_done.load_descriptions(log_dir) == {
+        "2024-05-01": ["write parser"], "2024-05-02": ["review"], "2024-05-03": ["pending"],
+    }
+    assert read == ["descriptions.yaml"]
+
+
+def test_legacy_minutes_become_timestamps_across_midnight(tmp_path):
+    late = {"description": "deploy", "start": "23:40", "end": "00:25", "duration": "-23:15",
+            "notes": [{"time": "23:50", "content": "started"}, {"time": "00:05", "content": "rolled back"}]}
+    open_task = {"description": "unfinished", "start": "09:00", "end": None, "duration": None, "notes": []}
+    stuff_done.save_day(tmp_path, "2024-05-05", [late, open_task])
+
+    stuff_done.migrate_timestamps(tmp_path)
+    late, open_task = stuff_done.load_day(tmp_path, "2024-05-05")
+    assert (late["start"], late["end"]) == ("2024-05-05T23:40:00", "2024-05-06T00:25:00")
+    assert [n["time"] for n in late["notes"]] == ["2024-05-05T23:50:00", "2024-05-06T00:05:00"]
+    assert (late["duration_seconds"], late["duration"]) == (2700, "00:45:00")
+    assert open_task["duration_seconds"] is None
+
+    late["start"] = "12:00"
+    stuff_done.save_day(tmp_path, "2024-05-05", [late])
+    stuff_done.migrate_timestamps(tmp_path)
+    assert stuff_done.load_day(tmp_path, "2024-05-05")[0]["start"] == "12:00"
+
+
+def test_report_totals_days_and_iso_weeks(tmp_path):
+    for date, seconds in [("2024-05-05", 600), ("2024-05-06", 3600), ("2024-05-07", 1800)]:
+        stuff_done.save_day(tmp_path, date, [{"description": "x", "start": f"{date}T09:00:00",
+                                              "duration_seconds": seconds, "notes": []}])
+    stuff_done.save_day(tmp_path, "2024-05-08", [{"description": "legacy", "start": "2024-05-08T09:00:00",
+                                                  "end": "2024-05-08T09:30:15", "notes": []}])
+
+    days, weeks = stuff_done.aggregate_totals(tmp_path)
+    assert days == {"2024-05-05": 600, "2024-05-06": 3600, "2024-05-07": 1800, "2024-05-08": 1815}
+    assert weeks == {"2024-W18": 600, "2024-W19": 7215}
@@ -0,0 +1,103 @@
+import pytest
+from tool.tracker.cli import main
+from tool.tracker.journal import JournalTrackingStorage
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage
+
+BACKFILL = """\
+# day one
+2024-05-01T09:00:00 start planning
+2024-05-01T10:00:00 pause coffee
+2024-05-01T10:15:00 resume
+2024-05-01T11:00:00 note parser rewrite
+2024-05-01T12:00:00 stop
+
+2024-05-02T09:00:00 start
+"""
+
+
+def test_apply_backfills_sessions_in_one_save(tmp_path, monkeypatch, capsys):
+    storage = JournalTrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    saves = []
+    monkeypatch.setattr(storage, "record", lambda *args: pytest.fail("apply should not record per event"))
+    original_save = storage.save
+    monkeypatch.setattr(storage, "save", lambda data: saves.append(data) or original_save(data))
+
+    service.apply_commands(BACKFILL.splitlines())
+
+    assert len(saves) == 1
+    assert "Applied 6 commands: 2 sessions started, 1 stopped" in capsys.readouterr().out
+    data = JournalTrackingStorage(tmp_path / "tracking.toml").load()
+    first, second = data.entries
+    assert first.duration_minutes == 165.0 and first.breaks[0].duration_minutes == 15.0
+    assert [n.text for n in first.notes] == ["planning", "Paused: coffee", "parser rewrite"]
+    assert data.active_session == second.id == "20240502090000"
+
+
+@pytest.mark.parametrize("line, error", [
+    ("2024-05-02T10:00:00 resume", "line 2: Session not paused"),
+    ("2024-05-02T08:00:00 note too early", "line 2: note at 2024-05-02T08:00:00 is before"),
+    ("2024-05-02T10:00:00 start", "line 2: Session already active"),
+    ("yesterday stop", "line 2: Invalid timestamp yesterday"),
+    ("2024-05-02T10:00:00 jump", "line 2: Unknown command jump"),
+])
+def test_invalid_batches_are_rejected_whole(tmp_path, line, error):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    service.apply_commands(["2024-05-01T09:00:00 start"])
+
+    with pytest.raises(ValueError, match=error):
+        service.apply_commands(["2024-05-02T09:00:00 note fine", line])
+    assert [n.text for n in storage.load().entries[0].notes] == []
+
+
+def test_backfill_before_existing_history_keeps_start_order(tmp_path, capsys):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    service.rebuild_rollups()
+    service.rebuild_index()
+    service.apply_commands(["2024-06-01T09:00:00 start", "2024-06-01T10:00:00 stop"])
+    service.apply_commands(["2024-05-01T09:00:00 start old work", "2024-05-01T09:30:00 stop"])
+
+    assert [e.id for e in storage.load().entries] == ["20240501090000", "20240601090000"]
+    assert service.rollups.days["2024-05-01"].active_minutes == 30.0
+    assert [session for session, _ in service.index.search("old")] == ["20240501090000"]
+
+
+@pytest.mark.parametrize("lines, error", [
+    (["2024-05-01T10:00:00 start"], "line 1: start at 2024-05-01T10:00:00 is inside session 20240501090000"),
+    (["2024-05-02T09:00:00 start", "2024-05-03T09:30:00 stop"],
+     "line 2: stop at 2024-05-03T09:30:00 runs into session 20240503090000"),
+    (["2024-05-02T09:00:00 start"], "Session 20240502090000 is left open before session 20240503090000"),
+])
+def test_backfills_cannot_overlap_existing_sessions(tmp_path, lines, error):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    service.apply_commands(["2024-05-01T09:00:00 start", "2024-05-01T11:00:00 stop",
+                            "2024-05-03T09:00:00 start", "2024-05-03T10:00:00 stop"])
+
+    with pytest.raises(ValueError, match=error):
+        service.apply_commands(lines)
+    service.apply_commands(["2024-05-01T11:00:00 start", "2024-05-01T12:00:00 stop"])
+    assert len(storage.load().entries) == 3
+
+
+def test_live_commands_survive_the_clock_stepping_back(tmp_path):
+    # e.g. after a DST change or an NTP correction, "now" can be earlier than the last event
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    service.apply_commands(["2999-01-01T09:00:00 start"])
+    service.add_note("still counts")
+    service.stop_tracking()
+
+    assert [n.text for n in storage.load().entries[0].notes] == ["still counts"]
+
+def test_tracker_apply_reads_stdin(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "tracking.toml"
+    monkeypatch.setattr("tool.tracker.backends.open_storage", lambda *_: TrackingStorage(path))
+    monkeypatch.setattr("sys.stdin.read", lambda: BACKFILL)
+    main(["apply", "-"])
+
+    assert "Applied 6 commands" in capsys.readouterr().out
+    assert len(TrackingStorage(path).load().entries) == 2
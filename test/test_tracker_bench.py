@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from tool.tracker.bench import BACKEND_OPERATIONS, BACKENDS, run_backends
+from tool.tracker.cli import main
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_backend_benchmark_reports_latency_throughput_and_memory(tmp_path, backend):
+    [row] = run_backends(sizes=[40], backends=[backend], breaks=1, notes=2, repeat=1,
+                         workdir=tmp_path, isolate=False)
+
+    assert (row["backend"], row["sessions"], row["breaks"], row["notes"]) == (backend, 40, 1, 2)
+    assert all(row[op] >= 0 for op in BACKEND_OPERATIONS)
+    assert row["load_sessions_per_s"] > 0 and row["save_sessions_per_s"] > 0
+    assert 0 < row["peak_memory_mb"] <= row["load_peak_memory_mb"]
+
+
+def test_tracker_bench_writes_json_from_isolated_runs(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    main(["bench", "--sessions", "25", "--backend", "sqlite", "--repeat", "1", "--json", str(out)])
+
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["meta"]["suite"] == "backends"
+    assert [(row["backend"], row["sessions"]) for row in report["results"]] == [("sqlite", 25)]
+    assert "sqlite" in capsys.readouterr().out
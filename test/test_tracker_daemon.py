@@ -0,0 +1,90 @@
+import socket
+import threading
+import pytest
+from tool.tracker.client import send_command, socket_path
+from tool.tracker.daemon import TrackerServer, WriteBehindStorage
+from tool.tracker.journal import JournalTrackingStorage
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+def test_client_falls_back_without_daemon(tmp_path):
+    assert send_command(["status"], file_path=tmp_path / "tracking.toml") is None
+
+
+def test_daemon_answers_from_memory_and_writes_behind(tmp_path):
+    path = tmp_path / "tracking.toml"
+    server = TrackerServer(WriteBehindStorage(JournalTrackingStorage(path, compact_after=2)))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        assert "Started tracking" in send_command(["start", "-n", "daemon"], file_path=path)
+        for i in range(3):
+            assert "Note added" in send_command(["note", f"note {i}"], file_path=path)
+        status = send_command(["status"], file_path=path)
+        assert "Status: ACTIVE" in status and "note 2" in status
+        assert "Error: Session already active" in send_command(["start"], file_path=path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert not socket_path(path).exists()
+    notes = JournalTrackingStorage(path).load().entries[0].notes
+    assert [n.text for n in notes] == ["daemon", "note 0", "note 1", "note 2"]
+
+
+def test_daemon_applies_forwarded_commands(tmp_path):
+    path = tmp_path / "tracking.toml"
+    server = TrackerServer(WriteBehindStorage(JournalTrackingStorage(path)))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        batch = "2024-05-01T09:00:00 start\n2024-05-01T09:30:00 note from stdin\n2024-05-01T10:00:00 stop\n"
+        assert "Applied 3 commands" in send_command(["apply", "-"], stdin=batch, file_path=path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    [session] = JournalTrackingStorage(path).load().entries
+    assert session.duration_minutes == 60.0 and session.notes[0].text == "from stdin"
+
+
+def test_daemon_reports_command_errors_and_keeps_serving(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "tracking.toml"
+    server = TrackerServer(WriteBehindStorage(JournalTrackingStorage(path)))
+
+    def broken_status(self):
+        raise RuntimeError("disk on fire")
+    monkeypatch.setattr(type(server.tracker), "show_status", broken_status)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        assert send_command(["status"], file_path=path) == ""
+        assert "Error: RuntimeError: disk on fire" in capsys.readouterr().err
+        assert "Started tracking" in send_command(["start"], file_path=path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_client_reports_an_empty_reply_instead_of_rerunning(tmp_path, capsys):
+    path = tmp_path / "tracking.toml"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path(path)))
+    listener.listen()
+
+    def hang_up():
+        connection, _ = listener.accept()
+        connection.recv(1024)
+        connection.close()
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    try:
+        assert send_command(["status"], file_path=path) == ""
+    finally:
+        thread.join()
+        listener.close()
+    assert "Error: no valid reply from the tracker daemon" in capsys.readouterr().err
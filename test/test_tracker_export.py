@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from tool.tracker.export import SCHEMA, export_columnar, export_csv, export_jsonl
+from tool.tracker.model import TrackingBreak, TrackingNote, TrackingSession
+
+
+def _sessions(count):
+    return [
+        TrackingSession(
+            id=str(i), start=f"2024-05-{i + 1:02d}T09:00:00", stop=f"2024-05-{i + 1:02d}T10:00:00",
+            duration_minutes=50.0,
+            breaks=[TrackingBreak(start=f"2024-05-{i + 1:02d}T09:20:00", end=f"2024-05-{i + 1:02d}T09:30:00",
+                                  duration_minutes=10.0)],
+            notes=[TrackingNote(time=f"2024-05-{i + 1:02d}T09:00:00", text=f"note {i}, with comma")],
+        )
+        for i in range(count)
+    ]
+
+
+def test_jsonl_has_one_flat_record_per_line():
+    out = io.StringIO()
+    assert export_jsonl(_sessions(2), out) == 6
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["record"] for r in records] == ["sessions", "breaks", "notes"] * 2
+    assert records[0] == {"record": "sessions", "id": "0", "start": "2024-05-01T09:00:00",
+                          "stop": "2024-05-01T10:00:00", "duration_minutes": 50.0, "paused": False,
+                          "breaks": 1, "notes": 1}
+
+
+def test_columnar_batches_reassemble_into_columns():
+    out = io.StringIO()
+    export_columnar(_sessions(5), out, batch_size=2)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines[0] == {"schema": SCHEMA}
+
+    notes = [batch for batch in lines[1:] if batch["table"] == "notes"]
+    assert [batch["length"] for batch in notes] == [2, 2, 1]
+    assert sum((batch["columns"]["text"] for batch in notes), []) == [f"note {i}, with comma" for i in range(5)]
+
+
+def test_csv_writes_one_file_per_table(tmp_path):
+    export_csv(_sessions(3), tmp_path)
+    with open(tmp_path / "notes.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(SCHEMA["notes"])
+    assert rows[1] == ["0", "0", "2024-05-01T09:00:00", "note 0, with comma"]
+    assert len(rows) == 4
@@ -0,0 +1,83 @@
+import tomllib
+from datetime import datetime
+import pytest
+from tool.tracker.journal import JournalTrackingStorage
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage
+
+DAY = [
+    "2024-05-01T09:00:00 start kickoff",
+    "2024-05-01T10:00:00 pause lunch",
+    "2024-05-01T10:30:00 resume",
+    "2024-05-01T11:00:00 note reviewed PR",
+    "2024-05-01T12:00:00 stop",
+]
+
+
+def test_journal_matches_full_rewrite(tmp_path, track):
+    plain = TrackingService(TrackingStorage(tmp_path / "plain.toml"))
+    journaled = TrackingService(JournalTrackingStorage(tmp_path / "journal.toml"))
+    track(plain, DAY)
+    track(journaled, DAY)
+
+    assert not (tmp_path / "journal.toml").exists()
+    assert JournalTrackingStorage(tmp_path / "journal.toml").load() == TrackingStorage(tmp_path / "plain.toml").load()
+    session = plain.storage.load().entries[0]
+    assert session.duration_minutes == 150.0
+    assert [n.text for n in session.notes] == ["kickoff", "Paused: lunch", "reviewed PR"]
+
+
+def test_existing_toml_is_initial_snapshot(tmp_path, track):
+    path = tmp_path / "tracking.toml"
+    track(TrackingService(TrackingStorage(path)), DAY)
+    storage = JournalTrackingStorage(path)
+    track(TrackingService(storage), ["2024-05-02T09:00:00 start"])
+
+    data = JournalTrackingStorage(path).load()
+    assert [e.id for e in data.entries] == ["20240501090000", "20240502090000"]
+    assert data.active_session == "20240502090000"
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path, track):
+    path = tmp_path / "tracking.toml"
+    storage = JournalTrackingStorage(path, compact_after=3)
+    track(TrackingService(storage), DAY)
+
+    with open(path, "rb") as f:
+        assert tomllib.load(f)["journal_seq"] == 3
+    assert len(storage.journal_path.read_text().splitlines()) == 2
+
+    storage.compact()
+    assert not storage.journal_path.exists()
+    assert len(TrackingStorage(path).load().entries[0].notes) == 3
+
+
+def test_replay_skips_events_already_in_snapshot(tmp_path, track):
+    path = tmp_path / "tracking.toml"
+    storage = JournalTrackingStorage(path)
+    track(TrackingService(storage), DAY)
+    journal = storage.journal_path.read_text()
+
+    storage.compact()
+    storage.journal_path.write_text(journal)
+
+    assert len(JournalTrackingStorage(path).load().entries[0].notes) == 3
+
+
+def test_iter_sessions_overlays_journal_on_streamed_snapshot(tmp_path, track):
+    path = tmp_path / "tracking.toml"
+    track(TrackingService(TrackingStorage(path)), ["2024-04-30T09:00:00 start", "2024-04-30T10:00:00 stop"] +
+          DAY + ["2024-05-02T09:00:00 start"])
+    storage = JournalTrackingStorage(path)
+    track(TrackingService(storage), ["2024-05-02T10:00:00 note journaled", "2024-05-02T11:00:00 stop",
+                                     "2024-05-03T09:00:00 start"])
+    assert list(storage.iter_sessions()) == storage.load().entries[::-1]
+
+    # Older entries are only parsed once reached, and not at all past `since`
+    path.write_text(path.read_text().replace('start = "2024-04-30T09:00:00"', "start = ="))
+    sessions = storage.iter_sessions()
+    assert [next(sessions).id, next(sessions).notes[-1].text, next(sessions).id] == \
+        ["20240503090000", "journaled", "20240501090000"]
+    with pytest.raises(tomllib.TOMLDecodeError):
+        next(sessions)
+    assert [s.id for s in storage.iter_sessions(since=datetime(2024, 5, 2))] == ["20240503090000", "20240502090000"]
@@ -0,0 +1,39 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from tool.tracker.journal import JournalTrackingStorage
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage
+
+
+def _add_notes(path, worker, count):
+    service = TrackingService(JournalTrackingStorage(path, compact_after=7))
+    for i in range(count):
+        service.add_note(f"worker {worker} note {i}")
+
+
+def test_concurrent_notes_are_not_lost(tmp_path):
+    path = tmp_path / "tracking.toml"
+    TrackingService(JournalTrackingStorage(path)).start_tracking()
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_add_notes, [path] * 4, range(4), [15] * 4))
+
+    notes = JournalTrackingStorage(path).load().entries[0].notes
+    assert len(notes) == 60
+
+
+def test_failed_save_keeps_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "tracking.toml"
+    service = TrackingService(TrackingStorage(path))
+    service.start_tracking("first")
+    before = path.read_bytes()
+
+    def crash(*args):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(KeyboardInterrupt):
+        service.add_note("interrupted")
+
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
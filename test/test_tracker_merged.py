@@ -0,0 +1,40 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+from tool.tracker.build_merged import MERGED_FILE, MODULES, build
+
+LOAD_MERGED = """
+import json, runpy, sys
+names = runpy.run_path(sys.argv[1])
+print(json.dumps({"names": sorted(names), "modules": sorted(m for m in sys.modules if m.split(".")[0] == "tool")}))
+"""
+
+
+def _run_outside_package(tmp_path, *args):
+    # From another directory and without PYTHONPATH, so the tool.tracker package cannot be imported
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    return subprocess.run([sys.executable, *args], cwd=tmp_path, env=env, capture_output=True, text=True,
+                          check=True).stdout
+
+
+def test_merged_build_is_generated_from_package():
+    assert MERGED_FILE.read_text(encoding="utf-8") == build(), \
+        "run python -m tool.tracker.build_merged after changing tool/tracker"
+
+
+def test_merged_build_defines_every_module_without_importing_the_package(tmp_path):
+    loaded = json.loads(_run_outside_package(tmp_path, "-c", LOAD_MERGED, str(MERGED_FILE)))
+    assert loaded["modules"] == []
+
+    for module in MODULES:
+        package_module = importlib.import_module(f"tool.tracker.{module}")
+        defined = {name for name, value in vars(package_module).items()
+                   if getattr(value, "__module__", None) == package_module.__name__}
+        assert defined <= set(loaded["names"]), f"{module} is missing from the merged build"
+
+
+def test_merged_build_explains_that_bench_needs_the_package(tmp_path):
+    output = _run_outside_package(tmp_path, str(MERGED_FILE), "bench")
+    assert output.startswith("Error: tracker bench needs the tool.tracker package")
@@ -0,0 +1,52 @@
+from datetime import datetime
+from tool.tracker.model import TrackingBreak, TrackingData, TrackingNote, TrackingSession
+from tool.tracker.storage import TrackingStorage
+
+
+def test_timestamps_are_parsed_once_and_follow_reassignment():
+    pause = TrackingBreak(start="2024-05-01T10:00:00")
+    assert pause.end_at is None
+    assert pause.start_at is pause.start_at
+
+    pause.end = "2024-05-01T10:15:00"
+    assert pause.end_at == datetime(2024, 5, 1, 10, 15)
+    assert not hasattr(pause, "__dict__")
+
+
+def test_parsed_cache_does_not_leak_into_serialization(tmp_path):
+    session = TrackingSession(id="1", start="2024-05-01T09:00:00.123456",
+                              notes=[TrackingNote(time="2024-05-01T09:00:00.123456", text="hi")])
+    session.start_at, session.notes[0].time_at
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+
+    assert storage._serialize_session(session)["start"] == "2024-05-01T09:00:00.123456"
+    assert storage._serialize_session(session)["notes"] == [{"time": "2024-05-01T09:00:00.123456", "text": "hi"}]
+    assert session == TrackingSession(id="1", start="2024-05-01T09:00:00.123456",
+                                      notes=[TrackingNote(time="2024-05-01T09:00:00.123456", text="hi")])
+
+
+def test_sessions_decode_breaks_and_notes_on_first_access(tmp_path):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    storage.save(TrackingData(entries=[
+        TrackingSession(id=str(i), start=f"2024-05-0{i + 1}T09:00:00",
+                        breaks=[TrackingBreak(start=f"2024-05-0{i + 1}T10:00:00")],
+                        notes=[TrackingNote(time=f"2024-05-0{i + 1}T09:00:00", text=f"note {i}")])
+        for i in range(3)
+    ]))
+    before = (tmp_path / "tracking.toml").read_bytes()
+
+    data = storage.load()
+    assert all(s._notes is None and s._breaks is None for s in data.entries)
+    data.entries[-1].notes.append(TrackingNote(time="2024-05-03T11:00:00", text="touched"))
+    assert data.entries[0]._notes is None
+
+    raw = storage._prepare_for_toml(data)
+    assert raw["entries"][0]["notes"] is data.entries[0]._source["notes"]
+    storage.save(data)
+    reloaded = storage.load()
+    assert [n.text for n in reloaded.entries[-1].notes] == ["note 2", "touched"]
+    assert reloaded.entries[0] == data.entries[0]
+
+    data.entries[-1].notes.pop()
+    storage.save(data)
+    assert (tmp_path / "tracking.toml").read_bytes() == before
@@ -0,0 +1,108 @@
+import json
+from datetime import date, datetime, timedelta
+import pytest
+from tool.tracker.journal import JournalTrackingStorage
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage
+
+
+def _session_lines(start, note_count=1):
+    def at(minutes):
+        return (start + timedelta(minutes=minutes)).isoformat()
+    return ([f"{at(0)} start go", f"{at(20)} pause", f"{at(30)} resume"] +
+            [f"{at(31 + i)} note n" for i in range(note_count)] + [f"{at(70)} stop"])
+
+
+def _raw_totals(storage, first_day):
+    sessions = [e for e in storage.load().entries if e.start_at.date() >= first_day]
+    return (round(sum(e.duration_minutes or 0 for e in sessions), 2), len(sessions),
+            sum(len(e.breaks) for e in sessions), sum(len(e.notes) for e in sessions))
+
+
+def test_incremental_rollups_match_raw_sessions(tmp_path, track):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    today = datetime.combine(date.today(), datetime.min.time())
+    track(service, _session_lines(today - timedelta(days=40, hours=-9)))
+    service.summarize(date.today())
+    assert service.rollups.exists()
+
+    for days_ago, notes in [(10, 2), (3, 0), (0, 4)]:
+        track(service, _session_lines(today - timedelta(days=days_ago, hours=-9), notes))
+    track(service, [f"{(today + timedelta(hours=12)).isoformat()} start still going"])
+
+    for first_day in [date.today(), date.today() - timedelta(days=30)]:
+        totals = TrackingService(storage).summarize(first_day)
+        assert (round(totals.active_minutes, 2), totals.sessions, totals.breaks, totals.notes) == \
+            _raw_totals(storage, first_day)
+
+
+def test_check_reports_stale_rollups(tmp_path, capsys, track):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    track(service, _session_lines(datetime(2024, 5, 1, 9)))
+    service.update_rollups()
+    stored = json.loads(service.rollups.path.read_text())
+    stored["2024-05-01"][-1] = 99
+    service.rollups.path.write_text(json.dumps(stored))
+
+    TrackingService(storage).update_rollups(check_only=True)
+    assert "1 of 1 days differ" in capsys.readouterr().out
+
+
+HISTORY = ["2024-05-01T09:00:00 start", "2024-05-01T10:00:00 stop",
+           "2024-05-02T09:00:00 start", "2024-05-02T09:30:00 note parser", "2024-05-02T11:00:00 stop"]
+
+
+@pytest.mark.parametrize("storage_class", [TrackingStorage, JournalTrackingStorage])
+def test_status_and_summary_parse_only_the_active_session(tmp_path, monkeypatch, capsys, storage_class):
+    storage = storage_class(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    service.apply_commands(HISTORY + ["2024-05-03T09:00:00 start open"])
+    service.summarize(date(2024, 5, 1))
+    service.add_note("journaled")
+
+    def full_parse(*args):
+        pytest.fail("the whole history was parsed")
+    monkeypatch.setattr(storage, "_read_raw", full_parse)
+    monkeypatch.setattr(storage, "load", full_parse)
+    totals = TrackingService(storage).summarize(date(2024, 5, 1))
+    TrackingService(storage).show_status()
+
+    assert (totals.sessions, totals.notes) == (3, 3)
+    assert "Status: ACTIVE" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("storage_class", [TrackingStorage, JournalTrackingStorage])
+def test_live_commands_keep_the_history_they_did_not_read(tmp_path, storage_class):
+    storage = storage_class(tmp_path / "tracking.toml")
+    if storage_class is JournalTrackingStorage:
+        storage.compact_after = 2
+    TrackingService(storage).apply_commands(HISTORY)
+    service = TrackingService(storage)
+    service.start_tracking("live")
+    service.add_note("one")
+    service.add_note("two")
+    service.stop_tracking()
+
+    entries = storage_class(tmp_path / "tracking.toml").load().entries
+    assert [e.id for e in entries[:2]] == ["20240501090000", "20240502090000"]
+    assert [n.text for n in entries[2].notes] == ["live", "one", "two"] and entries[2].stop
+
+
+def test_saves_append_changed_days_until_compaction(tmp_path, track):
+    storage = TrackingStorage(tmp_path / "tracking.toml")
+    service = TrackingService(storage)
+    service.rollups.compact_after = 3
+    service.update_rollups()
+    snapshot = service.rollups.path.read_text()
+
+    track(service, _session_lines(datetime(2024, 5, 1, 9)) + _session_lines(datetime(2024, 5, 1, 14)))
+    assert service.rollups.path.read_text() == snapshot
+    assert len(service.rollups.log_path.read_text().splitlines()) == 2
+    assert TrackingService(storage).summarize(date(2024, 5, 1)).sessions == 2
+
+    track(service, _session_lines(datetime(2024, 5, 2, 9)))
+    assert not service.rollups.log_path.exists()
+    assert set(json.loads(service.rollups.path.read_text())) == {"2024-05-01", "2024-05-02"}
+    assert TrackingService(storage).summarize(date(2024, 5, 1)).sessions == 3
@@ -0,0 +1,68 @@
+from datetime import datetime
+from tool.tracker.search import SearchIndex
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage
+
+
+def _session_lines(day, notes):
+    return ([f"{day}T09:00:00 start {notes[0]}"] +
+            [f"{day}T09:{i + 1:02d}:00 note {note}" for i, note in enumerate(notes[1:])] +
+            [f"{day}T12:00:00 stop"])
+
+
+def test_index_ranks_by_relevance_and_recency(tmp_path):
+    index = SearchIndex(tmp_path / "tracking.index.json")
+    index.rebuild([])
+    index.add_note("old", "2023-01-01T09:00:00", "2023-01-01T09:10:00", "fixed parser bug, parser tests")
+    index.add_note("new", "2024-05-01T09:00:00", "2024-05-01T09:10:00", "parser bug again")
+    index.add_note("other", "2024-05-02T09:00:00", "2024-05-02T09:10:00", "wrote docs")
+
+    now = datetime(2024, 5, 3)
+    assert [s for s, _ in index.search("parser bug", now=now)] == ["new", "old"]
+    assert index.search("parser docs", now=now) == []
+
+    reloaded = SearchIndex(tmp_path / "tracking.index.json")
+    assert reloaded.search("Parser", now=now) == index.search("parser", now=now)
+
+
+def test_log_is_folded_into_snapshot(tmp_path):
+    index = SearchIndex(tmp_path / "tracking.index.json", compact_after=2)
+    index.rebuild([])
+    index.add_note("a", "2024-05-01T09:00:00", "2024-05-01T09:10:00", "one")
+    assert index.log_path.exists()
+    index.add_note("a", "2024-05-01T09:00:00", "2024-05-01T09:20:00", "two")
+    assert not index.log_path.exists()
+    reloaded = SearchIndex(index.path)
+    assert reloaded.search("two")[0][0] == "a"
+    assert reloaded.notes["a"] == [("2024-05-01T09:10:00", "one"), ("2024-05-01T09:20:00", "two")]
+
+
+def test_adding_a_note_only_appends_to_the_log(tmp_path):
+    SearchIndex(tmp_path / "tracking.index.json").rebuild([])
+    with open(tmp_path / "tracking.index.log", "a", encoding="utf-8") as f:
+        f.write('{"session": "torn"')
+
+    index = SearchIndex(tmp_path / "tracking.index.json", compact_after=2)
+    index.add_note("a", "2024-05-01T09:00:00", "2024-05-01T09:10:00", "appended")
+    assert index.postings == {} and index.log_path.exists()
+    assert [s for s, _ in index.search("appended")] == ["a"]
+    index.add_note("a", "2024-05-01T09:00:00", "2024-05-01T09:20:00", "folded")
+    assert not index.log_path.exists()
+    reloaded = SearchIndex(index.path)
+    assert [s for s, _ in reloaded.search("appended folded")] == ["a"]
+    assert reloaded.notes["a"] == [("2024-05-01T09:10:00", "appended"), ("2024-05-01T09:20:00", "folded")]
+
+
+def test_service_keeps_index_current(tmp_path, capsys, track):
+    service = TrackingService(TrackingStorage(tmp_path / "tracking.toml"))
+    track(service, _session_lines("2024-05-01", ["setup sqlite backend", "lunch"]))
+    service.search_notes("sqlite")
+    assert "Session 20240501090000" in capsys.readouterr().out
+
+    track(service, _session_lines("2024-05-02", ["sqlite index tuning"]) +
+          ["2024-05-03T09:00:00 start", "2024-05-03T10:00:00 pause sqlite locked"])
+    service.search_notes("sqlite")
+    out = capsys.readouterr().out
+    assert out.index("Session 20240503090000") < out.index("Session 20240502090000") < \
+        out.index("Session 20240501090000")
+    assert "Paused: sqlite locked" in out and "lunch" not in out
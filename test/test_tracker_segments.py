@@ -0,0 +1,69 @@
+from datetime import datetime
+from tool.tracker.segments import SegmentedTrackingStorage
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage
+
+
+def _session_lines(day):
+    return [f"{day}T09:00:00 start kickoff", f"{day}T10:00:00 pause", f"{day}T10:15:00 resume",
+            f"{day}T11:00:00 stop done"]
+
+
+def test_finished_sessions_are_archived_by_month(tmp_path, track):
+    storage = SegmentedTrackingStorage(tmp_path / "tracking")
+    track(TrackingService(storage),
+          _session_lines("2024-04-30") + _session_lines("2024-05-01") + ["2024-05-02T09:00:00 start"])
+
+    assert sorted(p.name for p in storage.file_path.iterdir()) == ["2024-04.toml", "2024-05.toml", "active.toml"]
+    active = storage.load_active()
+    assert active.active_session == "20240502090000"
+    assert [e.id for e in active.entries] == ["20240502090000"]
+    assert [e.id for e in storage.load().entries] == ["20240430090000", "20240501090000", "20240502090000"]
+
+
+def test_active_commands_do_not_read_archive(tmp_path, monkeypatch, track):
+    storage = SegmentedTrackingStorage(tmp_path / "tracking")
+    track(TrackingService(storage), _session_lines("2024-04-30"))
+
+    monkeypatch.setattr(storage, "_load_segment", lambda path: (_ for _ in ()).throw(AssertionError(path)))
+    service = TrackingService(storage)
+    service.start_tracking("fresh")
+    service.add_note("still cheap")
+    assert len(service.get_current_session().notes) == 2
+
+
+def test_save_round_trips_single_file_history(tmp_path, track):
+    source = TrackingStorage(tmp_path / "tracking.toml")
+    track(TrackingService(source),
+          _session_lines("2024-04-30") + _session_lines("2024-05-01") + ["2024-05-02T09:00:00 start"])
+
+    target = SegmentedTrackingStorage(tmp_path / "tracking")
+    target.save(source.load())
+    assert target.load() == source.load()
+
+
+def test_history_reads_only_segments_it_reaches(tmp_path, monkeypatch, track):
+    storage = SegmentedTrackingStorage(tmp_path / "tracking")
+    track(TrackingService(storage),
+          [line for day in ["2024-03-05", "2024-04-05", "2024-05-05", "2024-05-06"] for line in _session_lines(day)])
+
+    loaded = []
+    load_segment = storage._load_segment
+    monkeypatch.setattr(storage, "_load_segment", lambda path: loaded.append(path.stem) or load_segment(path))
+
+    page = storage.iter_sessions()
+    assert [next(page).id, next(page).id] == ["20240506090000", "20240505090000"]
+    assert loaded == ["2024-05"]
+    assert [s.id for s in storage.iter_sessions(since=datetime(2024, 4, 1), until=datetime(2024, 5, 6))] == \
+        ["20240505090000", "20240405090000"]
+    assert "2024-03" not in loaded
+
+
+def test_history_pagination(tmp_path, capsys, track):
+    service = TrackingService(SegmentedTrackingStorage(tmp_path / "tracking"))
+    track(service, [line for day in ["2024-05-01", "2024-05-02", "2024-05-03"] for line in _session_lines(day)])
+
+    service.show_history(limit=1, offset=1, since=datetime(2024, 1, 1))
+    out = capsys.readouterr().out
+    assert "Session 20240502090000:" in out
+    assert "Session 20240501090000:" not in out and "Session 20240503090000:" not in out
@@ -0,0 +1,68 @@
+import sqlite3
+from datetime import datetime, timedelta
+from tool.tracker.backends import open_storage
+from tool.tracker.model import TrackingBreak, TrackingData, TrackingNote, TrackingSession
+from tool.tracker.service import TrackingService
+from tool.tracker.sqlite_storage import SqliteTrackingStorage
+from tool.tracker.storage import TrackingStorage
+
+
+def _day_lines(days):
+    return [line for day in days for line in [
+        f"{day}T09:00:00 start kickoff", f"{day}T10:00:00 pause", f"{day}T10:15:00 resume back",
+        f"{day}T11:00:00 stop"]]
+
+
+def test_backend_is_picked_by_suffix(tmp_path):
+    assert isinstance(open_storage(tmp_path / "tracking.db"), SqliteTrackingStorage)
+
+
+def test_events_round_trip_like_toml(tmp_path, track):
+    lines = _day_lines(["2024-05-01", "2024-05-02", "2024-05-03"]) + ["2024-05-04T09:00:00 start open"]
+    toml = TrackingStorage(tmp_path / "tracking.toml")
+    sqlite = SqliteTrackingStorage(tmp_path / "tracking.db")
+    track(TrackingService(toml), lines)
+    track(TrackingService(sqlite), lines)
+
+    assert SqliteTrackingStorage(tmp_path / "tracking.db").load() == toml.load()
+    assert sqlite.load_active().entries == [toml.load().entries[-1]]
+
+
+def test_iter_sessions_is_a_newest_first_range_scan(tmp_path, track):
+    storage = SqliteTrackingStorage(tmp_path / "tracking.db")
+    track(TrackingService(storage), _day_lines(["2024-05-01", "2024-05-02", "2024-05-03", "2024-05-04"]))
+
+    sessions = list(storage.iter_sessions(since=datetime(2024, 5, 2), until=datetime(2024, 5, 4)))
+    assert [s.id for s in sessions] == ["20240503090000", "20240502090000"]
+    assert [n.text for n in sessions[0].notes] == ["kickoff", "Resumed: back"]
+    assert sessions[0].breaks[0].duration_minutes == 15.0
+
+
+def test_migration_from_toml(tmp_path, track):
+    source = TrackingStorage(tmp_path / "tracking.toml")
+    track(TrackingService(source), _day_lines(["2024-05-01", "2024-05-02"]))
+
+    target = SqliteTrackingStorage(tmp_path / "tracking.db")
+    target.save(source.load())
+    target.save(source.load())
+    assert target.load() == source.load()
+
+
+def test_histories_larger_than_the_sql_variable_limit(tmp_path, monkeypatch):
+    sessions = []
+    for i in range(1200):
+        start = datetime(2020, 1, 1, 9) + timedelta(days=i)
+        session = TrackingSession(id=start.strftime("%Y%m%d%H%M%S"), start=start.isoformat(),
+                                  stop=(start + timedelta(hours=1)).isoformat(), duration_minutes=55.0)
+        session.breaks.append(TrackingBreak(start=(start + timedelta(minutes=10)).isoformat(),
+                                            end=(start + timedelta(minutes=15)).isoformat(), duration_minutes=5.0))
+        session.notes.append(TrackingNote(time=start.isoformat(), text=f"note {i}"))
+        sessions.append(session)
+    storage = SqliteTrackingStorage(tmp_path / "tracking.db")
+    storage.save(TrackingData(entries=sessions))
+    # The default limit on SQLite before 3.32
+    storage.conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    assert storage.load().entries == sessions
+    monkeypatch.setattr("tool.tracker.sqlite_storage.FETCH_BATCH_SIZE", 5000)
+    assert list(storage.iter_sessions()) == sessions[::-1]
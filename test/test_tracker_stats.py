@@ -0,0 +1,104 @@
+import time
+from datetime import date, datetime
+import pytest
+from tool.tracker.model import TrackingBreak, TrackingSession
+from tool.tracker.segments import SegmentedTrackingStorage
+from tool.tracker.service import TrackingService
+from tool.tracker import stats
+from tool.tracker.stats import HOUR, ROW_WIDTH, SessionColumns, StatsCache, rolling_averages
+
+
+def _session(start, stop, minutes, break_minutes=0.0):
+    breaks = [TrackingBreak(start=start, end=start, duration_minutes=break_minutes)] if break_minutes else []
+    return TrackingSession(id=start, start=start, stop=stop, duration_minutes=minutes, breaks=breaks)
+
+
+def test_columns_skip_unfinished_sessions_and_compute_reports():
+    columns = SessionColumns([
+        _session("2024-05-06T09:30:00", "2024-05-06T11:30:00", 100.0, 20.0),  # Monday
+        _session("2024-05-08T13:00:00", "2024-05-08T13:30:00", 30.0),  # Wednesday
+        _session("2024-05-08T15:00:00", "2024-05-08T16:00:00", 60.0),
+        TrackingSession(id="open", start="2024-05-09T09:00:00"),
+    ])
+
+    report = columns.report((50, 99), date(2024, 5, 10))
+    assert report.sessions == len(columns) == 3
+    assert report.percentiles == {50: 60.0, 99: 100.0}
+    assert round(report.break_ratio, 4) == round(20 / 210, 4)
+    assert report.weekday[:3] == [100.0, 0.0, 90.0]
+
+    hours = report.hours
+    assert [round(m, 2) for m in hours[9:12]] == [25.0, 50.0, 25.0]
+    assert hours[13] == 30.0 and hours[15] == 60.0
+    assert report.daily == [100.0, 0.0, 90.0, 0.0, 0.0]
+    assert columns.since(datetime(2024, 5, 7)).report().daily == [90.0]
+
+
+def test_report_is_the_same_with_and_without_numpy(monkeypatch):
+    columns = SessionColumns([
+        _session("2024-05-06T09:10:00", "2024-05-06T09:50:00", 40.0),
+        _session("2024-05-06T22:30:00", "2024-05-08T01:15:00", 600.0, 30.0),
+        _session("2024-05-09T12:00:00", "2024-05-09T12:00:00", 0.0),
+        _session("2024-05-11T07:00:00", "2024-05-11T10:00:00", 150.0, 30.0),
+    ])
+    report = columns.report(last_day=date(2024, 5, 10))
+    monkeypatch.setattr(stats, "numpy", None)
+    loop = columns.report(last_day=date(2024, 5, 10))
+
+    assert [round(m, 6) for m in report.hours] == [round(m, 6) for m in loop.hours]
+    assert (report.weekday, report.daily) == (loop.weekday, loop.daily)
+
+
+def test_cache_saves_append_new_rows(tmp_path):
+    cache = StatsCache(tmp_path / "tracking.stats.bin")
+    cache.rebuild([_session("2024-05-06T09:00:00", "2024-05-06T10:00:00", 60.0)])
+    cache.save()
+    with open(cache.path, "ab") as f:
+        f.write(b"torn")
+
+    reopened = StatsCache(cache.path)
+    reopened.add_session(_session("2024-05-07T09:00:00", "2024-05-07T09:30:00", 30.0))
+    reopened.save()
+    assert cache.path.stat().st_size == 2 * 8 * ROW_WIDTH
+    assert StatsCache(cache.path).columns.active.tolist() == [60.0, 30.0]
+
+
+def test_stats_come_from_a_cache_kept_current_on_stop(tmp_path, monkeypatch, capsys):
+    storage = SegmentedTrackingStorage(tmp_path / "tracking")
+    service = TrackingService(storage)
+    service.apply_commands(["2024-05-06T09:00:00 start", "2024-05-06T10:00:00 stop"])
+    service.show_stats()
+    assert StatsCache(tmp_path / "tracking.stats.bin").columns.active.tolist() == [60.0]
+
+    service.apply_commands(["2024-05-07T09:00:00 start", "2024-05-07T09:30:00 stop"])
+    service.start_tracking()
+    service.stop_tracking()
+    monkeypatch.setattr(storage, "iter_sessions", lambda *args, **kwargs: pytest.fail("history was read"))
+    monkeypatch.setattr(storage, "load", lambda: pytest.fail("history was read"))
+    capsys.readouterr()
+    TrackingService(storage).show_stats()
+    assert "3 sessions" in capsys.readouterr().out
+
+
+def test_ten_years_of_stats_within_a_second(tmp_path):
+    # 36,500 sessions, the size the stats command is budgeted for; timed from the cache file on
+    cache = StatsCache(tmp_path / "tracking.stats.bin")
+    cache.rebuild([])
+    columns = cache.columns
+    for i in range(36_500):
+        start = i * 8 * HOUR + 9 * HOUR
+        columns.start.append(start)
+        columns.stop.append(start + 2.5 * HOUR)
+        columns.active.append(130.0)
+        columns.breaks.append(20.0)
+    cache.save()
+
+    started = time.perf_counter()
+    report = StatsCache(cache.path).columns.report(last_day=date(2004, 1, 1))
+    rolling_averages(report.daily, 30)
+    assert time.perf_counter() - started < 1.0
+    assert report.sessions == 36_500 and round(sum(report.hours)) == 36_500 * 130
+
+
+def test_rolling_averages_use_available_days_at_the_start():
+    assert rolling_averages([60.0, 0.0, 30.0, 90.0], 2) == [60.0, 30.0, 15.0, 60.0]
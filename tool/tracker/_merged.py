@@ -1,113 +1,1377 @@
 #!/usr/bin/env python3
+# Generated from the tool.tracker modules by tool/tracker/build_merged.py - do not edit by hand.
 import argparse
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Optional, Dict, Any
+import copy
+import csv
+import importlib
+import io
+import json
+import math
+import os
+import re
+import signal
+import socket
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
 import tomli_w
 import tomllib
+from array import array
+from bisect import bisect, insort
+from contextlib import contextmanager, nullcontext, redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from functools import wraps
+from itertools import islice
+from pathlib import Path
+from queue import Queue
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
 
 MAX_NOTE_LENGTH = 300
 TRACKING_FILE = r"C:\atari-monk\code\apps-data-store\tracking.toml"
+USE_JOURNAL = True
+JOURNAL_COMPACT_EVENTS = 200
 
-@dataclass
+ParsedTimestamp = Optional[Tuple[str, Optional[datetime]]]
+
+def _parsed(obj, attr: str) -> Optional[datetime]:
+    # The cache remembers which string it parsed, so reassigning the field invalidates it
+    raw = getattr(obj, attr)
+    cache_attr = f"_{attr}_parsed"
+    cached = getattr(obj, cache_attr)
+    if cached is None or cached[0] is not raw:
+        cached = (raw, datetime.fromisoformat(raw) if raw else None)
+        setattr(obj, cache_attr, cached)
+    return cached[1]
+
+@dataclass(slots=True)
 class TrackingNote:
     time: str
     text: str
+    _time_parsed: ParsedTimestamp = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
+    @property
+    def time_at(self) -> datetime:
+        return _parsed(self, "time")
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TrackingNote":
+        return cls(time=raw["time"], text=raw["text"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"time": self.time, "text": self.text}
+
+@dataclass(slots=True)
 class TrackingBreak:
     start: str
     end: Optional[str] = None
     duration_minutes: Optional[float] = None
+    _start_parsed: ParsedTimestamp = field(default=None, init=False, repr=False, compare=False)
+    _end_parsed: ParsedTimestamp = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def start_at(self) -> datetime:
+        return _parsed(self, "start")
+
+    @property
+    def end_at(self) -> Optional[datetime]:
+        return _parsed(self, "end")
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TrackingBreak":
+        return cls(start=raw["start"], end=raw.get("end") or None,
+                   duration_minutes=raw.get("duration_minutes") or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start,
+            "end": self.end if self.end else "",
+            "duration_minutes": self.duration_minutes if self.duration_minutes else 0.0
+        }
 
-@dataclass
 class TrackingSession:
-    id: str
-    start: str
-    stop: Optional[str] = None
-    duration_minutes: Optional[float] = None
-    breaks: List[TrackingBreak] = field(default_factory=list)
-    notes: List[TrackingNote] = field(default_factory=list)
-    paused: bool = False
+    # Sessions read from storage keep their breaks and notes as the raw stored dicts until
+    # first accessed, and write untouched lists back as-is. Equality and repr follow the
+    # dataclasses around it.
+    __slots__ = ("id", "start", "stop", "duration_minutes", "paused",
+                 "_breaks", "_notes", "_source", "_start_parsed", "_stop_parsed")
+
+    def __init__(self, id: str, start: str, stop: Optional[str] = None,
+                 duration_minutes: Optional[float] = None, breaks: Optional[List[TrackingBreak]] = None,
+                 notes: Optional[List[TrackingNote]] = None, paused: bool = False):
+        self.id = id
+        self.start = start
+        self.stop = stop
+        self.duration_minutes = duration_minutes
+        self.paused = paused
+        self._breaks = breaks if breaks is not None else []
+        self._notes = notes if notes is not None else []
+        self._source: Optional[Dict[str, Any]] = None
+        self._start_parsed: ParsedTimestamp = None
+        self._stop_parsed: ParsedTimestamp = None
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TrackingSession":
+        session = cls(id=raw["id"], start=raw["start"], stop=raw.get("stop") or None,
+                      duration_minutes=raw.get("duration_minutes") or None, paused=raw.get("paused", False))
+        session._breaks = None
+        session._notes = None
+        session._source = raw
+        return session
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "start": self.start,
+            "stop": self.stop if self.stop else "",
+            "duration_minutes": self.duration_minutes if self.duration_minutes else 0.0,
+            "paused": self.paused,
+            "breaks": (self._source.get("breaks", []) if self._breaks is None
+                       else [b.to_dict() for b in self._breaks]),
+            "notes": (self._source.get("notes", []) if self._notes is None
+                      else [n.to_dict() for n in self._notes])
+        }
+
+    @property
+    def breaks(self) -> List[TrackingBreak]:
+        if self._breaks is None:
+            self._breaks = [TrackingBreak.from_dict(b) for b in self._source.get("breaks", [])]
+        return self._breaks
+
+    @breaks.setter
+    def breaks(self, value: List[TrackingBreak]) -> None:
+        self._breaks = value
+
+    @property
+    def notes(self) -> List[TrackingNote]:
+        if self._notes is None:
+            self._notes = [TrackingNote.from_dict(n) for n in self._source.get("notes", [])]
+        return self._notes
+
+    @notes.setter
+    def notes(self, value: List[TrackingNote]) -> None:
+        self._notes = value
+
+    @property
+    def start_at(self) -> datetime:
+        return _parsed(self, "start")
+
+    @property
+    def stop_at(self) -> Optional[datetime]:
+        return _parsed(self, "stop")
+
+    def _fields(self) -> tuple:
+        return (self.id, self.start, self.stop, self.duration_minutes, self.breaks, self.notes, self.paused)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"TrackingSession(id={self.id!r}, start={self.start!r}, stop={self.stop!r}, "
+                f"duration_minutes={self.duration_minutes!r}, breaks={self.breaks!r}, "
+                f"notes={self.notes!r}, paused={self.paused!r})")
 
 @dataclass
 class TrackingData:
     entries: List[TrackingSession] = field(default_factory=list)
     active_session: Optional[str] = None
 
+@dataclass
+class TrackingEvent:
+    kind: str
+    time: str
+    session_id: str
+    text: Optional[str] = None
+
+@dataclass
+class DailyRollup:
+    active_minutes: float = 0.0
+    sessions: int = 0
+    breaks: int = 0
+    notes: int = 0
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    # Readers and crashes only ever see the old file or the complete new one
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+def append_line(path: Path, line: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    # Advisory, blocking and released by the OS if the process dies while holding it
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 seconds; keep waiting for the holder
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _fsync_dir(path: Path) -> None:
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+START = "start"
+PAUSE = "pause"
+RESUME = "resume"
+STOP = "stop"
+NOTE = "note"
+COMMANDS = (START, PAUSE, RESUME, STOP, NOTE)
+SESSION_ID_FORMAT = "%Y%m%d%H%M%S"
+
+def find_session(data: TrackingData, session_id: Optional[str]) -> Optional[TrackingSession]:
+    if not session_id:
+        return None
+    # The active session is almost always the most recent entry
+    return next((e for e in reversed(data.entries) if e.id == session_id), None)
+
+def make_event(data: TrackingData, kind: str, time: str, text: Optional[str] = None) -> TrackingEvent:
+    # A start opens a session named after its timestamp; everything else targets the active one
+    session_id = datetime.fromisoformat(time).strftime(SESSION_ID_FORMAT) if kind == START else data.active_session
+    return TrackingEvent(kind, time, session_id, text)
+
+def parse_event_line(line: str) -> Tuple[str, str, Optional[str]]:
+    # "<ISO time> <command> [note text]" as read by `tracker apply`
+    parts = line.split(None, 2)
+    if len(parts) < 2:
+        raise ValueError("Expected '<ISO time> <command> [note]'")
+    try:
+        time = datetime.fromisoformat(parts[0])
+    except ValueError:
+        raise ValueError(f"Invalid timestamp {parts[0]}") from None
+    if time.tzinfo is not None:
+        raise ValueError(f"Timestamp {parts[0]} must be local time without an offset")
+    kind = parts[1].lower()
+    if kind not in COMMANDS:
+        raise ValueError(f"Unknown command {parts[1]}")
+    return time.isoformat(), kind, parts[2].strip() if len(parts) > 2 else None
+
+def last_event_time(session: TrackingSession) -> str:
+    times = [session.start]
+    if session.breaks:
+        times.append(session.breaks[-1].end or session.breaks[-1].start)
+    if session.notes:
+        times.append(session.notes[-1].time)
+    return max(times, key=datetime.fromisoformat)
+
+def validate_event(data: TrackingData, event: TrackingEvent) -> None:
+    # The session state machine: raises ValueError if `event` cannot follow the current state
+    if event.kind == START:
+        if data.active_session:
+            raise ValueError("Session already active")
+        return
+
+    if event.kind == NOTE and not (event.text or "").strip():
+        raise ValueError("Cannot add an empty note")
+    session = find_session(data, event.session_id)
+    if session is None or session.stop:
+        action = {PAUSE: " to pause", RESUME: " to resume"}.get(event.kind, "")
+        raise ValueError(f"No active session{action}")
+
+    if event.kind == PAUSE and session.paused:
+        raise ValueError("Session already paused")
+    if event.kind == RESUME:
+        if not session.paused:
+            raise ValueError("Session not paused")
+        if not session.breaks or session.breaks[-1].end is not None:
+            raise ValueError("No active break to resume from")
+    if event.kind == STOP and session.paused:
+        raise ValueError("Cannot stop while paused. Resume first.")
+
+def apply_event(data: TrackingData, event: TrackingEvent) -> TrackingSession:
+    if event.kind == START:
+        session = TrackingSession(id=event.session_id, start=event.time)
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=event.text))
+        data.entries.append(session)
+        data.active_session = session.id
+        return session
+
+    session = find_session(data, event.session_id)
+    if session is None:
+        raise ValueError(f"Unknown session {event.session_id}")
+
+    if event.kind == PAUSE:
+        session.breaks.append(TrackingBreak(start=event.time))
+        session.paused = True
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=f"Paused: {event.text}"))
+    elif event.kind == RESUME:
+        current_break = session.breaks[-1]
+        current_break.end = event.time
+        duration = (current_break.end_at - current_break.start_at).total_seconds() / 60
+        current_break.duration_minutes = round(duration, 2)
+        session.paused = False
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=f"Resumed: {event.text}"))
+    elif event.kind == STOP:
+        session.stop = event.time
+        total_break_time = sum(b.duration_minutes or 0 for b in session.breaks)
+        total_duration = (session.stop_at - session.start_at).total_seconds() / 60
+        session.duration_minutes = round(total_duration - total_break_time, 2)
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=event.text))
+        if data.active_session == session.id:
+            data.active_session = None
+    elif event.kind == NOTE:
+        session.notes.append(TrackingNote(time=event.time, text=event.text or ""))
+    else:
+        raise ValueError(f"Unknown event kind {event.kind}")
+
+    return session
+
+# tomli_w writes every top-level key before the first of these table headers
+ENTRIES_HEADER = "\n[[entries]]\n"
+
+def in_range(start: datetime, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    return not ((since and start < since) or (until and start >= until))
+
 class TrackingStorage:
     def __init__(self, file_path: str = TRACKING_FILE):
         self.file_path = Path(file_path)
-    
+
     def load(self) -> TrackingData:
-        if not self.file_path.exists():
-            return TrackingData()
-        
-        with open(self.file_path, "rb") as f:
-            data = tomllib.load(f)
-            return self._deserialize(data)
-    
+        return self._deserialize(self._read_raw())
+
+    def load_active(self) -> TrackingData:
+        # Must contain at least the active session; `record` accepts the result as its `data`
+        return self._deserialize(self._read_active_raw())
+
     def save(self, data: TrackingData) -> None:
-        with open(self.file_path, "wb") as f:
-            tomli_w.dump(self._prepare_for_toml(data), f)
-    
+        self._write_toml(self.file_path, self._prepare_for_toml(data))
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        # `data` already has `event` applied but may hold only the active session, so the
+        # event's session is merged into the stored history; plain TOML can only rewrite everything
+        session = next(e for e in reversed(data.entries) if e.id == event.session_id)
+        raw = self._read_raw()
+        raw["active_session"] = data.active_session or ""
+        entries = raw.setdefault("entries", [])
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i]["id"] == session.id:
+                entries[i] = self._serialize_session(session)
+                break
+        else:
+            entries.append(self._serialize_session(session))
+        self._write_toml(self.file_path, raw)
+
+    def compact(self) -> None:
+        pass
+
+    def lock(self) -> ContextManager[None]:
+        return file_lock(self.sidecar_path("lock"))
+
+    def sidecar_path(self, suffix: str) -> Path:
+        return self.file_path.with_suffix(f".{suffix}")
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        # Newest first, filtered on session start. Entries are stored in start order, so the
+        # scan ends at the first one before `since` and older history is never parsed.
+        for session in self._iter_stored_sessions():
+            if since and session.start_at < since:
+                break
+            if in_range(session.start_at, since, until):
+                yield session
+
+    def _iter_stored_sessions(self) -> Iterator[TrackingSession]:
+        for entry in self._iter_raw_entries():
+            yield self._deserialize_session(entry)
+
+    def _iter_raw_entries(self) -> Iterator[Dict[str, Any]]:
+        # Newest first: each [[entries]] block is sliced off the end of the file and parsed
+        # only when reached, so stopping early never parses the older history
+        if not self.file_path.exists():
+            return
+        text = "\n" + self.file_path.read_bytes().decode("utf-8")
+        end = len(text)
+        while (begin := text.rfind(ENTRIES_HEADER, 0, end)) >= 0:
+            yield tomllib.loads(text[begin:end])["entries"][0]
+            end = begin
+
+    def _read_raw(self) -> Dict[str, Any]:
+        return self._read_toml(self.file_path)
+
+    def _read_active_raw(self) -> Dict[str, Any]:
+        # The top-level keys and the last entry, which is the active session if there is one.
+        # Only those two slices of the file are parsed; anything unexpected gets a full parse.
+        if not self.file_path.exists():
+            return {}
+        text = "\n" + self.file_path.read_bytes().decode("utf-8")
+        first = text.find(ENTRIES_HEADER)
+        if first < 0:
+            return tomllib.loads(text)
+        raw = tomllib.loads(text[:first])
+        if raw.get("active_session"):
+            last = tomllib.loads(text[text.rfind(ENTRIES_HEADER):])["entries"]
+            if last[0].get("id") != raw["active_session"]:
+                return self._read_raw()
+            raw["entries"] = last
+        return raw
+
+    def _read_toml(self, path: Path) -> Dict[str, Any]:
+        if not path.exists():
+            return {}
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+
+    def _write_toml(self, path: Path, raw: Dict[str, Any]) -> None:
+        atomic_write_bytes(path, tomli_w.dumps(raw).encode("utf-8"))
+
     def _prepare_for_toml(self, data: TrackingData) -> Dict[str, Any]:
-        result = {
+        return {
             "active_session": data.active_session if data.active_session else "",
-            "entries": []
+            "entries": [self._serialize_session(entry) for entry in data.entries]
         }
-        
-        for entry in data.entries:
-            entry_dict = {
-                "id": entry.id,
-                "start": entry.start,
-                "stop": entry.stop if entry.stop else "",
-                "duration_minutes": entry.duration_minutes if entry.duration_minutes else 0.0,
-                "paused": entry.paused,
-                "breaks": [
-                    {
-                        "start": b.start,
-                        "end": b.end if b.end else "",
-                        "duration_minutes": b.duration_minutes if b.duration_minutes else 0.0
-                    }
-                    for b in entry.breaks
-                ],
-                "notes": [asdict(note) for note in entry.notes]
-            }
-            result["entries"].append(entry_dict)
-        
-        return result
-    
+
+    def _serialize_session(self, entry: TrackingSession) -> Dict[str, Any]:
+        return entry.to_dict()
+
     def _deserialize(self, raw: dict) -> TrackingData:
         return TrackingData(
             active_session=raw.get("active_session") or None,
-            entries=[
-                TrackingSession(
-                    id=entry["id"],
-                    start=entry["start"],
-                    stop=entry.get("stop") or None,
-                    duration_minutes=entry.get("duration_minutes") or None,
-                    paused=entry.get("paused", False),
-                    breaks=[
-                        TrackingBreak(
-                            start=b["start"],
-                            end=b.get("end") or None,
-                            duration_minutes=b.get("duration_minutes") or None
-                        )
-                        for b in entry.get("breaks", [])
-                    ],
-                    notes=[TrackingNote(**note) for note in entry["notes"]]
-                )
-                for entry in raw.get("entries", [])
-            ]
+            entries=[self._deserialize_session(entry) for entry in raw.get("entries", [])]
         )
 
-class TrackingManager:
+    def _deserialize_session(self, entry: dict) -> TrackingSession:
+        return TrackingSession.from_dict(entry)
+
+class JournalTrackingStorage(TrackingStorage):
+    def __init__(self, file_path: str = TRACKING_FILE, compact_after: int = JOURNAL_COMPACT_EVENTS):
+        super().__init__(file_path)
+        self.journal_path = self.sidecar_path("journal")
+        self.compact_after = compact_after
+        self._last_seq = 0
+        self._pending = 0
+
+    def load(self) -> TrackingData:
+        raw = self._read_raw()
+        data = self._deserialize(raw)
+        self._last_seq = raw.get("journal_seq", 0)
+        self._pending = 0
+
+        for seq, event in self._read_journal():
+            # Events already folded into the snapshot by an interrupted compaction
+            if seq <= self._last_seq:
+                continue
+            apply_event(data, event)
+            self._last_seq = seq
+            self._pending += 1
+
+        return data
+
+    def load_active(self) -> TrackingData:
+        # The snapshot's active session with the journal replayed on top: journaled events
+        # only ever touch the session active at the time or ones they start
+        raw = self._read_active_raw()
+        data = self._deserialize(raw)
+        last_seq, pending = raw.get("journal_seq", 0), 0
+        try:
+            for seq, event in self._read_journal():
+                if seq <= last_seq:
+                    continue
+                apply_event(data, event)
+                last_seq, pending = seq, pending + 1
+        except ValueError:
+            return self.load()
+        self._last_seq, self._pending = last_seq, pending
+        return data
+
+    def save(self, data: TrackingData) -> None:
+        super().save(data)
+        self.journal_path.unlink(missing_ok=True)
+        self._pending = 0
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        self._last_seq += 1
+        append_line(self.journal_path, json.dumps({"seq": self._last_seq, **asdict(event)}))
+        self._pending += 1
+
+        if self._pending >= self.compact_after:
+            # `data` may be just the active session, so fold the journal into the full history
+            self.compact()
+
+    def compact(self) -> None:
+        self.save(self.load())
+
+    def _iter_stored_sessions(self) -> Iterator[TrackingSession]:
+        # Replayed like load_active, so only the snapshot's active session and the sessions
+        # the journal started differ from the stored entries; the rest stream from the file
+        raw = self._read_active_raw()
+        data = self._deserialize(raw)
+        last_seq = raw.get("journal_seq", 0)
+        try:
+            for seq, event in self._read_journal():
+                if seq > last_seq:
+                    apply_event(data, event)
+                    last_seq = seq
+        except ValueError:
+            yield from reversed(self.load().entries)
+            return
+
+        replayed = {session.id: session for session in data.entries}
+        stored = {entry["id"] for entry in raw.get("entries", [])}
+        yield from reversed([session for session in data.entries if session.id not in stored])
+        for entry in self._iter_raw_entries():
+            yield replayed.get(entry["id"]) or self._deserialize_session(entry)
+
+    def _prepare_for_toml(self, data: TrackingData) -> Dict[str, Any]:
+        result = super()._prepare_for_toml(data)
+        result["journal_seq"] = self._last_seq
+        return result
+
+    def _read_journal(self) -> Iterator[Tuple[int, TrackingEvent]]:
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append carries no complete event
+                    break
+                seq = record.pop("seq")
+                yield seq, TrackingEvent(**record)
+
+ACTIVE_FILE = "active.toml"
+
+class SegmentedTrackingStorage(TrackingStorage):
+    # Layout: <dir>/active.toml holds only the running session, finished sessions
+    # are archived into <dir>/YYYY-MM.toml by the month they started in.
+    def __init__(self, file_path: str = TRACKING_FILE):
+        super().__init__(file_path)
+        self.active_path = self.file_path / ACTIVE_FILE
+
+    def load(self) -> TrackingData:
+        entries: List[TrackingSession] = []
+        for segment in self._segment_paths():
+            entries.extend(self._load_segment(segment))
+
+        active = self.load_active()
+        archived = {e.id for e in entries}
+        entries.extend(e for e in active.entries if e.id not in archived)
+        return TrackingData(entries=entries, active_session=active.active_session)
+
+    def load_active(self) -> TrackingData:
+        return self._deserialize(self._read_toml(self.active_path))
+
+    def save(self, data: TrackingData) -> None:
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        archived = [e for e in data.entries if e.id != data.active_session]
+        months: Dict[str, List[TrackingSession]] = {}
+        for session in archived:
+            months.setdefault(self._month_of(session), []).append(session)
+
+        for segment in self._segment_paths():
+            if segment.stem not in months:
+                segment.unlink()
+        for month, sessions in months.items():
+            self._write_segment(self._segment_path(month), sessions)
+
+        self._write_active(find_session(data, data.active_session))
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        session = find_session(data, event.session_id)
+
+        if event.kind == STOP:
+            # Archive first: a crash in between leaves the session in both places, never in neither
+            segment = self._segment_path(self._month_of(session))
+            sessions = [e for e in self._load_segment(segment) if e.id != session.id]
+            sessions.append(session)
+            self._write_segment(segment, sessions)
+            self._write_active(None)
+        else:
+            self._write_active(session)
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        active = self.load_active().entries
+        yield from (e for e in active if in_range(e.start_at, since, until))
+
+        active_ids = {e.id for e in active}
+        first_month = since.strftime("%Y-%m") if since else ""
+        last_month = until.strftime("%Y-%m") if until else "9999-99"
+        # Segments are read newest first and only once the caller gets that far back
+        for segment in reversed(self._segment_paths()):
+            if segment.stem > last_month:
+                continue
+            if segment.stem < first_month:
+                break
+            for entry in reversed(self._load_segment(segment)):
+                if entry.id not in active_ids and in_range(entry.start_at, since, until):
+                    yield entry
+
+    def _write_active(self, session: TrackingSession) -> None:
+        data = TrackingData(entries=[session], active_session=session.id) if session else TrackingData()
+        self._write_toml(self.active_path, self._prepare_for_toml(data))
+
+    def _load_segment(self, path: Path) -> List[TrackingSession]:
+        return self._deserialize(self._read_toml(path)).entries
+
+    def _write_segment(self, path: Path, sessions: List[TrackingSession]) -> None:
+        self._write_toml(path, self._prepare_for_toml(TrackingData(entries=sessions)))
+
+    def _segment_paths(self) -> List[Path]:
+        if not self.file_path.exists():
+            return []
+        return sorted(p for p in self.file_path.glob("????-??.toml"))
+
+    def _segment_path(self, month: str) -> Path:
+        return self.file_path / f"{month}.toml"
+
+    @staticmethod
+    def _month_of(session: TrackingSession) -> str:
+        return session.start[:7]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    stop TEXT,
+    duration_minutes REAL,
+    paused INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_start ON sessions(start);
+CREATE TABLE IF NOT EXISTS breaks (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    seq INTEGER NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT,
+    duration_minutes REAL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE INDEX IF NOT EXISTS breaks_start ON breaks(start);
+CREATE TABLE IF NOT EXISTS notes (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    seq INTEGER NOT NULL,
+    time TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE INDEX IF NOT EXISTS notes_time ON notes(time);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+FETCH_BATCH_SIZE = 50
+# Bound parameters per IN (...) lookup; SQLite before 3.32 allows at most 999 per statement
+MAX_SQL_VARIABLES = 900
+
+class SqliteTrackingStorage(TrackingStorage):
+    def __init__(self, file_path: str = TRACKING_FILE):
+        super().__init__(file_path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Shared with the daemon writer thread; callers serialize access
+            self._conn = sqlite3.connect(self.file_path, check_same_thread=False)
+            self._conn.executescript(SQLITE_SCHEMA)
+        return self._conn
+
+    def load(self) -> TrackingData:
+        rows = self.conn.execute("SELECT * FROM sessions ORDER BY start").fetchall()
+        return TrackingData(entries=self._build_sessions(rows, everything=True), active_session=self._active_id())
+
+    def load_active(self) -> TrackingData:
+        active_id = self._active_id()
+        rows = self.conn.execute("SELECT * FROM sessions WHERE id = ?", (active_id,)).fetchall()
+        return TrackingData(entries=self._build_sessions(rows), active_session=active_id)
+
+    def save(self, data: TrackingData) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM notes")
+            self.conn.execute("DELETE FROM breaks")
+            self.conn.execute("DELETE FROM sessions")
+            for session in data.entries:
+                self._insert_session(session)
+            self._set_active(data.active_session)
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        session = find_session(data, event.session_id)
+        with self.conn:
+            self.conn.execute("DELETE FROM notes WHERE session_id = ?", (session.id,))
+            self.conn.execute("DELETE FROM breaks WHERE session_id = ?", (session.id,))
+            self.conn.execute("DELETE FROM sessions WHERE id = ?", (session.id,))
+            self._insert_session(session)
+            self._set_active(data.active_session)
+
+    def compact(self) -> None:
+        self.conn.execute("VACUUM")
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        conditions, params = [], []
+        if since:
+            conditions.append("start >= ?")
+            params.append(since.isoformat())
+        if until:
+            conditions.append("start < ?")
+            params.append(until.isoformat())
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        cursor = self.conn.execute(f"SELECT * FROM sessions {where}ORDER BY start DESC", params)
+        while rows := cursor.fetchmany(FETCH_BATCH_SIZE):
+            yield from self._build_sessions(rows)
+
+    def _active_id(self) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM state WHERE key = 'active_session'").fetchone()
+        return row[0] if row and row[0] else None
+
+    def _set_active(self, session_id: Optional[str]) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('active_session', ?)",
+                          (session_id or "",))
+
+    def _insert_session(self, session: TrackingSession) -> None:
+        self.conn.execute(
+            "INSERT INTO sessions (id, start, stop, duration_minutes, paused) VALUES (?, ?, ?, ?, ?)",
+            (session.id, session.start, session.stop, session.duration_minutes, int(session.paused))
+        )
+        self.conn.executemany(
+            "INSERT INTO breaks (session_id, seq, start, end, duration_minutes) VALUES (?, ?, ?, ?, ?)",
+            [(session.id, i, b.start, b.end, b.duration_minutes) for i, b in enumerate(session.breaks)]
+        )
+        self.conn.executemany(
+            "INSERT INTO notes (session_id, seq, time, text) VALUES (?, ?, ?, ?)",
+            [(session.id, i, n.time, n.text) for i, n in enumerate(session.notes)]
+        )
+
+    def _build_sessions(self, rows: Iterable[tuple], everything: bool = False) -> List[TrackingSession]:
+        # With `everything`, rows are the whole sessions table, so breaks and notes come from one
+        # ordered scan each instead of an IN (...) lookup per batch of ids
+        sessions = [
+            TrackingSession(id=id_, start=start, stop=stop or None,
+                            duration_minutes=duration or None, paused=bool(paused))
+            for id_, start, stop, duration, paused in rows
+        ]
+        if not sessions:
+            return sessions
+
+        by_id: Dict[str, TrackingSession] = {s.id: s for s in sessions}
+        if everything:
+            lookups = [("", ())]
+        else:
+            ids = list(by_id)
+            lookups = [(f"WHERE session_id IN ({','.join('?' * len(chunk))}) ", chunk)
+                       for chunk in (ids[i:i + MAX_SQL_VARIABLES] for i in range(0, len(ids), MAX_SQL_VARIABLES))]
+        for where, params in lookups:
+            for session_id, start, end, duration in self.conn.execute(
+                    f"SELECT session_id, start, end, duration_minutes FROM breaks {where}ORDER BY session_id, seq",
+                    params):
+                by_id[session_id].breaks.append(
+                    TrackingBreak(start=start, end=end or None, duration_minutes=duration or None))
+            for session_id, time, text in self.conn.execute(
+                    f"SELECT session_id, time, text FROM notes {where}ORDER BY session_id, seq", params):
+                by_id[session_id].notes.append(TrackingNote(time=time, text=text))
+        return sessions
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def open_storage(file_path: str = TRACKING_FILE) -> TrackingStorage:
+    path = Path(file_path)
+    if path.suffix in SQLITE_SUFFIXES:
+        return SqliteTrackingStorage(path)
+    if not path.suffix:
+        return SegmentedTrackingStorage(path)
+    if USE_JOURNAL:
+        return JournalTrackingStorage(path)
+    return TrackingStorage(path)
+
+ROLLUP_COMPACT_AFTER = 500
+
+def add_session(total: DailyRollup, session: TrackingSession) -> None:
+    total.active_minutes += session.duration_minutes or 0
+    total.sessions += 1
+    total.breaks += len(session.breaks)
+    total.notes += len(session.notes)
+
+def _values(rollup: DailyRollup) -> list:
+    return [rollup.active_minutes, rollup.sessions, rollup.breaks, rollup.notes]
+
+class DailyRollups:
+    # Per-day totals of finished sessions, keyed by the ISO date the session started on. A save
+    # appends the new totals of just the changed days to a .log next to the JSON snapshot, and
+    # the snapshot is rewritten every ROLLUP_COMPACT_AFTER log lines or after a rebuild.
+    def __init__(self, path: Path, compact_after: int = ROLLUP_COMPACT_AFTER):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".log")
+        self.compact_after = compact_after
+        self._days: Optional[Dict[str, DailyRollup]] = None
+        self._changed: Set[str] = set()
+        self._rebuilt = False
+        self._logged = 0
+        self._torn = False
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def days(self) -> Dict[str, DailyRollup]:
+        if self._days is None:
+            self._days = self._read()
+        return self._days
+
+    def add_session(self, session: TrackingSession) -> None:
+        day = session.start[:10]
+        add_session(self.days.setdefault(day, DailyRollup()), session)
+        self._changed.add(day)
+
+    def rebuild(self, sessions: Iterable[TrackingSession], active_session: Optional[str]) -> None:
+        self._days = {}
+        for session in sessions:
+            if session.id != active_session:
+                add_session(self._days.setdefault(session.start[:10], DailyRollup()), session)
+        self._rebuilt = True
+
+    def totals(self, first_day: date) -> DailyRollup:
+        total = DailyRollup()
+        first = first_day.isoformat()
+        for day, rollup in self.days.items():
+            if day >= first:
+                total.active_minutes += rollup.active_minutes
+                total.sessions += rollup.sessions
+                total.breaks += rollup.breaks
+                total.notes += rollup.notes
+        return total
+
+    def save(self) -> None:
+        if self._rebuilt or self._logged + len(self._changed) >= self.compact_after:
+            raw = {day: _values(rollup) for day, rollup in sorted(self.days.items())}
+            atomic_write_bytes(self.path, json.dumps(raw, separators=(",", ":")).encode("utf-8"))
+            self.log_path.unlink(missing_ok=True)
+            self._logged, self._torn, self._rebuilt = 0, False, False
+        elif self._changed:
+            # Whole-day totals rather than increments, so replaying a line twice is harmless
+            lines = [json.dumps([day, *_values(self.days[day])]) for day in sorted(self._changed)]
+            # End a line torn by an interrupted append so these stay readable
+            append_line(self.log_path, ("\n" if self._torn else "") + "\n".join(lines))
+            self._logged, self._torn = self._logged + len(lines), False
+        self._changed = set()
+
+    def _read(self) -> Dict[str, DailyRollup]:
+        days = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                days = {day: DailyRollup(*values) for day, values in json.load(f).items()}
+        if self.log_path.exists():
+            text = self.log_path.read_text(encoding="utf-8")
+            self._torn = bool(text) and not text.endswith("\n")
+            for line in text.splitlines():
+                self._logged += 1
+                try:
+                    day, *values = json.loads(line)
+                except (ValueError, TypeError):
+                    # A line torn by an interrupted append
+                    continue
+                days[day] = DailyRollup(*values)
+        return days
+
+TOKEN = re.compile(r"\w+")
+COMPACT_AFTER = 500
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+class SearchIndex:
+    # Inverted index over note text: term -> {session id: occurrences}, plus each session's start
+    # and matching notes so results print without touching the history. New notes are appended
+    # to a .log next to the JSON snapshot and folded into it every COMPACT_AFTER notes.
+    def __init__(self, path: Path, compact_after: int = COMPACT_AFTER):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".log")
+        self.compact_after = compact_after
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.starts: Dict[str, str] = {}
+        self.notes: Dict[str, List[Tuple[str, str]]] = {}
+        self._loaded = False
+        self._logged: Optional[int] = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def add_note(self, session_id: str, start: str, time: str, text: str) -> None:
+        # Only appends; the snapshot is parsed when searching or when the log is due to be folded in
+        line = json.dumps({"session": session_id, "start": start, "time": time, "text": text})
+        if self._logged is None:
+            logged = self.log_path.read_bytes() if self.log_path.exists() else b""
+            self._logged = logged.count(b"\n")
+            if logged and not logged.endswith(b"\n"):
+                # End a line torn by an interrupted append so this one stays readable
+                line = "\n" + line
+        append_line(self.log_path, line)
+        self._logged += 1
+        if self._loaded:
+            self._add(session_id, start, time, text)
+        if self._logged >= self.compact_after:
+            self._load()
+            self.save()
+
+    def add_notes(self, notes: Iterable[Tuple[str, str, str, str]]) -> None:
+        # (session id, session start, note time, text) in bulk: folded straight into the snapshot, no log lines
+        self._load()
+        for session_id, start, time, text in notes:
+            self._add(session_id, start, time, text)
+        self.save()
+
+    def rebuild(self, sessions: Iterable[TrackingSession]) -> None:
+        self.postings, self.starts, self.notes = {}, {}, {}
+        self._loaded = True
+        for session in sessions:
+            self.starts[session.id] = session.start
+            for note in session.notes:
+                self._add(session.id, session.start, note.time, note.text)
+        self.save()
+
+    def save(self) -> None:
+        raw = {"sessions": self.starts, "notes": self.notes, "postings": self.postings}
+        atomic_write_bytes(self.path, json.dumps(raw, separators=(",", ":")).encode("utf-8"))
+        self.log_path.unlink(missing_ok=True)
+        self._logged = 0
+
+    def search(self, query: str, limit: int = 10, now: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        # Sessions containing every query term, by tf-idf damped with age in years
+        self._load()
+        terms = tokenize(query)
+        if not terms or any(term not in self.postings for term in terms):
+            return []
+
+        matches = set.intersection(*(set(self.postings[term]) for term in terms))
+        now = now or datetime.now()
+        total = len(self.starts) or 1
+        scores = []
+        for session_id in matches:
+            relevance = sum(
+                self.postings[term][session_id] * math.log(1 + total / len(self.postings[term]))
+                for term in terms
+            )
+            age_days = max((now - datetime.fromisoformat(self.starts[session_id])).days, 0)
+            scores.append((session_id, relevance / (1 + age_days / 365)))
+        scores.sort(key=lambda item: (item[1], self.starts[item[0]]), reverse=True)
+        return scores[:limit]
+
+    def _add(self, session_id: str, start: str, time: str, text: str) -> None:
+        self.starts[session_id] = start
+        self.notes.setdefault(session_id, []).append((time, text))
+        for term in tokenize(text):
+            hits = self.postings.setdefault(term, {})
+            hits[session_id] = hits.get(session_id, 0) + 1
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.starts, self.postings = raw["sessions"], raw["postings"]
+            self.notes = {session_id: [tuple(note) for note in notes] for session_id, notes in raw["notes"].items()}
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line torn by an interrupted append
+                        continue
+                    self._add(record["session"], record["start"], record["time"], record["text"])
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EPOCH = datetime(1970, 1, 1)
+DAY = 86400
+HOUR = 3600
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# Columns per session in the stats cache file: start, stop, active minutes, break minutes
+ROW_WIDTH = 4
+
+@dataclass
+class StatsReport:
+    sessions: int
+    percentiles: Dict[float, float]
+    break_ratio: float
+    daily: List[float]
+    weekday: List[float]
+    hours: List[float]
+
+class SessionColumns:
+    # Finished sessions as flat numeric arrays: wall-clock seconds since EPOCH (local time,
+    # no timezone) and minutes. Every report below reads these instead of the dataclasses.
+    def __init__(self, sessions: Iterable[TrackingSession] = ()):
+        self.start = array("d")
+        self.stop = array("d")
+        self.active = array("d")
+        self.breaks = array("d")
+        for session in sessions:
+            self.add(session)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def add(self, session: TrackingSession) -> None:
+        if session.stop is None:
+            return
+        start = (session.start_at - EPOCH).total_seconds()
+        stop = (session.stop_at - EPOCH).total_seconds()
+        active = session.duration_minutes or 0.0
+        self.start.append(start)
+        self.stop.append(stop)
+        self.active.append(active)
+        # Whatever a stopped session did not spend active was spent on breaks, so the
+        # break lists never have to be decoded
+        self.breaks.append(max((stop - start) / 60 - active, 0.0))
+
+    def since(self, moment: datetime) -> "SessionColumns":
+        first = (moment - EPOCH).total_seconds()
+        selected = SessionColumns()
+        for column in ("start", "stop", "active", "breaks"):
+            source = getattr(self, column)
+            getattr(selected, column).extend(value for value, start in zip(source, self.start) if start >= first)
+        return selected
+
+    def percentiles(self, *ranks: float) -> Dict[float, float]:
+        ordered = sorted(self.active)
+        if not ordered:
+            return {rank: 0.0 for rank in ranks}
+        return {rank: ordered[max(math.ceil(rank / 100 * len(ordered)) - 1, 0)] for rank in ranks}
+
+    def report(self, ranks: Sequence[float] = (50, 90, 99), last_day: Optional[date] = None) -> StatsReport:
+        # Weekday, hour and per-day buckets from a single pass over the columns, vectorised with
+        # numpy when installed. Hours get the active minutes spread over the clock hours each
+        # session spans; days run dense from the first session's day through last_day.
+        weekday, hours, daily = [0.0] * 7, [0.0] * 24, []
+        if self.start:
+            first = int(min(self.start) // DAY)
+            last = (last_day - EPOCH.date()).days if last_day else int(max(self.start) // DAY)
+            daily = [0.0] * (max(last, first) - first + 1)
+        if self.start and numpy is not None:
+            weekday, hours, daily = self._buckets_numpy(first, len(daily))
+        else:
+            for start, stop, active in zip(self.start, self.stop, self.active):
+                day = int(start // DAY)
+                # 1970-01-01 was a Thursday
+                weekday[(day + 3) % 7] += active
+                if day - first < len(daily):
+                    daily[day - first] += active
+                if stop <= start:
+                    continue
+                scale = active / (stop - start)
+                t = start
+                while t < stop:
+                    boundary = min(stop, (t // HOUR + 1) * HOUR)
+                    hours[int(t // HOUR) % 24] += (boundary - t) * scale
+                    t = boundary
+
+        active_total, break_total = sum(self.active), sum(self.breaks)
+        total = active_total + break_total
+        return StatsReport(sessions=len(self), percentiles=self.percentiles(*ranks),
+                           break_ratio=break_total / total if total else 0.0,
+                           daily=daily, weekday=weekday, hours=hours)
+
+    def _buckets_numpy(self, first: int, days: int) -> Tuple[List[float], List[float], List[float]]:
+        start, stop, active = (numpy.frombuffer(column) for column in (self.start, self.stop, self.active))
+        day = (start // DAY).astype(numpy.int64)
+        weekday = numpy.bincount((day + 3) % 7, weights=active, minlength=7)
+        shown = day - first < days
+        daily = numpy.bincount(day[shown] - first, weights=active[shown], minlength=days)
+
+        spanned = stop > start
+        start, stop, active = start[spanned], stop[spanned], active[spanned]
+        hours = numpy.zeros(24)
+        if len(start):
+            scale = active / (stop - start)
+            first_hour, last_hour = (start // HOUR).astype(numpy.int64), (stop // HOUR).astype(numpy.int64)
+            base = first_hour.min()
+            size = last_hour.max() - base + 2
+
+            def per_hour(hour, minutes):
+                return numpy.bincount(hour - base, weights=minutes, minlength=size)
+
+            # Minutes per absolute hour: the partial first and last hours directly, the full hours
+            # in between as +/- steps whose running sum fills them
+            single, spread = first_hour == last_hour, first_hour != last_hour
+            totals = numpy.zeros(size)
+            totals += per_hour(first_hour[single], ((stop - start) * scale)[single])
+            totals += per_hour(first_hour[spread], (((first_hour + 1) * HOUR - start) * scale)[spread])
+            totals += per_hour(last_hour[spread], ((stop - last_hour * HOUR) * scale)[spread])
+            full = scale[spread] * HOUR
+            totals += numpy.cumsum(per_hour(first_hour[spread] + 1, full) - per_hour(last_hour[spread], full))
+            hours = numpy.bincount((numpy.arange(size) + base) % 24, weights=totals, minlength=24)
+        return weekday.tolist(), hours.tolist(), daily.tolist()
+
+class StatsCache:
+    # SessionColumns of every finished session kept in a sidecar file, so stats never parses history.
+    # Saves append the rows added since the last one; only a rebuild rewrites the file.
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._columns: Optional[SessionColumns] = None
+        self._saved = 0
+        self._rebuilt = False
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def columns(self) -> SessionColumns:
+        if self._columns is None:
+            self._columns = self._read()
+            self._saved = len(self._columns)
+        return self._columns
+
+    def add_session(self, session: TrackingSession) -> None:
+        self.columns.add(session)
+
+    def rebuild(self, sessions: Iterable[TrackingSession]) -> None:
+        self._columns = SessionColumns(sessions)
+        self._rebuilt = True
+
+    def save(self) -> None:
+        rows = self._rows(0 if self._rebuilt else self._saved)
+        if self._rebuilt:
+            atomic_write_bytes(self.path, rows.tobytes())
+        elif rows:
+            with open(self.path, "ab") as f:
+                # Drop a row torn by an interrupted append so the new ones stay aligned
+                f.truncate(f.tell() - f.tell() % (8 * ROW_WIDTH))
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        self._saved, self._rebuilt = len(self.columns), False
+
+    def _rows(self, first: int) -> array:
+        # Rows interleaved in native byte order; the cache never leaves this machine
+        columns = self.columns
+        rows = array("d", bytes(8 * ROW_WIDTH * (len(columns) - first)))
+        for i, column in enumerate((columns.start, columns.stop, columns.active, columns.breaks)):
+            rows[i::ROW_WIDTH] = column[first:]
+        return rows
+
+    def _read(self) -> SessionColumns:
+        columns = SessionColumns()
+        if not self.path.exists():
+            return columns
+        data = self.path.read_bytes()
+        rows = array("d")
+        rows.frombytes(data[:len(data) - len(data) % (8 * ROW_WIDTH)])
+        for i, column in enumerate((columns.start, columns.stop, columns.active, columns.breaks)):
+            column.extend(rows[i::ROW_WIDTH])
+        return columns
+
+def rolling_averages(daily: List[float], window: int) -> List[float]:
+    prefix = [0.0]
+    for minutes in daily:
+        prefix.append(prefix[-1] + minutes)
+    return [(prefix[i] - prefix[max(i - window, 0)]) / min(i, window) for i in range(1, len(prefix))]
+
+# Column types follow Arrow's names so the columnar output maps onto a typed reader directly
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "sessions": {
+        "id": "string",
+        "start": "timestamp",
+        "stop": "timestamp",
+        "duration_minutes": "float64",
+        "paused": "bool",
+        "breaks": "int64",
+        "notes": "int64",
+    },
+    "breaks": {
+        "session_id": "string",
+        "seq": "int64",
+        "start": "timestamp",
+        "end": "timestamp",
+        "duration_minutes": "float64",
+    },
+    "notes": {
+        "session_id": "string",
+        "seq": "int64",
+        "time": "timestamp",
+        "text": "string",
+    },
+}
+
+FORMATS = ("csv", "jsonl", "columnar")
+BATCH_SIZE = 1024
+
+def iter_rows(sessions: Iterable[TrackingSession]) -> Iterator[Tuple[str, tuple]]:
+    for s in sessions:
+        yield "sessions", (s.id, s.start, s.stop, s.duration_minutes or 0.0, s.paused,
+                           len(s.breaks), len(s.notes))
+        for seq, b in enumerate(s.breaks):
+            yield "breaks", (s.id, seq, b.start, b.end, b.duration_minutes or 0.0)
+        for seq, n in enumerate(s.notes):
+            yield "notes", (s.id, seq, n.time, n.text)
+
+def export_jsonl(sessions: Iterable[TrackingSession], out: TextIO) -> int:
+    count = 0
+    for table, row in iter_rows(sessions):
+        out.write(json.dumps({"record": table, **dict(zip(SCHEMA[table], row))}) + "\n")
+        count += 1
+    return count
+
+def export_csv(sessions: Iterable[TrackingSession], directory: Path) -> int:
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {table: open(directory / f"{table}.csv", "w", newline="", encoding="utf-8") for table in SCHEMA}
+    try:
+        writers = {table: csv.writer(f) for table, f in files.items()}
+        for table, writer in writers.items():
+            writer.writerow(SCHEMA[table])
+        count = 0
+        for table, row in iter_rows(sessions):
+            writers[table].writerow(row)
+            count += 1
+        return count
+    finally:
+        for f in files.values():
+            f.close()
+
+def export_columnar(sessions: Iterable[TrackingSession], out: TextIO, batch_size: int = BATCH_SIZE) -> int:
+    # A schema line, then record batches holding one array per column
+    out.write(json.dumps({"schema": SCHEMA}) + "\n")
+    batches: Dict[str, List[tuple]] = {table: [] for table in SCHEMA}
+    count = 0
+    for table, row in iter_rows(sessions):
+        batches[table].append(row)
+        count += 1
+        if len(batches[table]) >= batch_size:
+            _write_batch(out, table, batches[table])
+            batches[table] = []
+    for table, rows in batches.items():
+        if rows:
+            _write_batch(out, table, rows)
+    return count
+
+def _write_batch(out: TextIO, table: str, rows: List[tuple]) -> None:
+    columns = dict(zip(SCHEMA[table], (list(column) for column in zip(*rows))))
+    out.write(json.dumps({"table": table, "length": len(rows), "columns": columns}) + "\n")
+
+def socket_path(file_path: str = TRACKING_FILE) -> Path:
+    return Path(file_path).with_suffix(".sock")
+
+def send_command(argv: List[str], stdin: Optional[str] = None,
+                 file_path: str = TRACKING_FILE) -> Optional[str]:
+    # None means no daemon is listening and the caller should use the files directly
+    path = socket_path(file_path)
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.sendall(json.dumps({"argv": argv, "stdin": stdin}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reply:
+                response = reply.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+
+    # The daemon may already have run the command, so a bad reply is an error, not a reason to rerun it here
+    try:
+        reply = json.loads(response)
+        output = reply["output"]
+    except (ValueError, KeyError, TypeError):
+        print(f"Error: no valid reply from the tracker daemon at {path}", file=sys.stderr)
+        return ""
+    if reply.get("stderr"):
+        print(reply["stderr"], end="", file=sys.stderr)
+    return output
+
+def locked(method):
+    # Serializes the whole load -> check -> record cycle across tracker processes
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.storage.lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _rounded(rollup: Optional[DailyRollup]) -> Optional[tuple]:
+    if rollup is None:
+        return None
+    return (round(rollup.active_minutes, 2), rollup.sessions, rollup.breaks, rollup.notes)
+
+def _check_backfill(sessions: Dict[str, TrackingSession], starts: List[Tuple[datetime, str]],
+                    event: TrackingEvent) -> None:
+    # Live commands are stamped "now"; backfilled ones may be out of order or land inside other sessions
+    at = datetime.fromisoformat(event.time)
+    if event.kind == START:
+        if event.session_id in sessions:
+            raise ValueError(f"Session {event.session_id} already exists")
+        i = bisect(starts, (at, event.session_id))
+        before = sessions[starts[i - 1][1]] if i else None
+        if before and (not before.stop or at < before.stop_at):
+            raise ValueError(f"start at {event.time} is inside session {before.id}")
+        return
+
+    session = sessions[event.session_id]
+    last = last_event_time(session)
+    if at < datetime.fromisoformat(last):
+        raise ValueError(f"{event.kind} at {event.time} is before the session's last event at {last}")
+    if event.kind == STOP:
+        i = bisect(starts, (session.start_at, session.id))
+        if i < len(starts) and starts[i][0] < at:
+            raise ValueError(f"stop at {event.time} runs into session {starts[i][1]}")
+
+def _bar(value: float, peak: float, width: int = 30) -> str:
+    return "#" * round(width * value / peak) if peak else ""
+
+class TrackingService:
     def __init__(self, storage: TrackingStorage):
         self.storage = storage
-        self.data = storage.load()
-    
+        # Nothing is read until a command needs it; mutators reload the active session first
+        self.data = TrackingData()
+        self.rollups = DailyRollups(storage.sidecar_path("rollup.json"))
+        self.index = SearchIndex(storage.sidecar_path("index.json"))
+        self.stats = StatsCache(storage.sidecar_path("stats.bin"))
+
     def validate_note(self, text: Optional[str]) -> Optional[str]:
         if text is not None:
             if not text.strip():
@@ -118,130 +1382,200 @@ class TrackingManager:
 
     def get_current_session(self) -> Optional[TrackingSession]:
         # Always load fresh data first
-        self.data = self.storage.load()
-        if not self.data.active_session:
-            return None
-        session = next((e for e in self.data.entries if e.id == self.data.active_session), None)
+        self.data = self.storage.load_active()
+        return find_session(self.data, self.data.active_session)
+
+    def _event(self, kind: str, timestamp: str, text: Optional[str]) -> TrackingEvent:
+        # Always against fresh data; another process may have moved the session on
+        self.data = self.storage.load_active()
+        return make_event(self.data, kind, timestamp, text)
+
+    def _commit(self, event: TrackingEvent) -> TrackingSession:
+        validate_event(self.data, event)
+        session = apply_event(self.data, event)
+        self.storage.record(self.data, event)
+        # Without a rollup file there is nothing to keep current; the next summary rebuilds it
+        if event.kind == STOP and self.rollups.exists():
+            self.rollups.add_session(session)
+            self.rollups.save()
+        if event.kind == STOP and self.stats.exists():
+            self.stats.add_session(session)
+            self.stats.save()
+        if event.text and self.index.exists():
+            note = session.notes[-1]
+            self.index.add_note(session.id, session.start, note.time, note.text)
         return session
-    
-    def start_tracking(self, note: Optional[str] = None) -> None:
-        if self.data.active_session:
-            print("Error: Session already active")
+
+    @locked
+    def rebuild_rollups(self) -> DailyRollups:
+        active = self.storage.load_active().active_session
+        self.rollups.rebuild(self.storage.iter_sessions(), active)
+        self.rollups.save()
+        return self.rollups
+
+    @locked
+    def rebuild_stats(self) -> StatsCache:
+        self.stats.rebuild(self.storage.iter_sessions())
+        self.stats.save()
+        return self.stats
+
+    def update_rollups(self, check_only: bool = False) -> None:
+        if not check_only:
+            print(f"Rebuilt rollups for {len(self.rebuild_rollups().days)} days")
+            print(f"Rebuilt stats for {len(self.rebuild_stats().columns)} sessions")
+            return
+
+        data = self.storage.load()
+        expected = DailyRollups(self.rollups.path)
+        expected.rebuild(data.entries, data.active_session)
+        stored = self.rollups.days
+        mismatched = [
+            day for day in sorted(set(stored) | set(expected.days))
+            if _rounded(stored.get(day)) != _rounded(expected.days.get(day))
+        ]
+        for day in mismatched:
+            print(f"{day}: stored {stored.get(day)} != rebuilt {expected.days.get(day)}")
+        print(f"{len(mismatched)} of {len(expected.days)} days differ")
+
+    @locked
+    def rebuild_index(self) -> SearchIndex:
+        self.index.rebuild(self.storage.iter_sessions())
+        return self.index
+
+    def search_notes(self, query: str, limit: int = 10) -> None:
+        index = self.index if self.index.exists() else self.rebuild_index()
+        results = index.search(query, limit)
+        if not results:
+            print(f"No notes match '{query}'")
             return
-        
+
+        terms = set(tokenize(query))
+        for session_id, score in results:
+            print(f"Session {session_id} ({index.starts[session_id]}) score {score:.2f}")
+            for time, text in index.notes[session_id]:
+                if terms & set(tokenize(text)):
+                    print(f"    {time}: {text}")
+
+    def summarize(self, first_day: date) -> DailyRollup:
+        rollups = self.rollups if self.rollups.exists() else self.rebuild_rollups()
+        totals = rollups.totals(first_day)
+
+        # The running session is not rolled up until it stops
+        active = self.get_current_session()
+        if active and active.start_at.date() >= first_day:
+            add_session(totals, active)
+        return totals
+
+    @locked
+    def start_tracking(self, note: Optional[str] = None) -> None:
         timestamp = datetime.now().isoformat()
-        session_id = datetime.now().strftime("%Y%m%d%H%M%S")
-        
-        new_session = TrackingSession(id=session_id, start=timestamp)
-        if note:
-            new_session.notes.append(TrackingNote(time=timestamp, text=note))
-        
-        self.data.entries.append(new_session)
-        self.data.active_session = session_id
-        self.storage.save(self.data)
-        
+        self._commit(self._event(START, timestamp, note))
         print(f"Started tracking at {timestamp}" + (f" | Note: {note}" if note else ""))
-    
+
+    @locked
     def pause_tracking(self, note: Optional[str] = None) -> None:
-        if not (session := self.get_current_session()):
-            print("Error: No active session to pause")
-            return
-        
-        if session.paused:
-            print("Error: Session already paused")
-            return
-        
         timestamp = datetime.now().isoformat()
-        session.breaks.append(TrackingBreak(start=timestamp))
-        session.paused = True
-        if note:
-            session.notes.append(TrackingNote(time=timestamp, text=f"Paused: {note}"))
-        self.storage.save(self.data)
-        
+        self._commit(self._event(PAUSE, timestamp, note))
         print(f"Paused tracking at {timestamp}" + (f" | Note: {note}" if note else ""))
-    
+
+    @locked
     def resume_tracking(self, note: Optional[str] = None) -> None:
-        if not (session := self.get_current_session()):
-            print("Error: No active session to resume")
-            return
-        
-        if not session.paused:
-            print("Error: Session not paused")
-            return
-        
-        if not session.breaks or session.breaks[-1].end is not None:
-            print("Error: No active break to resume from")
-            return
-        
         timestamp = datetime.now().isoformat()
-        current_break = session.breaks[-1]
-        current_break.end = timestamp
-        duration = (datetime.fromisoformat(timestamp) - 
-                  datetime.fromisoformat(current_break.start)).total_seconds() / 60
-        current_break.duration_minutes = round(duration, 2)
-        session.paused = False
-        if note:
-            session.notes.append(TrackingNote(time=timestamp, text=f"Resumed: {note}"))
-        self.storage.save(self.data)
-        
-        duration_str = str(timedelta(minutes=duration)).split(".")[0]
-        print(f"Resumed tracking at {timestamp} | Break duration: {duration_str}" + 
+        session = self._commit(self._event(RESUME, timestamp, note))
+
+        duration_str = str(timedelta(minutes=session.breaks[-1].duration_minutes)).split(".")[0]
+        print(f"Resumed tracking at {timestamp} | Break duration: {duration_str}" +
               (f" | Note: {note}" if note else ""))
-    
+
+    @locked
     def stop_tracking(self, note: Optional[str] = None) -> None:
-        if not (session := self.get_current_session()):
-            print("Error: No active session")
-            return
-        
-        if session.paused:
-            print("Error: Cannot stop while paused. Resume first.")
-            return
-        
         timestamp = datetime.now().isoformat()
-        
-        # Calculate active duration (excluding breaks)
-        total_break_time = sum(b.duration_minutes or 0 for b in session.breaks)
-        total_duration = (datetime.fromisoformat(timestamp) - 
-                       datetime.fromisoformat(session.start)).total_seconds() / 60
-        active_duration = total_duration - total_break_time
-        
-        session.stop = timestamp
-        session.duration_minutes = round(active_duration, 2)
-        if note:
-            session.notes.append(TrackingNote(time=timestamp, text=note))
-        self.data.active_session = None
-        self.storage.save(self.data)
-        
-        duration_str = str(timedelta(minutes=active_duration)).split(".")[0]
-        print(f"Stopped tracking at {timestamp} | Active duration: {duration_str}" + 
+        session = self._commit(self._event(STOP, timestamp, note))
+
+        # duration_minutes is the active time, breaks excluded
+        duration_str = str(timedelta(minutes=session.duration_minutes)).split(".")[0]
+        print(f"Stopped tracking at {timestamp} | Active duration: {duration_str}" +
               (f" | Note: {note}" if note else ""))
-    
+
+    @locked
     def add_note(self, note: str) -> None:
-        if not note.strip():
-            print("Error: Cannot add an empty note")
-            return
-        if not (session := self.get_current_session()):
-            print("Error: No active session")
-            return
-        
         timestamp = datetime.now().isoformat()
-        session.notes.append(TrackingNote(time=timestamp, text=note))
-        self.storage.save(self.data)
+        self._commit(self._event(NOTE, timestamp, note))
         print(f"Note added at {timestamp}: {note}")
-    
+
+    @locked
+    def apply_commands(self, lines: Iterable[str]) -> None:
+        # The whole batch is checked against the state machine before anything is written.
+        # Events only ever change the session active when the batch starts (or ones it creates),
+        # so working on a copy of that one session leaves the loaded data untouched on failure.
+        data = self.storage.load()
+        work = TrackingData(list(data.entries), data.active_session)
+        for i, entry in enumerate(work.entries):
+            if entry.id == work.active_session:
+                work.entries[i] = copy.deepcopy(entry)
+        sessions = {entry.id: entry for entry in work.entries}
+        starts = sorted((entry.start_at, entry.id) for entry in work.entries)
+        stopped, noted = [], []
+        applied = started = 0
+
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                time, kind, text = parse_event_line(line)
+                event = make_event(work, kind, time, self.validate_note(text))
+                validate_event(work, event)
+                _check_backfill(sessions, starts, event)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from None
+
+            session = apply_event(work, event)
+            applied += 1
+            if kind == START:
+                sessions[session.id] = session
+                insort(starts, (session.start_at, session.id))
+                started += 1
+            elif kind == STOP:
+                stopped.append(session)
+            if text:
+                noted.append((session.id, session.start, session.notes[-1].time, session.notes[-1].text))
+
+        if started and work.active_session and starts[-1][1] != work.active_session:
+            raise ValueError(f"Session {work.active_session} is left open before session {starts[-1][1]}")
+        if not applied:
+            print("No commands to apply")
+            return
+        if started:
+            # Backfilled sessions may predate existing ones; storage expects start order
+            work.entries.sort(key=lambda entry: entry.start_at)
+        self.data = work
+        self.storage.save(work)
+        if stopped and self.rollups.exists():
+            for session in stopped:
+                self.rollups.add_session(session)
+            self.rollups.save()
+        if stopped and self.stats.exists():
+            for session in stopped:
+                self.stats.add_session(session)
+            self.stats.save()
+        if noted and self.index.exists():
+            self.index.add_notes(noted)
+        print(f"Applied {applied} commands: {started} sessions started, {len(stopped)} stopped")
+
     def show_status(self) -> None:
         if not (session := self.get_current_session()):
             print("No active session")
             return
-        
+
         now = datetime.now()
-        start_time = datetime.fromisoformat(session.start)
-        
+        start_time = session.start_at
+
         if session.paused:
             status = "PAUSED"
             last_break = session.breaks[-1] if session.breaks else None
             if last_break and last_break.end is None:
-                break_duration = (now - datetime.fromisoformat(last_break.start)).total_seconds() / 60
+                break_duration = (now - last_break.start_at).total_seconds() / 60
                 duration_str = str(timedelta(minutes=break_duration)).split(".")[0]
                 print(f"Break duration: {duration_str}")
         else:
@@ -251,7 +1585,7 @@ class TrackingManager:
             active_duration = total_duration - total_break_time
             duration_str = str(timedelta(minutes=active_duration)).split(".")[0]
             print(f"Active duration: {duration_str}")
-        
+
         print(f"Status: {status}")
         print(f"Session started at {session.start}")
         print(f"Breaks taken: {len(session.breaks)}")
@@ -259,16 +1593,19 @@ class TrackingManager:
             print("Recent notes:")
             for note in session.notes[-5:]:
                 print(f"  {note.time}: {note.text}")
-    
-    def show_history(self, days: int = 7) -> None:
-        cutoff = datetime.now() - timedelta(days=days)
-        print(f"Last {days} days history:")
+
+    def show_history(self, days: int = 7, limit: Optional[int] = None, offset: int = 0,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None) -> None:
+        if since or until:
+            print(f"History from {since or 'the beginning'} until {until or 'now'}:")
+        else:
+            since = datetime.now() - timedelta(days=days)
+            print(f"Last {days} days history:")
         print("=" * 50)
-        
-        for entry in reversed(self.data.entries):
-            if datetime.fromisoformat(entry.start) < cutoff:
-                continue
-            
+
+        page = islice(self.storage.iter_sessions(since=since, until=until),
+                      offset, offset + limit if limit is not None else None)
+        for entry in page:
             duration = f"{entry.duration_minutes:.0f}min" if entry.duration_minutes else "Active"
             print(f"Session {entry.id}:")
             print(f"  Start:  {entry.start}")
@@ -279,26 +1616,60 @@ class TrackingManager:
                 print("  Notes:")
                 for note in entry.notes:
                     print(f"    {note.time}: {note.text}")
-            print("-" * 50)
-    
+            print("-" * 50, flush=True)
+
     def show_summary(self, today_only: bool = False) -> None:
-        cutoff = (datetime.now().replace(hour=0, minute=0, second=0) 
-                if today_only else datetime.now() - timedelta(days=30))
-        
-        sessions = [e for e in self.data.entries if datetime.fromisoformat(e.start) >= cutoff]
-        total_time = sum(e.duration_minutes or 0 for e in sessions)
-        total_breaks = sum(len(e.breaks) for e in sessions)
-        
+        # Whole days, so the totals come straight from the daily rollups
+        first_day = date.today() if today_only else date.today() - timedelta(days=30)
+        totals = self.summarize(first_day)
+        total_time = totals.active_minutes
+        sessions = totals.sessions
+
         print(f"Summary ({'today' if today_only else 'last 30 days'}):")
         print("=" * 50)
-        print(f"Sessions:  {len(sessions)}")
+        print(f"Sessions:  {sessions}")
         print(f"Total time: {total_time/60:.1f} hours")
-        print(f"Total breaks: {total_breaks}")
-        print(f"Avg session: {total_time/len(sessions):.1f} min" if sessions else "No sessions")
-        print(f"Total notes: {sum(len(e.notes) for e in sessions)}")
+        print(f"Total breaks: {totals.breaks}")
+        print(f"Avg session: {total_time/sessions:.1f} min" if sessions else "No sessions")
+        print(f"Total notes: {totals.notes}")
+        print("=" * 50)
+
+    def show_stats(self, days: Optional[int] = None) -> None:
+        # Read from the stats cache, like summaries from the rollups; the first run builds it
+        columns = (self.stats if self.stats.exists() else self.rebuild_stats()).columns
+        if days:
+            columns = columns.since(datetime.now() - timedelta(days=days))
+        report = columns.report((50, 90, 99), date.today())
+
+        print(f"Stats ({f'last {days} days' if days else 'all time'}, {report.sessions} sessions):")
+        print("=" * 50)
+        if not report.sessions:
+            print("No sessions")
+            print("=" * 50)
+            return
+
+        p = report.percentiles
+        print(f"Session length: p50 {p[50]:.0f} min | p90 {p[90]:.0f} min | p99 {p[99]:.0f} min")
+        print(f"Break ratio: {report.break_ratio:.1%}")
+        for window in (7, 30):
+            rolling = rolling_averages(report.daily, window)
+            print(f"{window}-day average: {rolling[-1]/60:.1f} h/day (best {max(rolling)/60:.1f} h/day)")
+
+        print("By weekday:")
+        for name, minutes in zip(WEEKDAYS, report.weekday):
+            print(f"  {name}  {minutes/60:7.1f} h  {_bar(minutes, max(report.weekday))}")
+        print("By hour:")
+        for hour, minutes in enumerate(report.hours):
+            if minutes:
+                print(f"  {hour:02d}   {minutes/60:7.1f} h  {_bar(minutes, max(report.hours))}")
         print("=" * 50)
 
-def main():
+# Commands a running `tracker serve` daemon answers from memory
+SERVICE_COMMANDS = {
+    "start", "pause", "resume", "stop", "note", "apply", "status", "history", "summary", "stats", "search", "rollup",
+}
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Time tracking utility")
     subparsers = parser.add_subparsers(dest="command", required=True)
     
@@ -322,20 +1693,67 @@ def main():
     note_parser = subparsers.add_parser("note")
     note_parser.add_argument("note", help="Note text (max 300 chars)")
     
+    # Apply command
+    apply_parser = subparsers.add_parser("apply", help="Apply timestamped commands in one pass, e.g. to backfill history")
+    apply_parser.add_argument("file", help="File with one '<ISO time> <start|pause|resume|stop|note> [note]' per line, or - for stdin")
+    
     # Status command
     subparsers.add_parser("status")
     
     # History command
     history_parser = subparsers.add_parser("history")
     history_parser.add_argument("--days", type=int, default=7, help="Days to show")
+    history_parser.add_argument("--limit", type=int, help="Show at most this many sessions")
+    history_parser.add_argument("--offset", type=int, default=0, help="Skip this many newest sessions")
+    history_parser.add_argument("--since", type=datetime.fromisoformat, help="Sessions started at or after (ISO date/time)")
+    history_parser.add_argument("--until", type=datetime.fromisoformat, help="Sessions started before (ISO date/time)")
     
     # Summary command
     summary_parser = subparsers.add_parser("summary")
     summary_parser.add_argument("--today", action="store_true", help="Today only")
     
-    args = parser.parse_args()
-    tracker = TrackingManager(TrackingStorage())
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Weekday/hour breakdowns, percentiles and rolling averages")
+    stats_parser.add_argument("--days", type=int, help="Only sessions from the last N days (default: all)")
+    
+    # Search command
+    search_parser = subparsers.add_parser("search", help="Find sessions by note text")
+    search_parser.add_argument("terms", nargs="*", help="Words that must all appear in a session's notes")
+    search_parser.add_argument("--limit", type=int, default=10, help="Maximum sessions to show")
+    search_parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from all notes first")
+    
+    # Rollup command
+    rollup_parser = subparsers.add_parser("rollup", help="Rebuild daily summary rollups and the stats cache from raw sessions")
+    rollup_parser.add_argument("--check", action="store_true", help="Only report days where rollups differ")
+    
+    # Compact command
+    subparsers.add_parser("compact", help="Fold journaled events into the snapshot file")
+    
+    # Migrate command
+    migrate_parser = subparsers.add_parser("migrate", help="Copy all history into another storage location")
+    migrate_parser.add_argument("target", help="Destination .toml file, .db file for SQLite, or a directory for monthly segments")
+    migrate_parser.add_argument("--source", default=TRACKING_FILE, help="Storage to read from")
     
+    # Export command
+    export_parser = subparsers.add_parser(
+        "export", help="Stream sessions, breaks and notes as flat typed records",
+        description="Records are written newest session first as they are read. SQLite storage is read in "
+                    "row batches and monthly segments one month at a time; a .toml file, journaled or not, is "
+                    "read into memory whole and then parsed one session at a time.")
+    export_parser.add_argument("--format", choices=("csv", "jsonl", "columnar"), default="jsonl", help="Output format")
+    export_parser.add_argument("-o", "--output", help="Output file (directory for csv); stdout if omitted")
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="Sessions started at or after (ISO date/time)")
+    export_parser.add_argument("--until", type=datetime.fromisoformat, help="Sessions started before (ISO date/time)")
+    
+    # Serve command
+    subparsers.add_parser("serve", help="Keep the tracker in memory and answer commands over a local socket")
+    
+    # Bench command; its options belong to tool/tracker/bench.py
+    subparsers.add_parser("bench", add_help=False, help="Benchmark storage backends on synthetic histories (see bench -h)")
+    
+    return parser
+
+def run_command(tracker, args: argparse.Namespace) -> None:
     try:
         if args.command == "start":
             tracker.start_tracking(tracker.validate_note(args.note))
@@ -347,14 +1765,214 @@ def main():
             tracker.stop_tracking(tracker.validate_note(args.note))
         elif args.command == "note":
             tracker.add_note(tracker.validate_note(args.note))
+        elif args.command == "apply":
+            tracker.apply_commands(args.stdin.splitlines())
         elif args.command == "status":
             tracker.show_status()
         elif args.command == "history":
-            tracker.show_history(args.days)
+            tracker.show_history(args.days, args.limit, args.offset, args.since, args.until)
         elif args.command == "summary":
             tracker.show_summary(args.today)
+        elif args.command == "stats":
+            tracker.show_stats(args.days)
+        elif args.command == "search":
+            if args.rebuild:
+                print(f"Indexed notes of {len(tracker.rebuild_index().starts)} sessions")
+            if args.terms:
+                tracker.search_notes(" ".join(args.terms), args.limit)
+        elif args.command == "rollup":
+            tracker.update_rollups(args.check)
     except ValueError as e:
         print(f"Error: {e}")
 
+def read_input(source: str) -> str:
+    if source == "-":
+        return sys.stdin.read()
+    with open(source, "r", encoding="utf-8") as f:
+        return f.read()
+
+def export_history(storage, args: argparse.Namespace) -> None:
+
+    sessions = storage.iter_sessions(since=args.since, until=args.until)
+    if args.format == "csv":
+        if not args.output:
+            print("Error: csv export writes one file per table and needs --output DIR")
+            return
+        count = export_csv(sessions, Path(args.output))
+    else:
+        writer = export_jsonl if args.format == "jsonl" else export_columnar
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                count = writer(sessions, out)
+        else:
+            count = writer(sessions, sys.stdout)
+    if args.output:
+        print(f"Exported {count} records to {args.output}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        # Imported by name: the harness drives the package modules and is not part of the single-file build
+        try:
+            bench = importlib.import_module("tool.tracker.bench")
+        except ImportError:
+            print("Error: tracker bench needs the tool.tracker package; the single-file build cannot run it")
+            return
+        bench.main(extra, prog="tracker bench")
+        return
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "apply":
+        # Read here rather than in the daemon, whose working directory and stdin are not ours
+        try:
+            args.stdin = read_input(args.file)
+        except OSError as e:
+            print(f"Error: cannot read {args.file}: {e}")
+            return
+    if args.command in SERVICE_COMMANDS:
+        output = send_command(argv, getattr(args, "stdin", None))
+        if output is not None:
+            print(output, end="")
+            return
+    
+    
+    if args.command == "migrate":
+        source, target = open_storage(args.source), open_storage(args.target)
+        with source.lock():
+            data = source.load()
+        with target.lock():
+            target.save(data)
+        print(f"Migrated {len(data.entries)} sessions from {args.source} to {args.target}")
+        return
+    
+    storage = open_storage()
+    if args.command == "compact":
+        with storage.lock():
+            storage.compact()
+        print(f"Compacted {storage.file_path}")
+        return
+    if args.command == "export":
+        export_history(storage, args)
+        return
+    if args.command == "serve":
+        serve(storage)
+        return
+    
+    run_command(TrackingService(storage), args)
+
+class WriteBehindStorage(TrackingStorage):
+    # Serves everything from memory and persists through `inner` on a writer thread.
+    # The writer replays events onto its own copy of the data, so `inner.record` always
+    # sees the state right after the event it is writing, however far the daemon has moved on.
+    def __init__(self, inner: TrackingStorage):
+        super().__init__(inner.file_path)
+        self.inner = inner
+        with inner.lock():
+            self.data = inner.load()
+        self._shadow = copy.deepcopy(self.data)
+        self._queue: Queue = Queue()
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def load(self) -> TrackingData:
+        return self.data
+
+    def load_active(self) -> TrackingData:
+        return self.data
+
+    def save(self, data: TrackingData) -> None:
+        self.data = data
+        self._queue.put(copy.deepcopy(data))
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        self.data = data
+        self._queue.put(event)
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        for entry in reversed(self.data.entries):
+            if in_range(entry.start_at, since, until):
+                yield entry
+
+    def lock(self) -> ContextManager[None]:
+        # Requests are handled one at a time; the writer takes the real file lock
+        return nullcontext()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                with self.inner.lock():
+                    if isinstance(item, TrackingEvent):
+                        apply_event(self._shadow, item)
+                        self.inner.record(self._shadow, item)
+                    else:
+                        self._shadow = item
+                        self.inner.save(item)
+            except Exception as e:
+                print(f"Error: failed to write {self.inner.file_path}: {e}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+class TrackerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        output, errors, status = io.StringIO(), io.StringIO(), 0
+        with redirect_stdout(output), redirect_stderr(errors):
+            try:
+                args = build_parser().parse_args(request["argv"])
+                args.stdin = request.get("stdin")
+                run_command(self.server.tracker, args)
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                # Reported to the client instead of dropping the connection; the daemon keeps serving
+                status = 1
+                print(f"Error: {type(e).__name__}: {e}", file=sys.stderr)
+        reply = {"output": output.getvalue(), "status": status, "stderr": errors.getvalue()}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+# socketserver only defines the Unix server classes where AF_UNIX exists; serve() checks first
+UnixStreamServer = getattr(socketserver, "UnixStreamServer", object)
+
+class TrackerServer(UnixStreamServer):
+    def __init__(self, storage: WriteBehindStorage):
+        self.storage = storage
+        self.tracker = TrackingService(storage)
+        self.path = socket_path(storage.file_path)
+        super().__init__(str(self.path), TrackerRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+        self.storage.flush()
+
+def serve(storage: TrackingStorage) -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: tracker serve needs Unix domain sockets, which this platform lacks")
+        return
+
+    path = socket_path(storage.file_path)
+    if send_command(["status"], file_path=storage.file_path) is not None:
+        print(f"Error: a tracker daemon is already listening on {path}")
+        return
+    # Left behind by a daemon that did not shut down cleanly
+    path.unlink(missing_ok=True)
+
+    server = TrackerServer(WriteBehindStorage(storage))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Tracker daemon listening on {path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Tracker daemon stopped")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
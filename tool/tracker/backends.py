@@ -0,0 +1,18 @@
+from pathlib import Path
+from tool.tracker.config import TRACKING_FILE, USE_JOURNAL
+from tool.tracker.journal import JournalTrackingStorage
+from tool.tracker.segments import SegmentedTrackingStorage
+from tool.tracker.sqlite_storage import SqliteTrackingStorage
+from tool.tracker.storage import TrackingStorage
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def open_storage(file_path: str = TRACKING_FILE) -> TrackingStorage:
+    path = Path(file_path)
+    if path.suffix in SQLITE_SUFFIXES:
+        return SqliteTrackingStorage(path)
+    if not path.suffix:
+        return SegmentedTrackingStorage(path)
+    if USE_JOURNAL:
+        return JournalTrackingStorage(path)
+    return TrackingStorage(path)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import io
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+import tomli_w
+from tool.tracker.build_merged import MERGED_FILE
+
+SIZES = (1_000, 10_000, 100_000)
+OPERATIONS = ("load", "save", "status", "history", "summary")
+BACKEND_OPERATIONS = ("save", "load", "status", "note", "history", "summary", "stats")
+# Storage location per backend inside a benchmark directory
+BACKENDS = {"toml": "tracking.toml", "journal": "tracking.toml", "segments": "tracking", "sqlite": "tracking.db"}
+
+def synthetic_history(sessions: int, breaks: int = 2, notes: int = 3, seed: int = 0,
+                      end: Optional[datetime] = None) -> Dict[str, Any]:
+    # TOML-shaped history of back-to-back working sessions up to `end`; the last one is still running
+    rng = random.Random(seed)
+    end = end or datetime.now()
+    start = end - timedelta(hours=8 * sessions)
+    entries = []
+    for i in range(sessions):
+        begin = start + timedelta(hours=8 * i, minutes=rng.randrange(60))
+        length = rng.randrange(30, 240)
+        session_breaks, break_minutes = [], 0.0
+        for b in range(breaks):
+            pause = begin + timedelta(minutes=length * (b + 1) / (breaks + 1))
+            minutes = float(rng.randrange(5, 20))
+            session_breaks.append({
+                "start": pause.isoformat(),
+                "end": (pause + timedelta(minutes=minutes)).isoformat(),
+                "duration_minutes": minutes,
+            })
+            break_minutes += minutes
+        session_notes = [
+            {"time": (begin + timedelta(minutes=rng.randrange(length))).isoformat(),
+             "text": f"worked on task {rng.randrange(500)} in module {rng.randrange(40)}"}
+            for _ in range(notes)
+        ]
+        stop = begin + timedelta(minutes=length + break_minutes)
+        active = i == sessions - 1
+        entries.append({
+            "id": begin.strftime("%Y%m%d%H%M%S"),
+            "start": begin.isoformat(),
+            "stop": "" if active else stop.isoformat(),
+            "duration_minutes": 0.0 if active else float(length),
+            "paused": False,
+            "breaks": session_breaks,
+            "notes": session_notes,
+        })
+    return {"active_session": entries[-1]["id"] if entries else "", "entries": entries}
+
+def load_builds() -> Dict[str, SimpleNamespace]:
+    from tool.tracker.service import TrackingService
+    from tool.tracker.storage import TrackingStorage
+
+    spec = importlib.util.spec_from_file_location("tracker_merged", MERGED_FILE)
+    merged: ModuleType = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(merged)
+    return {
+        "package": SimpleNamespace(TrackingStorage=TrackingStorage, TrackingService=TrackingService),
+        "merged": SimpleNamespace(TrackingStorage=merged.TrackingStorage, TrackingService=merged.TrackingService),
+    }
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def bench_build(build: SimpleNamespace, path: Path, repeat: int = 3) -> Dict[str, float]:
+    storage = build.TrackingStorage(path)
+    service = build.TrackingService(storage)
+    data = storage.load()
+    with redirect_stdout(io.StringIO()):
+        # The first summary builds the rollup sidecar; time the steady state
+        service.show_summary()
+        return {
+            "load": best_of(repeat, storage.load),
+            "save": best_of(repeat, lambda: storage.save(data)),
+            "status": best_of(repeat, service.show_status),
+            "history": best_of(repeat, service.show_history),
+            "summary": best_of(repeat, service.show_summary),
+        }
+
+def run(sizes=SIZES, builds: Optional[List[str]] = None, repeat: int = 3,
+        workdir: Optional[Path] = None) -> List[Dict[str, Any]]:
+    available = load_builds()
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            raw = tomli_w.dumps(synthetic_history(size)).encode("utf-8")
+            for name in builds or available:
+                path = Path(tmp) / f"{name}-{size}.toml"
+                path.write_bytes(raw)
+                results.append({"build": name, "sessions": size, **bench_build(available[name], path, repeat)})
+    return results
+
+def _storage_class(backend: str) -> type:
+    from tool.tracker.journal import JournalTrackingStorage
+    from tool.tracker.segments import SegmentedTrackingStorage
+    from tool.tracker.sqlite_storage import SqliteTrackingStorage
+    from tool.tracker.storage import TrackingStorage
+
+    return {
+        "toml": TrackingStorage,
+        "journal": JournalTrackingStorage,
+        "segments": SegmentedTrackingStorage,
+        "sqlite": SqliteTrackingStorage,
+    }[backend]
+
+def _peak_memory() -> Callable[[], Tuple[str, float]]:
+    # Peak RSS of this process in MiB; Windows has no `resource`, so fall back to traced Python allocations
+    try:
+        import resource
+    except ImportError:
+        tracemalloc.start()
+        return lambda: ("tracemalloc", tracemalloc.get_traced_memory()[1] / 2 ** 20)
+    scale = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    return lambda: ("rss", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale)
+
+def prepare_backend(backend: str, source: Path, workdir: Path) -> int:
+    # Copies the source history into the backend and builds its rollup and stats sidecars, so the
+    # process that is measured never holds the source history
+    from tool.tracker.service import TrackingService
+    from tool.tracker.storage import TrackingStorage
+
+    data = TrackingStorage(source).load()
+    storage = _storage_class(backend)(workdir / BACKENDS[backend])
+    storage.save(data)
+    with redirect_stdout(io.StringIO()):
+        TrackingService(storage).update_rollups()
+    return len(data.entries)
+
+def bench_backend(backend: str, workdir: Path, sessions: int, repeat: int = 3) -> Dict[str, Any]:
+    from tool.tracker.service import TrackingService
+
+    peak_memory = _peak_memory()
+    storage = _storage_class(backend)(workdir / BACKENDS[backend])
+    service = TrackingService(storage)
+    row: Dict[str, Any] = {"backend": backend, "sessions": sessions}
+    with redirect_stdout(io.StringIO()):
+        row["status"] = best_of(repeat, service.show_status)
+        row["note"] = best_of(repeat, lambda: service.add_note("benchmark note"))
+        row["history"] = best_of(repeat, service.show_history)
+        row["summary"] = best_of(repeat, service.show_summary)
+        row["stats"] = best_of(repeat, service.show_stats)
+    row["peak_memory_source"], row["peak_memory_mb"] = peak_memory()
+    # Load and save hold the whole history, so they run last and their peak is reported on its own
+    row["load"] = best_of(repeat, storage.load)
+    data = storage.load()
+    row["save"] = best_of(repeat, lambda: storage.save(data))
+    row["load_sessions_per_s"] = sessions / row["load"] if row["load"] else None
+    row["save_sessions_per_s"] = sessions / row["save"] if row["save"] else None
+    row["load_peak_memory_mb"] = peak_memory()[1]
+    return row
+
+def _in_fresh_process(func: Callable[..., Any], *args: Any) -> Any:
+    # A new interpreter, so peak memory is not inherited from whatever ran before
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+def run_backends(sizes=SIZES, backends: Optional[List[str]] = None, breaks: int = 2, notes: int = 3,
+                 repeat: int = 3, workdir: Optional[Path] = None, isolate: bool = True) -> List[Dict[str, Any]]:
+    results = []
+    call = _in_fresh_process if isolate else lambda func, *args: func(*args)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            source = Path(tmp) / f"source-{size}.toml"
+            source.write_bytes(tomli_w.dumps(synthetic_history(size, breaks, notes)).encode("utf-8"))
+            for backend in backends or BACKENDS:
+                target = Path(tmp) / f"{backend}-{size}"
+                target.mkdir()
+                sessions = call(prepare_backend, backend, source, target)
+                row = call(bench_backend, backend, target, sessions, repeat)
+                results.append({**row, "breaks": breaks, "notes": notes})
+    return results
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'build':<10}{'sessions':>10}" + "".join(f"{op:>10}" for op in OPERATIONS))
+    for row in results:
+        print(f"{row['build']:<10}{row['sessions']:>10}" +
+              "".join(f"{row[op] * 1000:>8.1f}ms" for op in OPERATIONS))
+
+def print_backend_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'backend':<10}{'sessions':>10}" + "".join(f"{op:>10}" for op in BACKEND_OPERATIONS) +
+          f"{'load/s':>10}{'save/s':>10}{'peak MiB':>10}{'load MiB':>10}")
+    for row in results:
+        print(f"{row['backend']:<10}{row['sessions']:>10}" +
+              "".join(f"{row[op] * 1000:>8.1f}ms" for op in BACKEND_OPERATIONS) +
+              f"{row['load_sessions_per_s'] or 0:>10.0f}{row['save_sessions_per_s'] or 0:>10.0f}"
+              f"{row['peak_memory_mb']:>10.1f}{row['load_peak_memory_mb']:>10.1f}")
+
+def write_json(results: List[Dict[str, Any]], args: argparse.Namespace, out: TextIO) -> None:
+    meta = {
+        "suite": args.suite,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "breaks": args.breaks,
+        "notes": args.notes,
+        "repeat": args.repeat,
+        "unit": "seconds",
+    }
+    json.dump({"meta": meta, "results": results}, out, indent=2)
+    out.write("\n")
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description="Time tracker operations on synthetic histories")
+    parser.add_argument("--suite", choices=("backends", "builds"), default="backends",
+                        help="Compare storage backends, or the package against the single-file build")
+    parser.add_argument("--sessions", "--sizes", dest="sizes", type=int, nargs="+", default=list(SIZES),
+                        help="History sizes in sessions")
+    parser.add_argument("--breaks", type=int, default=2, help="Breaks per session")
+    parser.add_argument("--notes", type=int, default=3, help="Notes per session")
+    parser.add_argument("--backend", choices=tuple(BACKENDS), action="append", help="Limit to some backends")
+    parser.add_argument("--build", choices=("package", "merged"), action="append", help="Limit to one build")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation; the best is reported")
+    parser.add_argument("--json", metavar="FILE", help="Write machine-readable results to FILE ('-' for stdout)")
+    return parser
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    args = build_parser(prog).parse_args(argv)
+    if args.suite == "builds":
+        if args.breaks != 2 or args.notes != 3:
+            print("Note: the builds suite uses the default 2 breaks and 3 notes per session", file=sys.stderr)
+        results = run(args.sizes, args.build, args.repeat)
+    else:
+        results = run_backends(args.sizes, args.backend, args.breaks, args.notes, args.repeat)
+
+    if args.json == "-":
+        write_json(results, args, sys.stdout)
+        return
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            write_json(results, args, out)
+    if args.suite == "builds":
+        print_results(results)
+    else:
+        print_backend_results(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import argparse
+import ast
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Set
+
+PACKAGE = "tool.tracker"
+PACKAGE_DIR = Path(__file__).parent
+MERGED_FILE = PACKAGE_DIR / "_merged.py"
+
+# Dependency order: every module only uses names defined by the ones above it at import time
+MODULES = [
+    "config", "model", "file_sys", "events", "storage", "journal", "segments", "sqlite_storage",
+    "backends", "rollup", "search", "stats", "export", "client", "service", "cli", "daemon",
+]
+
+HEADER = f"# Generated from the {PACKAGE} modules by tool/tracker/build_merged.py - do not edit by hand.\n"
+
+def _is_package_import(node: ast.AST) -> bool:
+    return isinstance(node, ast.ImportFrom) and (node.module or "").startswith(PACKAGE)
+
+def _top_level_names(tree: ast.Module) -> Set[str]:
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+    return names
+
+def build() -> str:
+    plain_imports: Set[str] = set()
+    from_imports: Dict[str, Set[str]] = defaultdict(set)
+    defined: Dict[str, str] = {}
+    bodies: List[str] = []
+    main_guard = ""
+
+    for module in MODULES:
+        source = (PACKAGE_DIR / f"{module}.py").read_text(encoding="utf-8")
+        tree = ast.parse(source)
+        lines = source.splitlines()
+        dropped: Set[int] = set()
+
+        for name in _top_level_names(tree):
+            if name in defined:
+                raise ValueError(f"{name} is defined in both {defined[name]} and {module}")
+            defined[name] = module
+
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                plain_imports.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and not _is_package_import(node):
+                from_imports[node.module].update(alias.name for alias in node.names)
+            elif isinstance(node, ast.If) and ast.unparse(node.test) == "__name__ == '__main__'":
+                main_guard = "\n".join(lines[node.lineno - 1:node.end_lineno])
+            else:
+                continue
+            dropped.update(range(node.lineno - 1, node.end_lineno))
+
+        # Deferred imports of sibling modules become plain references to the merged names
+        for node in ast.walk(tree):
+            if _is_package_import(node):
+                dropped.update(range(node.lineno - 1, node.end_lineno))
+                comment = node.lineno - 2
+                if comment >= 0 and lines[comment].strip().startswith("#") and comment not in dropped:
+                    dropped.add(comment)
+
+        kept = [line for i, line in enumerate(lines) if i not in dropped and not line.startswith("#!")]
+        bodies.append("\n".join(kept).strip("\n"))
+
+    imports = [f"import {name}" for name in sorted(plain_imports)]
+    imports += [f"from {module} import {', '.join(sorted(names))}" for module, names in sorted(from_imports.items())]
+    parts = ["#!/usr/bin/env python3\n" + HEADER + "\n".join(imports)] + bodies
+    if main_guard:
+        parts.append(main_guard)
+    return "\n\n".join(parts) + "\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the single-file tracker build")
+    parser.add_argument("--check", action="store_true", help="Fail if _merged.py is out of date instead of writing it")
+    args = parser.parse_args()
+
+    merged = build()
+    if args.check:
+        if MERGED_FILE.read_text(encoding="utf-8") != merged:
+            raise SystemExit(f"{MERGED_FILE} is out of date; run python -m tool.tracker.build_merged")
+        print(f"{MERGED_FILE} is up to date")
+        return
+
+    MERGED_FILE.write_text(merged, encoding="utf-8")
+    print(f"Wrote {MERGED_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 import argparse
-from tool.tracker.service import TrackingService
-from tool.tracker.storage import TrackingStorage
+import importlib
+import sys
+from datetime import datetime
+from pathlib import Path
+from tool.tracker.client import send_command
+from tool.tracker.config import TRACKING_FILE
 
-def main():
+# Commands a running `tracker serve` daemon answers from memory
+SERVICE_COMMANDS = {
+    "start", "pause", "resume", "stop", "note", "apply", "status", "history", "summary", "stats", "search", "rollup",
+}
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Time tracking utility")
     subparsers = parser.add_subparsers(dest="command", required=True)
     
@@ -27,20 +36,67 @@ def main():
     note_parser = subparsers.add_parser("note")
     note_parser.add_argument("note", help="Note text (max 300 chars)")
     
+    # Apply command
+    apply_parser = subparsers.add_parser("apply", help="Apply timestamped commands in one pass, e.g. to backfill history")
+    apply_parser.add_argument("file", help="File with one '<ISO time> <start|pause|resume|stop|note> [note]' per line, or - for stdin")
+    
     # Status command
     subparsers.add_parser("status")
     
     # History command
     history_parser = subparsers.add_parser("history")
     history_parser.add_argument("--days", type=int, default=7, help="Days to show")
+    history_parser.add_argument("--limit", type=int, help="Show at most this many sessions")
+    history_parser.add_argument("--offset", type=int, default=0, help="Skip this many newest sessions")
+    history_parser.add_argument("--since", type=datetime.fromisoformat, help="Sessions started at or after (ISO date/time)")
+    history_parser.add_argument("--until", type=datetime.fromisoformat, help="Sessions started before (ISO date/time)")
     
     # Summary command
     summary_parser = subparsers.add_parser("summary")
     summary_parser.add_argument("--today", action="store_true", help="Today only")
     
-    args = parser.parse_args()
-    tracker = TrackingService(TrackingStorage())
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Weekday/hour breakdowns, percentiles and rolling averages")
+    stats_parser.add_argument("--days", type=int, help="Only sessions from the last N days (default: all)")
+    
+    # Search command
+    search_parser = subparsers.add_parser("search", help="Find sessions by note text")
+    search_parser.add_argument("terms", nargs="*", help="Words that must all appear in a session's notes")
+    search_parser.add_argument("--limit", type=int, default=10, help="Maximum sessions to show")
+    search_parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from all notes first")
+    
+    # Rollup command
+    rollup_parser = subparsers.add_parser("rollup", help="Rebuild daily summary rollups and the stats cache from raw sessions")
+    rollup_parser.add_argument("--check", action="store_true", help="Only report days where rollups differ")
+    
+    # Compact command
+    subparsers.add_parser("compact", help="Fold journaled events into the snapshot file")
+    
+    # Migrate command
+    migrate_parser = subparsers.add_parser("migrate", help="Copy all history into another storage location")
+    migrate_parser.add_argument("target", help="Destination .toml file, .db file for SQLite, or a directory for monthly segments")
+    migrate_parser.add_argument("--source", default=TRACKING_FILE, help="Storage to read from")
+    
+    # Export command
+    export_parser = subparsers.add_parser(
+        "export", help="Stream sessions, breaks and notes as flat typed records",
+        description="Records are written newest session first as they are read. SQLite storage is read in "
+                    "row batches and monthly segments one month at a time; a .toml file, journaled or not, is "
+                    "read into memory whole and then parsed one session at a time.")
+    export_parser.add_argument("--format", choices=("csv", "jsonl", "columnar"), default="jsonl", help="Output format")
+    export_parser.add_argument("-o", "--output", help="Output file (directory for csv); stdout if omitted")
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="Sessions started at or after (ISO date/time)")
+    export_parser.add_argument("--until", type=datetime.fromisoformat, help="Sessions started before (ISO date/time)")
+    
+    # Serve command
+    subparsers.add_parser("serve", help="Keep the tracker in memory and answer commands over a local socket")
+    
+    # Bench command; its options belong to tool/tracker/bench.py
+    subparsers.add_parser("bench", add_help=False, help="Benchmark storage backends on synthetic histories (see bench -h)")
     
+    return parser
+
+def run_command(tracker, args: argparse.Namespace) -> None:
     try:
         if args.command == "start":
             tracker.start_tracking(tracker.validate_note(args.note))
@@ -52,14 +108,107 @@ def main():
             tracker.stop_tracking(tracker.validate_note(args.note))
         elif args.command == "note":
             tracker.add_note(tracker.validate_note(args.note))
+        elif args.command == "apply":
+            tracker.apply_commands(args.stdin.splitlines())
         elif args.command == "status":
             tracker.show_status()
         elif args.command == "history":
-            tracker.show_history(args.days)
+            tracker.show_history(args.days, args.limit, args.offset, args.since, args.until)
         elif args.command == "summary":
             tracker.show_summary(args.today)
+        elif args.command == "stats":
+            tracker.show_stats(args.days)
+        elif args.command == "search":
+            if args.rebuild:
+                print(f"Indexed notes of {len(tracker.rebuild_index().starts)} sessions")
+            if args.terms:
+                tracker.search_notes(" ".join(args.terms), args.limit)
+        elif args.command == "rollup":
+            tracker.update_rollups(args.check)
     except ValueError as e:
         print(f"Error: {e}")
 
+def read_input(source: str) -> str:
+    if source == "-":
+        return sys.stdin.read()
+    with open(source, "r", encoding="utf-8") as f:
+        return f.read()
+
+def export_history(storage, args: argparse.Namespace) -> None:
+    from tool.tracker.export import export_columnar, export_csv, export_jsonl
+
+    sessions = storage.iter_sessions(since=args.since, until=args.until)
+    if args.format == "csv":
+        if not args.output:
+            print("Error: csv export writes one file per table and needs --output DIR")
+            return
+        count = export_csv(sessions, Path(args.output))
+    else:
+        writer = export_jsonl if args.format == "jsonl" else export_columnar
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                count = writer(sessions, out)
+        else:
+            count = writer(sessions, sys.stdout)
+    if args.output:
+        print(f"Exported {count} records to {args.output}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        # Imported by name: the harness drives the package modules and is not part of the single-file build
+        try:
+            bench = importlib.import_module("tool.tracker.bench")
+        except ImportError:
+            print("Error: tracker bench needs the tool.tracker package; the single-file build cannot run it")
+            return
+        bench.main(extra, prog="tracker bench")
+        return
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "apply":
+        # Read here rather than in the daemon, whose working directory and stdin are not ours
+        try:
+            args.stdin = read_input(args.file)
+        except OSError as e:
+            print(f"Error: cannot read {args.file}: {e}")
+            return
+    if args.command in SERVICE_COMMANDS:
+        output = send_command(argv, getattr(args, "stdin", None))
+        if output is not None:
+            print(output, end="")
+            return
+    
+    # Imported here so commands answered by the daemon skip loading the storage stack
+    from tool.tracker.backends import open_storage
+    from tool.tracker.service import TrackingService
+    
+    if args.command == "migrate":
+        source, target = open_storage(args.source), open_storage(args.target)
+        with source.lock():
+            data = source.load()
+        with target.lock():
+            target.save(data)
+        print(f"Migrated {len(data.entries)} sessions from {args.source} to {args.target}")
+        return
+    
+    storage = open_storage()
+    if args.command == "compact":
+        with storage.lock():
+            storage.compact()
+        print(f"Compacted {storage.file_path}")
+        return
+    if args.command == "export":
+        export_history(storage, args)
+        return
+    if args.command == "serve":
+        from tool.tracker.daemon import serve
+        serve(storage)
+        return
+    
+    run_command(TrackingService(storage), args)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import json
+import socket
+import sys
+from pathlib import Path
+from typing import List, Optional
+from tool.tracker.config import TRACKING_FILE
+
+def socket_path(file_path: str = TRACKING_FILE) -> Path:
+    return Path(file_path).with_suffix(".sock")
+
+def send_command(argv: List[str], stdin: Optional[str] = None,
+                 file_path: str = TRACKING_FILE) -> Optional[str]:
+    # None means no daemon is listening and the caller should use the files directly
+    path = socket_path(file_path)
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.sendall(json.dumps({"argv": argv, "stdin": stdin}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reply:
+                response = reply.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+
+    # The daemon may already have run the command, so a bad reply is an error, not a reason to rerun it here
+    try:
+        reply = json.loads(response)
+        output = reply["output"]
+    except (ValueError, KeyError, TypeError):
+        print(f"Error: no valid reply from the tracker daemon at {path}", file=sys.stderr)
+        return ""
+    if reply.get("stderr"):
+        print(reply["stderr"], end="", file=sys.stderr)
+    return output
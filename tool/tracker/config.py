@@ -1,2 +1,4 @@
 MAX_NOTE_LENGTH = 300
 TRACKING_FILE = r"C:\atari-monk\code\apps-data-store\tracking.toml"
+USE_JOURNAL = True
+JOURNAL_COMPACT_EVENTS = 200
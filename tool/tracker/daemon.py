@@ -0,0 +1,130 @@
+import copy
+import io
+import json
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import nullcontext, redirect_stderr, redirect_stdout
+from datetime import datetime
+from queue import Queue
+from typing import ContextManager, Iterator, Optional
+from tool.tracker.cli import build_parser, run_command
+from tool.tracker.client import send_command, socket_path
+from tool.tracker.events import apply_event
+from tool.tracker.model import TrackingData, TrackingEvent, TrackingSession
+from tool.tracker.service import TrackingService
+from tool.tracker.storage import TrackingStorage, in_range
+
+class WriteBehindStorage(TrackingStorage):
+    # Serves everything from memory and persists through `inner` on a writer thread.
+    # The writer replays events onto its own copy of the data, so `inner.record` always
+    # sees the state right after the event it is writing, however far the daemon has moved on.
+    def __init__(self, inner: TrackingStorage):
+        super().__init__(inner.file_path)
+        self.inner = inner
+        with inner.lock():
+            self.data = inner.load()
+        self._shadow = copy.deepcopy(self.data)
+        self._queue: Queue = Queue()
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def load(self) -> TrackingData:
+        return self.data
+
+    def load_active(self) -> TrackingData:
+        return self.data
+
+    def save(self, data: TrackingData) -> None:
+        self.data = data
+        self._queue.put(copy.deepcopy(data))
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        self.data = data
+        self._queue.put(event)
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        for entry in reversed(self.data.entries):
+            if in_range(entry.start_at, since, until):
+                yield entry
+
+    def lock(self) -> ContextManager[None]:
+        # Requests are handled one at a time; the writer takes the real file lock
+        return nullcontext()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                with self.inner.lock():
+                    if isinstance(item, TrackingEvent):
+                        apply_event(self._shadow, item)
+                        self.inner.record(self._shadow, item)
+                    else:
+                        self._shadow = item
+                        self.inner.save(item)
+            except Exception as e:
+                print(f"Error: failed to write {self.inner.file_path}: {e}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+class TrackerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        output, errors, status = io.StringIO(), io.StringIO(), 0
+        with redirect_stdout(output), redirect_stderr(errors):
+            try:
+                args = build_parser().parse_args(request["argv"])
+                args.stdin = request.get("stdin")
+                run_command(self.server.tracker, args)
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                # Reported to the client instead of dropping the connection; the daemon keeps serving
+                status = 1
+                print(f"Error: {type(e).__name__}: {e}", file=sys.stderr)
+        reply = {"output": output.getvalue(), "status": status, "stderr": errors.getvalue()}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+# socketserver only defines the Unix server classes where AF_UNIX exists; serve() checks first
+UnixStreamServer = getattr(socketserver, "UnixStreamServer", object)
+
+class TrackerServer(UnixStreamServer):
+    def __init__(self, storage: WriteBehindStorage):
+        self.storage = storage
+        self.tracker = TrackingService(storage)
+        self.path = socket_path(storage.file_path)
+        super().__init__(str(self.path), TrackerRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+        self.storage.flush()
+
+def serve(storage: TrackingStorage) -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: tracker serve needs Unix domain sockets, which this platform lacks")
+        return
+
+    path = socket_path(storage.file_path)
+    if send_command(["status"], file_path=storage.file_path) is not None:
+        print(f"Error: a tracker daemon is already listening on {path}")
+        return
+    # Left behind by a daemon that did not shut down cleanly
+    path.unlink(missing_ok=True)
+
+    server = TrackerServer(WriteBehindStorage(storage))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Tracker daemon listening on {path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Tracker daemon stopped")
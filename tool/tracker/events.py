@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from tool.tracker.model import TrackingBreak, TrackingData, TrackingEvent, TrackingNote, TrackingSession
+
+START = "start"
+PAUSE = "pause"
+RESUME = "resume"
+STOP = "stop"
+NOTE = "note"
+COMMANDS = (START, PAUSE, RESUME, STOP, NOTE)
+SESSION_ID_FORMAT = "%Y%m%d%H%M%S"
+
+def find_session(data: TrackingData, session_id: Optional[str]) -> Optional[TrackingSession]:
+    if not session_id:
+        return None
+    # The active session is almost always the most recent entry
+    return next((e for e in reversed(data.entries) if e.id == session_id), None)
+
+def make_event(data: TrackingData, kind: str, time: str, text: Optional[str] = None) -> TrackingEvent:
+    # A start opens a session named after its timestamp; everything else targets the active one
+    session_id = datetime.fromisoformat(time).strftime(SESSION_ID_FORMAT) if kind == START else data.active_session
+    return TrackingEvent(kind, time, session_id, text)
+
+def parse_event_line(line: str) -> Tuple[str, str, Optional[str]]:
+    # "<ISO time> <command> [note text]" as read by `tracker apply`
+    parts = line.split(None, 2)
+    if len(parts) < 2:
+        raise ValueError("Expected '<ISO time> <command> [note]'")
+    try:
+        time = datetime.fromisoformat(parts[0])
+    except ValueError:
+        raise ValueError(f"Invalid timestamp {parts[0]}") from None
+    if time.tzinfo is not None:
+        raise ValueError(f"Timestamp {parts[0]} must be local time without an offset")
+    kind = parts[1].lower()
+    if kind not in COMMANDS:
+        raise ValueError(f"Unknown command {parts[1]}")
+    return time.isoformat(), kind, parts[2].strip() if len(parts) > 2 else None
+
+def last_event_time(session: TrackingSession) -> str:
+    times = [session.start]
+    if session.breaks:
+        times.append(session.breaks[-1].end or session.breaks[-1].start)
+    if session.notes:
+        times.append(session.notes[-1].time)
+    return max(times, key=datetime.fromisoformat)
+
+def validate_event(data: TrackingData, event: TrackingEvent) -> None:
+    # The session state machine: raises ValueError if `event` cannot follow the current state
+    if event.kind == START:
+        if data.active_session:
+            raise ValueError("Session already active")
+        return
+
+    if event.kind == NOTE and not (event.text or "").strip():
+        raise ValueError("Cannot add an empty note")
+    session = find_session(data, event.session_id)
+    if session is None or session.stop:
+        action = {PAUSE: " to pause", RESUME: " to resume"}.get(event.kind, "")
+        raise ValueError(f"No active session{action}")
+
+    if event.kind == PAUSE and session.paused:
+        raise ValueError("Session already paused")
+    if event.kind == RESUME:
+        if not session.paused:
+            raise ValueError("Session not paused")
+        if not session.breaks or session.breaks[-1].end is not None:
+            raise ValueError("No active break to resume from")
+    if event.kind == STOP and session.paused:
+        raise ValueError("Cannot stop while paused. Resume first.")
+
+def apply_event(data: TrackingData, event: TrackingEvent) -> TrackingSession:
+    if event.kind == START:
+        session = TrackingSession(id=event.session_id, start=event.time)
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=event.text))
+        data.entries.append(session)
+        data.active_session = session.id
+        return session
+
+    session = find_session(data, event.session_id)
+    if session is None:
+        raise ValueError(f"Unknown session {event.session_id}")
+
+    if event.kind == PAUSE:
+        session.breaks.append(TrackingBreak(start=event.time))
+        session.paused = True
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=f"Paused: {event.text}"))
+    elif event.kind == RESUME:
+        current_break = session.breaks[-1]
+        current_break.end = event.time
+        duration = (current_break.end_at - current_break.start_at).total_seconds() / 60
+        current_break.duration_minutes = round(duration, 2)
+        session.paused = False
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=f"Resumed: {event.text}"))
+    elif event.kind == STOP:
+        session.stop = event.time
+        total_break_time = sum(b.duration_minutes or 0 for b in session.breaks)
+        total_duration = (session.stop_at - session.start_at).total_seconds() / 60
+        session.duration_minutes = round(total_duration - total_break_time, 2)
+        if event.text:
+            session.notes.append(TrackingNote(time=event.time, text=event.text))
+        if data.active_session == session.id:
+            data.active_session = None
+    elif event.kind == NOTE:
+        session.notes.append(TrackingNote(time=event.time, text=event.text or ""))
+    else:
+        raise ValueError(f"Unknown event kind {event.kind}")
+
+    return session
@@ -0,0 +1,86 @@
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple
+from tool.tracker.model import TrackingSession
+
+# Column types follow Arrow's names so the columnar output maps onto a typed reader directly
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "sessions": {
+        "id": "string",
+        "start": "timestamp",
+        "stop": "timestamp",
+        "duration_minutes": "float64",
+        "paused": "bool",
+        "breaks": "int64",
+        "notes": "int64",
+    },
+    "breaks": {
+        "session_id": "string",
+        "seq": "int64",
+        "start": "timestamp",
+        "end": "timestamp",
+        "duration_minutes": "float64",
+    },
+    "notes": {
+        "session_id": "string",
+        "seq": "int64",
+        "time": "timestamp",
+        "text": "string",
+    },
+}
+
+FORMATS = ("csv", "jsonl", "columnar")
+BATCH_SIZE = 1024
+
+def iter_rows(sessions: Iterable[TrackingSession]) -> Iterator[Tuple[str, tuple]]:
+    for s in sessions:
+        yield "sessions", (s.id, s.start, s.stop, s.duration_minutes or 0.0, s.paused,
+                           len(s.breaks), len(s.notes))
+        for seq, b in enumerate(s.breaks):
+            yield "breaks", (s.id, seq, b.start, b.end, b.duration_minutes or 0.0)
+        for seq, n in enumerate(s.notes):
+            yield "notes", (s.id, seq, n.time, n.text)
+
+def export_jsonl(sessions: Iterable[TrackingSession], out: TextIO) -> int:
+    count = 0
+    for table, row in iter_rows(sessions):
+        out.write(json.dumps({"record": table, **dict(zip(SCHEMA[table], row))}) + "\n")
+        count += 1
+    return count
+
+def export_csv(sessions: Iterable[TrackingSession], directory: Path) -> int:
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {table: open(directory / f"{table}.csv", "w", newline="", encoding="utf-8") for table in SCHEMA}
+    try:
+        writers = {table: csv.writer(f) for table, f in files.items()}
+        for table, writer in writers.items():
+            writer.writerow(SCHEMA[table])
+        count = 0
+        for table, row in iter_rows(sessions):
+            writers[table].writerow(row)
+            count += 1
+        return count
+    finally:
+        for f in files.values():
+            f.close()
+
+def export_columnar(sessions: Iterable[TrackingSession], out: TextIO, batch_size: int = BATCH_SIZE) -> int:
+    # A schema line, then record batches holding one array per column
+    out.write(json.dumps({"schema": SCHEMA}) + "\n")
+    batches: Dict[str, List[tuple]] = {table: [] for table in SCHEMA}
+    count = 0
+    for table, row in iter_rows(sessions):
+        batches[table].append(row)
+        count += 1
+        if len(batches[table]) >= batch_size:
+            _write_batch(out, table, batches[table])
+            batches[table] = []
+    for table, rows in batches.items():
+        if rows:
+            _write_batch(out, table, rows)
+    return count
+
+def _write_batch(out: TextIO, table: str, rows: List[tuple]) -> None:
+    columns = dict(zip(SCHEMA[table], (list(column) for column in zip(*rows))))
+    out.write(json.dumps({"table": table, "length": len(rows), "columns": columns}) + "\n")
@@ -0,0 +1,108 @@
+import json
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, Tuple
+from tool.tracker.config import JOURNAL_COMPACT_EVENTS, TRACKING_FILE
+from tool.tracker.events import apply_event
+from tool.tracker.file_sys import append_line
+from tool.tracker.model import TrackingData, TrackingEvent, TrackingSession
+from tool.tracker.storage import TrackingStorage
+
+class JournalTrackingStorage(TrackingStorage):
+    def __init__(self, file_path: str = TRACKING_FILE, compact_after: int = JOURNAL_COMPACT_EVENTS):
+        super().__init__(file_path)
+        self.journal_path = self.sidecar_path("journal")
+        self.compact_after = compact_after
+        self._last_seq = 0
+        self._pending = 0
+
+    def load(self) -> TrackingData:
+        raw = self._read_raw()
+        data = self._deserialize(raw)
+        self._last_seq = raw.get("journal_seq", 0)
+        self._pending = 0
+
+        for seq, event in self._read_journal():
+            # Events already folded into the snapshot by an interrupted compaction
+            if seq <= self._last_seq:
+                continue
+            apply_event(data, event)
+            self._last_seq = seq
+            self._pending += 1
+
+        return data
+
+    def load_active(self) -> TrackingData:
+        # The snapshot's active session with the journal replayed on top: journaled events
+        # only ever touch the session active at the time or ones they start
+        raw = self._read_active_raw()
+        data = self._deserialize(raw)
+        last_seq, pending = raw.get("journal_seq", 0), 0
+        try:
+            for seq, event in self._read_journal():
+                if seq <= last_seq:
+                    continue
+                apply_event(data, event)
+                last_seq, pending = seq, pending + 1
+        except ValueError:
+            return self.load()
+        self._last_seq, self._pending = last_seq, pending
+        return data
+
+    def save(self, data: TrackingData) -> None:
+        super().save(data)
+        self.journal_path.unlink(missing_ok=True)
+        self._pending = 0
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        self._last_seq += 1
+        append_line(self.journal_path, json.dumps({"seq": self._last_seq, **asdict(event)}))
+        self._pending += 1
+
+        if self._pending >= self.compact_after:
+            # `data` may be just the active session, so fold the journal into the full history
+            self.compact()
+
+    def compact(self) -> None:
+        self.save(self.load())
+
+    def _iter_stored_sessions(self) -> Iterator[TrackingSession]:
+        # Replayed like load_active, so only the snapshot's active session and the sessions
+        # the journal started differ from the stored entries; the rest stream from the file
+        raw = self._read_active_raw()
+        data = self._deserialize(raw)
+        last_seq = raw.get("journal_seq", 0)
+        try:
+            for seq, event in self._read_journal():
+                if seq > last_seq:
+                    apply_event(data, event)
+                    last_seq = seq
+        except ValueError:
+            yield from reversed(self.load().entries)
+            return
+
+        replayed = {session.id: session for session in data.entries}
+        stored = {entry["id"] for entry in raw.get("entries", [])}
+        yield from reversed([session for session in data.entries if session.id not in stored])
+        for entry in self._iter_raw_entries():
+            yield replayed.get(entry["id"]) or self._deserialize_session(entry)
+
+    def _prepare_for_toml(self, data: TrackingData) -> Dict[str, Any]:
+        result = super()._prepare_for_toml(data)
+        result["journal_seq"] = self._last_seq
+        return result
+
+    def _read_journal(self) -> Iterator[Tuple[int, TrackingEvent]]:
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append carries no complete event
+                    break
+                seq = record.pop("seq")
+                yield seq, TrackingEvent(**record)
@@ -1,28 +1,163 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
+from datetime import datetime
 
-@dataclass
+ParsedTimestamp = Optional[Tuple[str, Optional[datetime]]]
+
+def _parsed(obj, attr: str) -> Optional[datetime]:
+    # The cache remembers which string it parsed, so reassigning the field invalidates it
+    raw = getattr(obj, attr)
+    cache_attr = f"_{attr}_parsed"
+    cached = getattr(obj, cache_attr)
+    if cached is None or cached[0] is not raw:
+        cached = (raw, datetime.fromisoformat(raw) if raw else None)
+        setattr(obj, cache_attr, cached)
+    return cached[1]
+
+@dataclass(slots=True)
 class TrackingNote:
     time: str
     text: str
+    _time_parsed: ParsedTimestamp = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
+    @property
+    def time_at(self) -> datetime:
+        return _parsed(self, "time")
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TrackingNote":
+        return cls(time=raw["time"], text=raw["text"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"time": self.time, "text": self.text}
+
+@dataclass(slots=True)
 class TrackingBreak:
     start: str
     end: Optional[str] = None
     duration_minutes: Optional[float] = None
+    _start_parsed: ParsedTimestamp = field(default=None, init=False, repr=False, compare=False)
+    _end_parsed: ParsedTimestamp = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def start_at(self) -> datetime:
+        return _parsed(self, "start")
+
+    @property
+    def end_at(self) -> Optional[datetime]:
+        return _parsed(self, "end")
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TrackingBreak":
+        return cls(start=raw["start"], end=raw.get("end") or None,
+                   duration_minutes=raw.get("duration_minutes") or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start,
+            "end": self.end if self.end else "",
+            "duration_minutes": self.duration_minutes if self.duration_minutes else 0.0
+        }
 
-@dataclass
 class TrackingSession:
-    id: str
-    start: str
-    stop: Optional[str] = None
-    duration_minutes: Optional[float] = None
-    breaks: List[TrackingBreak] = field(default_factory=list)
-    notes: List[TrackingNote] = field(default_factory=list)
-    paused: bool = False
+    # Sessions read from storage keep their breaks and notes as the raw stored dicts until
+    # first accessed, and write untouched lists back as-is. Equality and repr follow the
+    # dataclasses around it.
+    __slots__ = ("id", "start", "stop", "duration_minutes", "paused",
+                 "_breaks", "_notes", "_source", "_start_parsed", "_stop_parsed")
+
+    def __init__(self, id: str, start: str, stop: Optional[str] = None,
+                 duration_minutes: Optional[float] = None, breaks: Optional[List[TrackingBreak]] = None,
+                 notes: Optional[List[TrackingNote]] = None, paused: bool = False):
+        self.id = id
+        self.start = start
+        self.stop = stop
+        self.duration_minutes = duration_minutes
+        self.paused = paused
+        self._breaks = breaks if breaks is not None else []
+        self._notes = notes if notes is not None else []
+        self._source: Optional[Dict[str, Any]] = None
+        self._start_parsed: ParsedTimestamp = None
+        self._stop_parsed: ParsedTimestamp = None
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "TrackingSession":
+        session = cls(id=raw["id"], start=raw["start"], stop=raw.get("stop") or None,
+                      duration_minutes=raw.get("duration_minutes") or None, paused=raw.get("paused", False))
+        session._breaks = None
+        session._notes = None
+        session._source = raw
+        return session
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "start": self.start,
+            "stop": self.stop if self.stop else "",
+            "duration_minutes": self.duration_minutes if self.duration_minutes else 0.0,
+            "paused": self.paused,
+            "breaks": (self._source.get("breaks", []) if self._breaks is None
+                       else [b.to_dict() for b in self._breaks]),
+            "notes": (self._source.get("notes", []) if self._notes is None
+                      else [n.to_dict() for n in self._notes])
+        }
+
+    @property
+    def breaks(self) -> List[TrackingBreak]:
+        if self._breaks is None:
+            self._breaks = [TrackingBreak.from_dict(b) for b in self._source.get("breaks", [])]
+        return self._breaks
+
+    @breaks.setter
+    def breaks(self, value: List[TrackingBreak]) -> None:
+        self._breaks = value
+
+    @property
+    def notes(self) -> List[TrackingNote]:
+        if self._notes is None:
+            self._notes = [TrackingNote.from_dict(n) for n in self._source.get("notes", [])]
+        return self._notes
+
+    @notes.setter
+    def notes(self, value: List[TrackingNote]) -> None:
+        self._notes = value
+
+    @property
+    def start_at(self) -> datetime:
+        return _parsed(self, "start")
+
+    @property
+    def stop_at(self) -> Optional[datetime]:
+        return _parsed(self, "stop")
+
+    def _fields(self) -> tuple:
+        return (self.id, self.start, self.stop, self.duration_minutes, self.breaks, self.notes, self.paused)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"TrackingSession(id={self.id!r}, start={self.start!r}, stop={self.stop!r}, "
+                f"duration_minutes={self.duration_minutes!r}, breaks={self.breaks!r}, "
+                f"notes={self.notes!r}, paused={self.paused!r})")
 
 @dataclass
 class TrackingData:
     entries: List[TrackingSession] = field(default_factory=list)
     active_session: Optional[str] = None
+
+@dataclass
+class TrackingEvent:
+    kind: str
+    time: str
+    session_id: str
+    text: Optional[str] = None
+
+@dataclass
+class DailyRollup:
+    active_minutes: float = 0.0
+    sessions: int = 0
+    breaks: int = 0
+    notes: int = 0
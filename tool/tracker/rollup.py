@@ -0,0 +1,95 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+from tool.tracker.file_sys import append_line, atomic_write_bytes
+from tool.tracker.model import DailyRollup, TrackingSession
+
+ROLLUP_COMPACT_AFTER = 500
+
+def add_session(total: DailyRollup, session: TrackingSession) -> None:
+    total.active_minutes += session.duration_minutes or 0
+    total.sessions += 1
+    total.breaks += len(session.breaks)
+    total.notes += len(session.notes)
+
+def _values(rollup: DailyRollup) -> list:
+    return [rollup.active_minutes, rollup.sessions, rollup.breaks, rollup.notes]
+
+class DailyRollups:
+    # Per-day totals of finished sessions, keyed by the ISO date the session started on. A save
+    # appends the new totals of just the changed days to a .log next to the JSON snapshot, and
+    # the snapshot is rewritten every ROLLUP_COMPACT_AFTER log lines or after a rebuild.
+    def __init__(self, path: Path, compact_after: int = ROLLUP_COMPACT_AFTER):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".log")
+        self.compact_after = compact_after
+        self._days: Optional[Dict[str, DailyRollup]] = None
+        self._changed: Set[str] = set()
+        self._rebuilt = False
+        self._logged = 0
+        self._torn = False
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def days(self) -> Dict[str, DailyRollup]:
+        if self._days is None:
+            self._days = self._read()
+        return self._days
+
+    def add_session(self, session: TrackingSession) -> None:
+        day = session.start[:10]
+        add_session(self.days.setdefault(day, DailyRollup()), session)
+        self._changed.add(day)
+
+    def rebuild(self, sessions: Iterable[TrackingSession], active_session: Optional[str]) -> None:
+        self._days = {}
+        for session in sessions:
+            if session.id != active_session:
+                add_session(self._days.setdefault(session.start[:10], DailyRollup()), session)
+        self._rebuilt = True
+
+    def totals(self, first_day: date) -> DailyRollup:
+        total = DailyRollup()
+        first = first_day.isoformat()
+        for day, rollup in self.days.items():
+            if day >= first:
+                total.active_minutes += rollup.active_minutes
+                total.sessions += rollup.sessions
+                total.breaks += rollup.breaks
+                total.notes += rollup.notes
+        return total
+
+    def save(self) -> None:
+        if self._rebuilt or self._logged + len(self._changed) >= self.compact_after:
+            raw = {day: _values(rollup) for day, rollup in sorted(self.days.items())}
+            atomic_write_bytes(self.path, json.dumps(raw, separators=(",", ":")).encode("utf-8"))
+            self.log_path.unlink(missing_ok=True)
+            self._logged, self._torn, self._rebuilt = 0, False, False
+        elif self._changed:
+            # Whole-day totals rather than increments, so replaying a line twice is harmless
+            lines = [json.dumps([day, *_values(self.days[day])]) for day in sorted(self._changed)]
+            # End a line torn by an interrupted append so these stay readable
+            append_line(self.log_path, ("\n" if self._torn else "") + "\n".join(lines))
+            self._logged, self._torn = self._logged + len(lines), False
+        self._changed = set()
+
+    def _read(self) -> Dict[str, DailyRollup]:
+        days = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                days = {day: DailyRollup(*values) for day, values in json.load(f).items()}
+        if self.log_path.exists():
+            text = self.log_path.read_text(encoding="utf-8")
+            self._torn = bool(text) and not text.endswith("\n")
+            for line in text.splitlines():
+                self._logged += 1
+                try:
+                    day, *values = json.loads(line)
+                except (ValueError, TypeError):
+                    # A line torn by an interrupted append
+                    continue
+                days[day] = DailyRollup(*values)
+        return days
@@ -0,0 +1,117 @@
+import json
+import math
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from tool.tracker.file_sys import append_line, atomic_write_bytes
+from tool.tracker.model import TrackingSession
+
+TOKEN = re.compile(r"\w+")
+COMPACT_AFTER = 500
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+class SearchIndex:
+    # Inverted index over note text: term -> {session id: occurrences}, plus each session's start
+    # and matching notes so results print without touching the history. New notes are appended
+    # to a .log next to the JSON snapshot and folded into it every COMPACT_AFTER notes.
+    def __init__(self, path: Path, compact_after: int = COMPACT_AFTER):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".log")
+        self.compact_after = compact_after
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.starts: Dict[str, str] = {}
+        self.notes: Dict[str, List[Tuple[str, str]]] = {}
+        self._loaded = False
+        self._logged: Optional[int] = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def add_note(self, session_id: str, start: str, time: str, text: str) -> None:
+        # Only appends; the snapshot is parsed when searching or when the log is due to be folded in
+        line = json.dumps({"session": session_id, "start": start, "time": time, "text": text})
+        if self._logged is None:
+            logged = self.log_path.read_bytes() if self.log_path.exists() else b""
+            self._logged = logged.count(b"\n")
+            if logged and not logged.endswith(b"\n"):
+                # End a line torn by an interrupted append so this one stays readable
+                line = "\n" + line
+        append_line(self.log_path, line)
+        self._logged += 1
+        if self._loaded:
+            self._add(session_id, start, time, text)
+        if self._logged >= self.compact_after:
+            self._load()
+            self.save()
+
+    def add_notes(self, notes: Iterable[Tuple[str, str, str, str]]) -> None:
+        # (session id, session start, note time, text) in bulk: folded straight into the snapshot, no log lines
+        self._load()
+        for session_id, start, time, text in notes:
+            self._add(session_id, start, time, text)
+        self.save()
+
+    def rebuild(self, sessions: Iterable[TrackingSession]) -> None:
+        self.postings, self.starts, self.notes = {}, {}, {}
+        self._loaded = True
+        for session in sessions:
+            self.starts[session.id] = session.start
+            for note in session.notes:
+                self._add(session.id, session.start, note.time, note.text)
+        self.save()
+
+    def save(self) -> None:
+        raw = {"sessions": self.starts, "notes": self.notes, "postings": self.postings}
+        atomic_write_bytes(self.path, json.dumps(raw, separators=(",", ":")).encode("utf-8"))
+        self.log_path.unlink(missing_ok=True)
+        self._logged = 0
+
+    def search(self, query: str, limit: int = 10, now: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        # Sessions containing every query term, by tf-idf damped with age in years
+        self._load()
+        terms = tokenize(query)
+        if not terms or any(term not in self.postings for term in terms):
+            return []
+
+        matches = set.intersection(*(set(self.postings[term]) for term in terms))
+        now = now or datetime.now()
+        total = len(self.starts) or 1
+        scores = []
+        for session_id in matches:
+            relevance = sum(
+                self.postings[term][session_id] * math.log(1 + total / len(self.postings[term]))
+                for term in terms
+            )
+            age_days = max((now - datetime.fromisoformat(self.starts[session_id])).days, 0)
+            scores.append((session_id, relevance / (1 + age_days / 365)))
+        scores.sort(key=lambda item: (item[1], self.starts[item[0]]), reverse=True)
+        return scores[:limit]
+
+    def _add(self, session_id: str, start: str, time: str, text: str) -> None:
+        self.starts[session_id] = start
+        self.notes.setdefault(session_id, []).append((time, text))
+        for term in tokenize(text):
+            hits = self.postings.setdefault(term, {})
+            hits[session_id] = hits.get(session_id, 0) + 1
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.starts, self.postings = raw["sessions"], raw["postings"]
+            self.notes = {session_id: [tuple(note) for note in notes] for session_id, notes in raw["notes"].items()}
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line torn by an interrupted append
+                        continue
+                    self._add(record["session"], record["start"], record["time"], record["text"])
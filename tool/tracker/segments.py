@@ -0,0 +1,98 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from tool.tracker.config import TRACKING_FILE
+from tool.tracker.events import STOP, find_session
+from tool.tracker.model import TrackingData, TrackingEvent, TrackingSession
+from tool.tracker.storage import TrackingStorage, in_range
+
+ACTIVE_FILE = "active.toml"
+
+class SegmentedTrackingStorage(TrackingStorage):
+    # Layout: <dir>/active.toml holds only the running session, finished sessions
+    # are archived into <dir>/YYYY-MM.toml by the month they started in.
+    def __init__(self, file_path: str = TRACKING_FILE):
+        super().__init__(file_path)
+        self.active_path = self.file_path / ACTIVE_FILE
+
+    def load(self) -> TrackingData:
+        entries: List[TrackingSession] = []
+        for segment in self._segment_paths():
+            entries.extend(self._load_segment(segment))
+
+        active = self.load_active()
+        archived = {e.id for e in entries}
+        entries.extend(e for e in active.entries if e.id not in archived)
+        return TrackingData(entries=entries, active_session=active.active_session)
+
+    def load_active(self) -> TrackingData:
+        return self._deserialize(self._read_toml(self.active_path))
+
+    def save(self, data: TrackingData) -> None:
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        archived = [e for e in data.entries if e.id != data.active_session]
+        months: Dict[str, List[TrackingSession]] = {}
+        for session in archived:
+            months.setdefault(self._month_of(session), []).append(session)
+
+        for segment in self._segment_paths():
+            if segment.stem not in months:
+                segment.unlink()
+        for month, sessions in months.items():
+            self._write_segment(self._segment_path(month), sessions)
+
+        self._write_active(find_session(data, data.active_session))
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        session = find_session(data, event.session_id)
+
+        if event.kind == STOP:
+            # Archive first: a crash in between leaves the session in both places, never in neither
+            segment = self._segment_path(self._month_of(session))
+            sessions = [e for e in self._load_segment(segment) if e.id != session.id]
+            sessions.append(session)
+            self._write_segment(segment, sessions)
+            self._write_active(None)
+        else:
+            self._write_active(session)
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        active = self.load_active().entries
+        yield from (e for e in active if in_range(e.start_at, since, until))
+
+        active_ids = {e.id for e in active}
+        first_month = since.strftime("%Y-%m") if since else ""
+        last_month = until.strftime("%Y-%m") if until else "9999-99"
+        # Segments are read newest first and only once the caller gets that far back
+        for segment in reversed(self._segment_paths()):
+            if segment.stem > last_month:
+                continue
+            if segment.stem < first_month:
+                break
+            for entry in reversed(self._load_segment(segment)):
+                if entry.id not in active_ids and in_range(entry.start_at, since, until):
+                    yield entry
+
+    def _write_active(self, session: TrackingSession) -> None:
+        data = TrackingData(entries=[session], active_session=session.id) if session else TrackingData()
+        self._write_toml(self.active_path, self._prepare_for_toml(data))
+
+    def _load_segment(self, path: Path) -> List[TrackingSession]:
+        return self._deserialize(self._read_toml(path)).entries
+
+    def _write_segment(self, path: Path, sessions: List[TrackingSession]) -> None:
+        self._write_toml(path, self._prepare_for_toml(TrackingData(entries=sessions)))
+
+    def _segment_paths(self) -> List[Path]:
+        if not self.file_path.exists():
+            return []
+        return sorted(p for p in self.file_path.glob("????-??.toml"))
+
+    def _segment_path(self, month: str) -> Path:
+        return self.file_path / f"{month}.toml"
+
+    @staticmethod
+    def _month_of(session: TrackingSession) -> str:
+        return session.start[:7]
@@ -1,13 +1,66 @@
-from typing import Optional
-from datetime import datetime, timedelta
+import copy
+from bisect import bisect, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from functools import wraps
+from itertools import islice
 from tool.tracker.config import MAX_NOTE_LENGTH
-from tool.tracker.model import TrackingBreak, TrackingNote, TrackingSession
+from tool.tracker.events import (
+    NOTE, PAUSE, RESUME, START, STOP, apply_event, find_session, last_event_time, make_event, parse_event_line,
+    validate_event,
+)
+from tool.tracker.model import DailyRollup, TrackingData, TrackingEvent, TrackingSession
+from tool.tracker.rollup import DailyRollups, add_session
+from tool.tracker.search import SearchIndex, tokenize
+from tool.tracker.stats import WEEKDAYS, StatsCache, rolling_averages
 from tool.tracker.storage import TrackingStorage
 
+def locked(method):
+    # Serializes the whole load -> check -> record cycle across tracker processes
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.storage.lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _rounded(rollup: Optional[DailyRollup]) -> Optional[tuple]:
+    if rollup is None:
+        return None
+    return (round(rollup.active_minutes, 2), rollup.sessions, rollup.breaks, rollup.notes)
+
+def _check_backfill(sessions: Dict[str, TrackingSession], starts: List[Tuple[datetime, str]],
+                    event: TrackingEvent) -> None:
+    # Live commands are stamped "now"; backfilled ones may be out of order or land inside other sessions
+    at = datetime.fromisoformat(event.time)
+    if event.kind == START:
+        if event.session_id in sessions:
+            raise ValueError(f"Session {event.session_id} already exists")
+        i = bisect(starts, (at, event.session_id))
+        before = sessions[starts[i - 1][1]] if i else None
+        if before and (not before.stop or at < before.stop_at):
+            raise ValueError(f"start at {event.time} is inside session {before.id}")
+        return
+
+    session = sessions[event.session_id]
+    last = last_event_time(session)
+    if at < datetime.fromisoformat(last):
+        raise ValueError(f"{event.kind} at {event.time} is before the session's last event at {last}")
+    if event.kind == STOP:
+        i = bisect(starts, (session.start_at, session.id))
+        if i < len(starts) and starts[i][0] < at:
+            raise ValueError(f"stop at {event.time} runs into session {starts[i][1]}")
+
+def _bar(value: float, peak: float, width: int = 30) -> str:
+    return "#" * round(width * value / peak) if peak else ""
+
 class TrackingService:
     def __init__(self, storage: TrackingStorage):
         self.storage = storage
-        self.data = storage.load()
+        # Nothing is read until a command needs it; mutators reload the active session first
+        self.data = TrackingData()
+        self.rollups = DailyRollups(storage.sidecar_path("rollup.json"))
+        self.index = SearchIndex(storage.sidecar_path("index.json"))
+        self.stats = StatsCache(storage.sidecar_path("stats.bin"))
 
     def validate_note(self, text: Optional[str]) -> Optional[str]:
         if text is not None:
@@ -19,130 +72,200 @@ class TrackingService:
 
     def get_current_session(self) -> Optional[TrackingSession]:
         # Always load fresh data first
-        self.data = self.storage.load()
-        if not self.data.active_session:
-            return None
-        session = next((e for e in self.data.entries if e.id == self.data.active_session), None)
+        self.data = self.storage.load_active()
+        return find_session(self.data, self.data.active_session)
+
+    def _event(self, kind: str, timestamp: str, text: Optional[str]) -> TrackingEvent:
+        # Always against fresh data; another process may have moved the session on
+        self.data = self.storage.load_active()
+        return make_event(self.data, kind, timestamp, text)
+
+    def _commit(self, event: TrackingEvent) -> TrackingSession:
+        validate_event(self.data, event)
+        session = apply_event(self.data, event)
+        self.storage.record(self.data, event)
+        # Without a rollup file there is nothing to keep current; the next summary rebuilds it
+        if event.kind == STOP and self.rollups.exists():
+            self.rollups.add_session(session)
+            self.rollups.save()
+        if event.kind == STOP and self.stats.exists():
+            self.stats.add_session(session)
+            self.stats.save()
+        if event.text and self.index.exists():
+            note = session.notes[-1]
+            self.index.add_note(session.id, session.start, note.time, note.text)
         return session
 
-    def start_tracking(self, note: Optional[str] = None) -> None:
-        if self.data.active_session:
-            print("Error: Session already active")
+    @locked
+    def rebuild_rollups(self) -> DailyRollups:
+        active = self.storage.load_active().active_session
+        self.rollups.rebuild(self.storage.iter_sessions(), active)
+        self.rollups.save()
+        return self.rollups
+
+    @locked
+    def rebuild_stats(self) -> StatsCache:
+        self.stats.rebuild(self.storage.iter_sessions())
+        self.stats.save()
+        return self.stats
+
+    def update_rollups(self, check_only: bool = False) -> None:
+        if not check_only:
+            print(f"Rebuilt rollups for {len(self.rebuild_rollups().days)} days")
+            print(f"Rebuilt stats for {len(self.rebuild_stats().columns)} sessions")
             return
 
-        timestamp = datetime.now().isoformat()
-        session_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        data = self.storage.load()
+        expected = DailyRollups(self.rollups.path)
+        expected.rebuild(data.entries, data.active_session)
+        stored = self.rollups.days
+        mismatched = [
+            day for day in sorted(set(stored) | set(expected.days))
+            if _rounded(stored.get(day)) != _rounded(expected.days.get(day))
+        ]
+        for day in mismatched:
+            print(f"{day}: stored {stored.get(day)} != rebuilt {expected.days.get(day)}")
+        print(f"{len(mismatched)} of {len(expected.days)} days differ")
+
+    @locked
+    def rebuild_index(self) -> SearchIndex:
+        self.index.rebuild(self.storage.iter_sessions())
+        return self.index
+
+    def search_notes(self, query: str, limit: int = 10) -> None:
+        index = self.index if self.index.exists() else self.rebuild_index()
+        results = index.search(query, limit)
+        if not results:
+            print(f"No notes match '{query}'")
+            return
+
+        terms = set(tokenize(query))
+        for session_id, score in results:
+            print(f"Session {session_id} ({index.starts[session_id]}) score {score:.2f}")
+            for time, text in index.notes[session_id]:
+                if terms & set(tokenize(text)):
+                    print(f"    {time}: {text}")
 
-        new_session = TrackingSession(id=session_id, start=timestamp)
-        if note:
-            new_session.notes.append(TrackingNote(time=timestamp, text=note))
+    def summarize(self, first_day: date) -> DailyRollup:
+        rollups = self.rollups if self.rollups.exists() else self.rebuild_rollups()
+        totals = rollups.totals(first_day)
 
-        self.data.entries.append(new_session)
-        self.data.active_session = session_id
-        self.storage.save(self.data)
+        # The running session is not rolled up until it stops
+        active = self.get_current_session()
+        if active and active.start_at.date() >= first_day:
+            add_session(totals, active)
+        return totals
 
+    @locked
+    def start_tracking(self, note: Optional[str] = None) -> None:
+        timestamp = datetime.now().isoformat()
+        self._commit(self._event(START, timestamp, note))
         print(f"Started tracking at {timestamp}" + (f" | Note: {note}" if note else ""))
 
+    @locked
     def pause_tracking(self, note: Optional[str] = None) -> None:
-        if not (session := self.get_current_session()):
-            print("Error: No active session to pause")
-            return
-
-        if session.paused:
-            print("Error: Session already paused")
-            return
-
         timestamp = datetime.now().isoformat()
-        session.breaks.append(TrackingBreak(start=timestamp))
-        session.paused = True
-        if note:
-            session.notes.append(TrackingNote(time=timestamp, text=f"Paused: {note}"))
-        self.storage.save(self.data)
-
+        self._commit(self._event(PAUSE, timestamp, note))
         print(f"Paused tracking at {timestamp}" + (f" | Note: {note}" if note else ""))
 
+    @locked
     def resume_tracking(self, note: Optional[str] = None) -> None:
-        if not (session := self.get_current_session()):
-            print("Error: No active session to resume")
-            return
-
-        if not session.paused:
-            print("Error: Session not paused")
-            return
-
-        if not session.breaks or session.breaks[-1].end is not None:
-            print("Error: No active break to resume from")
-            return
-
         timestamp = datetime.now().isoformat()
-        current_break = session.breaks[-1]
-        current_break.end = timestamp
-        duration = (datetime.fromisoformat(timestamp) -
-                  datetime.fromisoformat(current_break.start)).total_seconds() / 60
-        current_break.duration_minutes = round(duration, 2)
-        session.paused = False
-        if note:
-            session.notes.append(TrackingNote(time=timestamp, text=f"Resumed: {note}"))
-        self.storage.save(self.data)
-
-        duration_str = str(timedelta(minutes=duration)).split(".")[0]
+        session = self._commit(self._event(RESUME, timestamp, note))
+
+        duration_str = str(timedelta(minutes=session.breaks[-1].duration_minutes)).split(".")[0]
         print(f"Resumed tracking at {timestamp} | Break duration: {duration_str}" +
               (f" | Note: {note}" if note else ""))
 
+    @locked
     def stop_tracking(self, note: Optional[str] = None) -> None:
-        if not (session := self.get_current_session()):
-            print("Error: No active session")
-            return
-
-        if session.paused:
-            print("Error: Cannot stop while paused. Resume first.")
-            return
-
         timestamp = datetime.now().isoformat()
+        session = self._commit(self._event(STOP, timestamp, note))
 
-        # Calculate active duration (excluding breaks)
-        total_break_time = sum(b.duration_minutes or 0 for b in session.breaks)
-        total_duration = (datetime.fromisoformat(timestamp) -
-                       datetime.fromisoformat(session.start)).total_seconds() / 60
-        active_duration = total_duration - total_break_time
-
-        session.stop = timestamp
-        session.duration_minutes = round(active_duration, 2)
-        if note:
-            session.notes.append(TrackingNote(time=timestamp, text=note))
-        self.data.active_session = None
-        self.storage.save(self.data)
-
-        duration_str = str(timedelta(minutes=active_duration)).split(".")[0]
+        # duration_minutes is the active time, breaks excluded
+        duration_str = str(timedelta(minutes=session.duration_minutes)).split(".")[0]
         print(f"Stopped tracking at {timestamp} | Active duration: {duration_str}" +
               (f" | Note: {note}" if note else ""))
 
+    @locked
     def add_note(self, note: str) -> None:
-        if not note.strip():
-            print("Error: Cannot add an empty note")
-            return
-        if not (session := self.get_current_session()):
-            print("Error: No active session")
-            return
-
         timestamp = datetime.now().isoformat()
-        session.notes.append(TrackingNote(time=timestamp, text=note))
-        self.storage.save(self.data)
+        self._commit(self._event(NOTE, timestamp, note))
         print(f"Note added at {timestamp}: {note}")
 
+    @locked
+    def apply_commands(self, lines: Iterable[str]) -> None:
+        # The whole batch is checked against the state machine before anything is written.
+        # Events only ever change the session active when the batch starts (or ones it creates),
+        # so working on a copy of that one session leaves the loaded data untouched on failure.
+        data = self.storage.load()
+        work = TrackingData(list(data.entries), data.active_session)
+        for i, entry in enumerate(work.entries):
+            if entry.id == work.active_session:
+                work.entries[i] = copy.deepcopy(entry)
+        sessions = {entry.id: entry for entry in work.entries}
+        starts = sorted((entry.start_at, entry.id) for entry in work.entries)
+        stopped, noted = [], []
+        applied = started = 0
+
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                time, kind, text = parse_event_line(line)
+                event = make_event(work, kind, time, self.validate_note(text))
+                validate_event(work, event)
+                _check_backfill(sessions, starts, event)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from None
+
+            session = apply_event(work, event)
+            applied += 1
+            if kind == START:
+                sessions[session.id] = session
+                insort(starts, (session.start_at, session.id))
+                started += 1
+            elif kind == STOP:
+                stopped.append(session)
+            if text:
+                noted.append((session.id, session.start, session.notes[-1].time, session.notes[-1].text))
+
+        if started and work.active_session and starts[-1][1] != work.active_session:
+            raise ValueError(f"Session {work.active_session} is left open before session {starts[-1][1]}")
+        if not applied:
+            print("No commands to apply")
+            return
+        if started:
+            # Backfilled sessions may predate existing ones; storage expects start order
+            work.entries.sort(key=lambda entry: entry.start_at)
+        self.data = work
+        self.storage.save(work)
+        if stopped and self.rollups.exists():
+            for session in stopped:
+                self.rollups.add_session(session)
+            self.rollups.save()
+        if stopped and self.stats.exists():
+            for session in stopped:
+                self.stats.add_session(session)
+            self.stats.save()
+        if noted and self.index.exists():
+            self.index.add_notes(noted)
+        print(f"Applied {applied} commands: {started} sessions started, {len(stopped)} stopped")
+
     def show_status(self) -> None:
         if not (session := self.get_current_session()):
             print("No active session")
             return
 
         now = datetime.now()
-        start_time = datetime.fromisoformat(session.start)
+        start_time = session.start_at
 
         if session.paused:
             status = "PAUSED"
             last_break = session.breaks[-1] if session.breaks else None
             if last_break and last_break.end is None:
-                break_duration = (now - datetime.fromisoformat(last_break.start)).total_seconds() / 60
+                break_duration = (now - last_break.start_at).total_seconds() / 60
                 duration_str = str(timedelta(minutes=break_duration)).split(".")[0]
                 print(f"Break duration: {duration_str}")
         else:
@@ -161,15 +284,18 @@ class TrackingService:
             for note in session.notes[-5:]:
                 print(f"  {note.time}: {note.text}")
 
-    def show_history(self, days: int = 7) -> None:
-        cutoff = datetime.now() - timedelta(days=days)
-        print(f"Last {days} days history:")
+    def show_history(self, days: int = 7, limit: Optional[int] = None, offset: int = 0,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None) -> None:
+        if since or until:
+            print(f"History from {since or 'the beginning'} until {until or 'now'}:")
+        else:
+            since = datetime.now() - timedelta(days=days)
+            print(f"Last {days} days history:")
         print("=" * 50)
 
-        for entry in reversed(self.data.entries):
-            if datetime.fromisoformat(entry.start) < cutoff:
-                continue
-
+        page = islice(self.storage.iter_sessions(since=since, until=until),
+                      offset, offset + limit if limit is not None else None)
+        for entry in page:
             duration = f"{entry.duration_minutes:.0f}min" if entry.duration_minutes else "Active"
             print(f"Session {entry.id}:")
             print(f"  Start:  {entry.start}")
@@ -180,21 +306,50 @@ class TrackingService:
                 print("  Notes:")
                 for note in entry.notes:
                     print(f"    {note.time}: {note.text}")
-            print("-" * 50)
+            print("-" * 50, flush=True)
 
     def show_summary(self, today_only: bool = False) -> None:
-        cutoff = (datetime.now().replace(hour=0, minute=0, second=0)
-                if today_only else datetime.now() - timedelta(days=30))
-
-        sessions = [e for e in self.data.entries if datetime.fromisoformat(e.start) >= cutoff]
-        total_time = sum(e.duration_minutes or 0 for e in sessions)
-        total_breaks = sum(len(e.breaks) for e in sessions)
+        # Whole days, so the totals come straight from the daily rollups
+        first_day = date.today() if today_only else date.today() - timedelta(days=30)
+        totals = self.summarize(first_day)
+        total_time = totals.active_minutes
+        sessions = totals.sessions
 
         print(f"Summary ({'today' if today_only else 'last 30 days'}):")
         print("=" * 50)
-        print(f"Sessions:  {len(sessions)}")
+        print(f"Sessions:  {sessions}")
         print(f"Total time: {total_time/60:.1f} hours")
-        print(f"Total breaks: {total_breaks}")
-        print(f"Avg session: {total_time/len(sessions):.1f} min" if sessions else "No sessions")
-        print(f"Total notes: {sum(len(e.notes) for e in sessions)}")
-        print("=" * 50)
\ No newline at end of file
+        print(f"Total breaks: {totals.breaks}")
+        print(f"Avg session: {total_time/sessions:.1f} min" if sessions else "No sessions")
+        print(f"Total notes: {totals.notes}")
+        print("=" * 50)
+
+    def show_stats(self, days: Optional[int] = None) -> None:
+        # Read from the stats cache, like summaries from the rollups; the first run builds it
+        columns = (self.stats if self.stats.exists() else self.rebuild_stats()).columns
+        if days:
+            columns = columns.since(datetime.now() - timedelta(days=days))
+        report = columns.report((50, 90, 99), date.today())
+
+        print(f"Stats ({f'last {days} days' if days else 'all time'}, {report.sessions} sessions):")
+        print("=" * 50)
+        if not report.sessions:
+            print("No sessions")
+            print("=" * 50)
+            return
+
+        p = report.percentiles
+        print(f"Session length: p50 {p[50]:.0f} min | p90 {p[90]:.0f} min | p99 {p[99]:.0f} min")
+        print(f"Break ratio: {report.break_ratio:.1%}")
+        for window in (7, 30):
+            rolling = rolling_averages(report.daily, window)
+            print(f"{window}-day average: {rolling[-1]/60:.1f} h/day (best {max(rolling)/60:.1f} h/day)")
+
+        print("By weekday:")
+        for name, minutes in zip(WEEKDAYS, report.weekday):
+            print(f"  {name}  {minutes/60:7.1f} h  {_bar(minutes, max(report.weekday))}")
+        print("By hour:")
+        for hour, minutes in enumerate(report.hours):
+            if minutes:
+                print(f"  {hour:02d}   {minutes/60:7.1f} h  {_bar(minutes, max(report.hours))}")
+        print("=" * 50)
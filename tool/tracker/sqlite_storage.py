@@ -0,0 +1,151 @@
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from tool.tracker.config import TRACKING_FILE
+from tool.tracker.events import find_session
+from tool.tracker.model import TrackingBreak, TrackingData, TrackingEvent, TrackingNote, TrackingSession
+from tool.tracker.storage import TrackingStorage
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    stop TEXT,
+    duration_minutes REAL,
+    paused INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_start ON sessions(start);
+CREATE TABLE IF NOT EXISTS breaks (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    seq INTEGER NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT,
+    duration_minutes REAL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE INDEX IF NOT EXISTS breaks_start ON breaks(start);
+CREATE TABLE IF NOT EXISTS notes (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    seq INTEGER NOT NULL,
+    time TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE INDEX IF NOT EXISTS notes_time ON notes(time);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+FETCH_BATCH_SIZE = 50
+# Bound parameters per IN (...) lookup; SQLite before 3.32 allows at most 999 per statement
+MAX_SQL_VARIABLES = 900
+
+class SqliteTrackingStorage(TrackingStorage):
+    def __init__(self, file_path: str = TRACKING_FILE):
+        super().__init__(file_path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Shared with the daemon writer thread; callers serialize access
+            self._conn = sqlite3.connect(self.file_path, check_same_thread=False)
+            self._conn.executescript(SQLITE_SCHEMA)
+        return self._conn
+
+    def load(self) -> TrackingData:
+        rows = self.conn.execute("SELECT * FROM sessions ORDER BY start").fetchall()
+        return TrackingData(entries=self._build_sessions(rows, everything=True), active_session=self._active_id())
+
+    def load_active(self) -> TrackingData:
+        active_id = self._active_id()
+        rows = self.conn.execute("SELECT * FROM sessions WHERE id = ?", (active_id,)).fetchall()
+        return TrackingData(entries=self._build_sessions(rows), active_session=active_id)
+
+    def save(self, data: TrackingData) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM notes")
+            self.conn.execute("DELETE FROM breaks")
+            self.conn.execute("DELETE FROM sessions")
+            for session in data.entries:
+                self._insert_session(session)
+            self._set_active(data.active_session)
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        session = find_session(data, event.session_id)
+        with self.conn:
+            self.conn.execute("DELETE FROM notes WHERE session_id = ?", (session.id,))
+            self.conn.execute("DELETE FROM breaks WHERE session_id = ?", (session.id,))
+            self.conn.execute("DELETE FROM sessions WHERE id = ?", (session.id,))
+            self._insert_session(session)
+            self._set_active(data.active_session)
+
+    def compact(self) -> None:
+        self.conn.execute("VACUUM")
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        conditions, params = [], []
+        if since:
+            conditions.append("start >= ?")
+            params.append(since.isoformat())
+        if until:
+            conditions.append("start < ?")
+            params.append(until.isoformat())
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        cursor = self.conn.execute(f"SELECT * FROM sessions {where}ORDER BY start DESC", params)
+        while rows := cursor.fetchmany(FETCH_BATCH_SIZE):
+            yield from self._build_sessions(rows)
+
+    def _active_id(self) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM state WHERE key = 'active_session'").fetchone()
+        return row[0] if row and row[0] else None
+
+    def _set_active(self, session_id: Optional[str]) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('active_session', ?)",
+                          (session_id or "",))
+
+    def _insert_session(self, session: TrackingSession) -> None:
+        self.conn.execute(
+            "INSERT INTO sessions (id, start, stop, duration_minutes, paused) VALUES (?, ?, ?, ?, ?)",
+            (session.id, session.start, session.stop, session.duration_minutes, int(session.paused))
+        )
+        self.conn.executemany(
+            "INSERT INTO breaks (session_id, seq, start, end, duration_minutes) VALUES (?, ?, ?, ?, ?)",
+            [(session.id, i, b.start, b.end, b.duration_minutes) for i, b in enumerate(session.breaks)]
+        )
+        self.conn.executemany(
+            "INSERT INTO notes (session_id, seq, time, text) VALUES (?, ?, ?, ?)",
+            [(session.id, i, n.time, n.text) for i, n in enumerate(session.notes)]
+        )
+
+    def _build_sessions(self, rows: Iterable[tuple], everything: bool = False) -> List[TrackingSession]:
+        # With `everything`, rows are the whole sessions table, so breaks and notes come from one
+        # ordered scan each instead of an IN (...) lookup per batch of ids
+        sessions = [
+            TrackingSession(id=id_, start=start, stop=stop or None,
+                            duration_minutes=duration or None, paused=bool(paused))
+            for id_, start, stop, duration, paused in rows
+        ]
+        if not sessions:
+            return sessions
+
+        by_id: Dict[str, TrackingSession] = {s.id: s for s in sessions}
+        if everything:
+            lookups = [("", ())]
+        else:
+            ids = list(by_id)
+            lookups = [(f"WHERE session_id IN ({','.join('?' * len(chunk))}) ", chunk)
+                       for chunk in (ids[i:i + MAX_SQL_VARIABLES] for i in range(0, len(ids), MAX_SQL_VARIABLES))]
+        for where, params in lookups:
+            for session_id, start, end, duration in self.conn.execute(
+                    f"SELECT session_id, start, end, duration_minutes FROM breaks {where}ORDER BY session_id, seq",
+                    params):
+                by_id[session_id].breaks.append(
+                    TrackingBreak(start=start, end=end or None, duration_minutes=duration or None))
+            for session_id, time, text in self.conn.execute(
+                    f"SELECT session_id, time, text FROM notes {where}ORDER BY session_id, seq", params):
+                by_id[session_id].notes.append(TrackingNote(time=time, text=text))
+        return sessions
@@ -0,0 +1,199 @@
+import math
+import os
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from tool.tracker.file_sys import atomic_write_bytes
+from tool.tracker.model import TrackingSession
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EPOCH = datetime(1970, 1, 1)
+DAY = 86400
+HOUR = 3600
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# Columns per session in the stats cache file: start, stop, active minutes, break minutes
+ROW_WIDTH = 4
+
+@dataclass
+class StatsReport:
+    sessions: int
+    percentiles: Dict[float, float]
+    break_ratio: float
+    daily: List[float]
+    weekday: List[float]
+    hours: List[float]
+
+class SessionColumns:
+    # Finished sessions as flat numeric arrays: wall-clock seconds since EPOCH (local time,
+    # no timezone) and minutes. Every report below reads these instead of the dataclasses.
+    def __init__(self, sessions: Iterable[TrackingSession] = ()):
+        self.start = array("d")
+        self.stop = array("d")
+        self.active = array("d")
+        self.breaks = array("d")
+        for session in sessions:
+            self.add(session)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def add(self, session: TrackingSession) -> None:
+        if session.stop is None:
+            return
+        start = (session.start_at - EPOCH).total_seconds()
+        stop = (session.stop_at - EPOCH).total_seconds()
+        active = session.duration_minutes or 0.0
+        self.start.append(start)
+        self.stop.append(stop)
+        self.active.append(active)
+        # Whatever a stopped session did not spend active was spent on breaks, so the
+        # break lists never have to be decoded
+        self.breaks.append(max((stop - start) / 60 - active, 0.0))
+
+    def since(self, moment: datetime) -> "SessionColumns":
+        first = (moment - EPOCH).total_seconds()
+        selected = SessionColumns()
+        for column in ("start", "stop", "active", "breaks"):
+            source = getattr(self, column)
+            getattr(selected, column).extend(value for value, start in zip(source, self.start) if start >= first)
+        return selected
+
+    def percentiles(self, *ranks: float) -> Dict[float, float]:
+        ordered = sorted(self.active)
+        if not ordered:
+            return {rank: 0.0 for rank in ranks}
+        return {rank: ordered[max(math.ceil(rank / 100 * len(ordered)) - 1, 0)] for rank in ranks}
+
+    def report(self, ranks: Sequence[float] = (50, 90, 99), last_day: Optional[date] = None) -> StatsReport:
+        # Weekday, hour and per-day buckets from a single pass over the columns, vectorised with
+        # numpy when installed. Hours get the active minutes spread over the clock hours each
+        # session spans; days run dense from the first session's day through last_day.
+        weekday, hours, daily = [0.0] * 7, [0.0] * 24, []
+        if self.start:
+            first = int(min(self.start) // DAY)
+            last = (last_day - EPOCH.date()).days if last_day else int(max(self.start) // DAY)
+            daily = [0.0] * (max(last, first) - first + 1)
+        if self.start and numpy is not None:
+            weekday, hours, daily = self._buckets_numpy(first, len(daily))
+        else:
+            for start, stop, active in zip(self.start, self.stop, self.active):
+                day = int(start // DAY)
+                # 1970-01-01 was a Thursday
+                weekday[(day + 3) % 7] += active
+                if day - first < len(daily):
+                    daily[day - first] += active
+                if stop <= start:
+                    continue
+                scale = active / (stop - start)
+                t = start
+                while t < stop:
+                    boundary = min(stop, (t // HOUR + 1) * HOUR)
+                    hours[int(t // HOUR) % 24] += (boundary - t) * scale
+                    t = boundary
+
+        active_total, break_total = sum(self.active), sum(self.breaks)
+        total = active_total + break_total
+        return StatsReport(sessions=len(self), percentiles=self.percentiles(*ranks),
+                           break_ratio=break_total / total if total else 0.0,
+                           daily=daily, weekday=weekday, hours=hours)
+
+    def _buckets_numpy(self, first: int, days: int) -> Tuple[List[float], List[float], List[float]]:
+        start, stop, active = (numpy.frombuffer(column) for column in (self.start, self.stop, self.active))
+        day = (start // DAY).astype(numpy.int64)
+        weekday = numpy.bincount((day + 3) % 7, weights=active, minlength=7)
+        shown = day - first < days
+        daily = numpy.bincount(day[shown] - first, weights=active[shown], minlength=days)
+
+        spanned = stop > start
+        start, stop, active = start[spanned], stop[spanned], active[spanned]
+        hours = numpy.zeros(24)
+        if len(start):
+            scale = active / (stop - start)
+            first_hour, last_hour = (start // HOUR).astype(numpy.int64), (stop // HOUR).astype(numpy.int64)
+            base = first_hour.min()
+            size = last_hour.max() - base + 2
+
+            def per_hour(hour, minutes):
+                return numpy.bincount(hour - base, weights=minutes, minlength=size)
+
+            # Minutes per absolute hour: the partial first and last hours directly, the full hours
+            # in between as +/- steps whose running sum fills them
+            single, spread = first_hour == last_hour, first_hour != last_hour
+            totals = numpy.zeros(size)
+            totals += per_hour(first_hour[single], ((stop - start) * scale)[single])
+            totals += per_hour(first_hour[spread], (((first_hour + 1) * HOUR - start) * scale)[spread])
+            totals += per_hour(last_hour[spread], ((stop - last_hour * HOUR) * scale)[spread])
+            full = scale[spread] * HOUR
+            totals += numpy.cumsum(per_hour(first_hour[spread] + 1, full) - per_hour(last_hour[spread], full))
+            hours = numpy.bincount((numpy.arange(size) + base) % 24, weights=totals, minlength=24)
+        return weekday.tolist(), hours.tolist(), daily.tolist()
+
+class StatsCache:
+    # SessionColumns of every finished session kept in a sidecar file, so stats never parses history.
+    # Saves append the rows added since the last one; only a rebuild rewrites the file.
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._columns: Optional[SessionColumns] = None
+        self._saved = 0
+        self._rebuilt = False
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def columns(self) -> SessionColumns:
+        if self._columns is None:
+            self._columns = self._read()
+            self._saved = len(self._columns)
+        return self._columns
+
+    def add_session(self, session: TrackingSession) -> None:
+        self.columns.add(session)
+
+    def rebuild(self, sessions: Iterable[TrackingSession]) -> None:
+        self._columns = SessionColumns(sessions)
+        self._rebuilt = True
+
+    def save(self) -> None:
+        rows = self._rows(0 if self._rebuilt else self._saved)
+        if self._rebuilt:
+            atomic_write_bytes(self.path, rows.tobytes())
+        elif rows:
+            with open(self.path, "ab") as f:
+                # Drop a row torn by an interrupted append so the new ones stay aligned
+                f.truncate(f.tell() - f.tell() % (8 * ROW_WIDTH))
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        self._saved, self._rebuilt = len(self.columns), False
+
+    def _rows(self, first: int) -> array:
+        # Rows interleaved in native byte order; the cache never leaves this machine
+        columns = self.columns
+        rows = array("d", bytes(8 * ROW_WIDTH * (len(columns) - first)))
+        for i, column in enumerate((columns.start, columns.stop, columns.active, columns.breaks)):
+            rows[i::ROW_WIDTH] = column[first:]
+        return rows
+
+    def _read(self) -> SessionColumns:
+        columns = SessionColumns()
+        if not self.path.exists():
+            return columns
+        data = self.path.read_bytes()
+        rows = array("d")
+        rows.frombytes(data[:len(data) - len(data) % (8 * ROW_WIDTH)])
+        for i, column in enumerate((columns.start, columns.stop, columns.active, columns.breaks)):
+            column.extend(rows[i::ROW_WIDTH])
+        return columns
+
+def rolling_averages(daily: List[float], window: int) -> List[float]:
+    prefix = [0.0]
+    for minutes in daily:
+        prefix.append(prefix[-1] + minutes)
+    return [(prefix[i] - prefix[max(i - window, 0)]) / min(i, window) for i in range(1, len(prefix))]
@@ -1,74 +1,125 @@
-from typing import Any, Dict
+from typing import Any, ContextManager, Dict, Iterator, Optional
+from datetime import datetime
 from pathlib import Path
-from dataclasses import asdict
 import tomli_w
 import tomllib
 from tool.tracker.config import TRACKING_FILE
-from tool.tracker.model import TrackingBreak, TrackingData, TrackingNote, TrackingSession
+from tool.tracker.file_sys import atomic_write_bytes, file_lock
+from tool.tracker.model import TrackingData, TrackingEvent, TrackingSession
+
+# tomli_w writes every top-level key before the first of these table headers
+ENTRIES_HEADER = "\n[[entries]]\n"
+
+def in_range(start: datetime, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    return not ((since and start < since) or (until and start >= until))
 
 class TrackingStorage:
     def __init__(self, file_path: str = TRACKING_FILE):
         self.file_path = Path(file_path)
 
     def load(self) -> TrackingData:
-        if not self.file_path.exists():
-            return TrackingData()
+        return self._deserialize(self._read_raw())
 
-        with open(self.file_path, "rb") as f:
-            data = tomllib.load(f)
-            return self._deserialize(data)
+    def load_active(self) -> TrackingData:
+        # Must contain at least the active session; `record` accepts the result as its `data`
+        return self._deserialize(self._read_active_raw())
 
     def save(self, data: TrackingData) -> None:
-        with open(self.file_path, "wb") as f:
-            tomli_w.dump(self._prepare_for_toml(data), f)
+        self._write_toml(self.file_path, self._prepare_for_toml(data))
+
+    def record(self, data: TrackingData, event: TrackingEvent) -> None:
+        # `data` already has `event` applied but may hold only the active session, so the
+        # event's session is merged into the stored history; plain TOML can only rewrite everything
+        session = next(e for e in reversed(data.entries) if e.id == event.session_id)
+        raw = self._read_raw()
+        raw["active_session"] = data.active_session or ""
+        entries = raw.setdefault("entries", [])
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i]["id"] == session.id:
+                entries[i] = self._serialize_session(session)
+                break
+        else:
+            entries.append(self._serialize_session(session))
+        self._write_toml(self.file_path, raw)
+
+    def compact(self) -> None:
+        pass
+
+    def lock(self) -> ContextManager[None]:
+        return file_lock(self.sidecar_path("lock"))
+
+    def sidecar_path(self, suffix: str) -> Path:
+        return self.file_path.with_suffix(f".{suffix}")
+
+    def iter_sessions(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Iterator[TrackingSession]:
+        # Newest first, filtered on session start. Entries are stored in start order, so the
+        # scan ends at the first one before `since` and older history is never parsed.
+        for session in self._iter_stored_sessions():
+            if since and session.start_at < since:
+                break
+            if in_range(session.start_at, since, until):
+                yield session
+
+    def _iter_stored_sessions(self) -> Iterator[TrackingSession]:
+        for entry in self._iter_raw_entries():
+            yield self._deserialize_session(entry)
+
+    def _iter_raw_entries(self) -> Iterator[Dict[str, Any]]:
+        # Newest first: each [[entries]] block is sliced off the end of the file and parsed
+        # only when reached, so stopping early never parses the older history
+        if not self.file_path.exists():
+            return
+        text = "\n" + self.file_path.read_bytes().decode("utf-8")
+        end = len(text)
+        while (begin := text.rfind(ENTRIES_HEADER, 0, end)) >= 0:
+            yield tomllib.loads(text[begin:end])["entries"][0]
+            end = begin
+
+    def _read_raw(self) -> Dict[str, Any]:
+        return self._read_toml(self.file_path)
+
+    def _read_active_raw(self) -> Dict[str, Any]:
+        # The top-level keys and the last entry, which is the active session if there is one.
+        # Only those two slices of the file are parsed; anything unexpected gets a full parse.
+        if not self.file_path.exists():
+            return {}
+        text = "\n" + self.file_path.read_bytes().decode("utf-8")
+        first = text.find(ENTRIES_HEADER)
+        if first < 0:
+            return tomllib.loads(text)
+        raw = tomllib.loads(text[:first])
+        if raw.get("active_session"):
+            last = tomllib.loads(text[text.rfind(ENTRIES_HEADER):])["entries"]
+            if last[0].get("id") != raw["active_session"]:
+                return self._read_raw()
+            raw["entries"] = last
+        return raw
+
+    def _read_toml(self, path: Path) -> Dict[str, Any]:
+        if not path.exists():
+            return {}
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+
+    def _write_toml(self, path: Path, raw: Dict[str, Any]) -> None:
+        atomic_write_bytes(path, tomli_w.dumps(raw).encode("utf-8"))
 
     def _prepare_for_toml(self, data: TrackingData) -> Dict[str, Any]:
-        result = {
+        return {
             "active_session": data.active_session if data.active_session else "",
-            "entries": []
+            "entries": [self._serialize_session(entry) for entry in data.entries]
         }
 
-        for entry in data.entries:
-            entry_dict = {
-                "id": entry.id,
-                "start": entry.start,
-                "stop": entry.stop if entry.stop else "",
-                "duration_minutes": entry.duration_minutes if entry.duration_minutes else 0.0,
-                "paused": entry.paused,
-                "breaks": [
-                    {
-                        "start": b.start,
-                        "end": b.end if b.end else "",
-                        "duration_minutes": b.duration_minutes if b.duration_minutes else 0.0
-                    }
-                    for b in entry.breaks
-                ],
-                "notes": [asdict(note) for note in entry.notes]
-            }
-            result["entries"].append(entry_dict)
-
-        return result
+    def _serialize_session(self, entry: TrackingSession) -> Dict[str, Any]:
+        return entry.to_dict()
 
     def _deserialize(self, raw: dict) -> TrackingData:
         return TrackingData(
             active_session=raw.get("active_session") or None,
-            entries=[
-                TrackingSession(
-                    id=entry["id"],
-                    start=entry["start"],
-                    stop=entry.get("stop") or None,
-                    duration_minutes=entry.get("duration_minutes") or None,
-                    paused=entry.get("paused", False),
-                    breaks=[
-                        TrackingBreak(
-                            start=b["start"],
-                            end=b.get("end") or None,
-                            duration_minutes=b.get("duration_minutes") or None
-                        )
-                        for b in entry.get("breaks", [])
-                    ],
-                    notes=[TrackingNote(**note) for note in entry["notes"]]
-                )
-                for entry in raw.get("entries", [])
-            ]
-        )
\ No newline at end of file
+            entries=[self._deserialize_session(entry) for entry in raw.get("entries", [])]
+        )
+
+    def _deserialize_session(self, entry: dict) -> TrackingSession:
+        return TrackingSession.from_dict(entry)